@@ -0,0 +1,26 @@
+"""Validation user_id index
+
+Revision ID: 002
+Revises: 001
+Create Date: 2026-10-16 12:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '002'
+down_revision: Union[str, None] = '001'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Same index as the Supabase schema; it may already exist there
+    op.create_index('idx_validations_user_id', 'validations', ['user_id'], if_not_exists=True)
+
+
+def downgrade() -> None:
+    op.drop_index('idx_validations_user_id', table_name='validations', if_exists=True)
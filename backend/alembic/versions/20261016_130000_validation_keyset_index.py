@@ -0,0 +1,33 @@
+"""Validation keyset pagination index
+
+Revision ID: 003
+Revises: 002
+Create Date: 2026-10-16 13:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '003'
+down_revision: Union[str, None] = '002'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Serves ValidationRepository.list_summaries_for_user: equality on
+    # user_id, then a range scan in (created_at, id) DESC keyset order
+    op.create_index(
+        'idx_validations_user_created_at',
+        'validations',
+        ['user_id', 'created_at', 'id'],
+        postgresql_ops={'created_at': 'DESC', 'id': 'DESC'},
+        if_not_exists=True,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('idx_validations_user_created_at', table_name='validations', if_exists=True)
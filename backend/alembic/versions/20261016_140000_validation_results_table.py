@@ -0,0 +1,106 @@
+"""Move validation results to validation_results
+
+Revision ID: 004
+Revises: 003
+Create Date: 2026-10-16 14:00:00
+
+"""
+import uuid
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '004'
+down_revision: Union[str, None] = '003'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+STAGES = ('market_research', 'experiments', 'marketing_campaigns')
+
+# Validations moved per statement
+CHUNK_SIZE = 1000
+
+MOVE_CHUNK = sa.text("""
+WITH chunk AS (
+    SELECT id, market_research, experiments, marketing_campaigns, updated_at
+    FROM validations
+    WHERE id > :after
+    ORDER BY id
+    LIMIT :chunk_size
+), moved AS (
+    INSERT INTO validation_results (validation_id, stage, encoding, payload, size_bytes, created_at, updated_at)
+    SELECT chunk.id, results.stage, 'json', results.payload, octet_length(results.payload::text),
+           chunk.updated_at, chunk.updated_at
+    FROM chunk
+    CROSS JOIN LATERAL (VALUES
+        ('market_research', chunk.market_research),
+        ('experiments', chunk.experiments),
+        ('marketing_campaigns', chunk.marketing_campaigns)
+    ) AS results(stage, payload)
+    WHERE results.payload IS NOT NULL
+    ON CONFLICT (validation_id, stage) DO NOTHING
+)
+SELECT id FROM chunk ORDER BY id DESC LIMIT 1
+""")
+
+
+def upgrade() -> None:
+    op.create_table('validation_results',
+        sa.Column('validation_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('stage', sa.String(), nullable=False),
+        sa.Column('encoding', sa.String(), nullable=False),
+        sa.Column('payload', postgresql.JSONB(astext_type=sa.Text()), nullable=True),
+        sa.Column('compressed', sa.LargeBinary(), nullable=True),
+        sa.Column('size_bytes', sa.Integer(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(['validation_id'], ['validations.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('validation_id', 'stage')
+    )
+    
+    # Move existing results in chunks, each committed on its own, so a large
+    # table is never locked or rewritten in one statement. Existing payloads
+    # stay plain JSONB; new ones are compressed as they are written.
+    with op.get_context().autocommit_block():
+        bind = op.get_bind()
+        after = uuid.UUID(int=0)
+        while True:
+            last = bind.execute(MOVE_CHUNK, {'after': after, 'chunk_size': CHUNK_SIZE}).scalar()
+            if last is None:
+                break
+            after = last
+    
+    for stage in STAGES:
+        op.drop_column('validations', stage)
+
+
+def downgrade() -> None:
+    for stage in STAGES:
+        op.add_column('validations', sa.Column(stage, postgresql.JSONB(astext_type=sa.Text()), nullable=True))
+    
+    bind = op.get_bind()
+    for stage in STAGES:
+        op.execute(sa.text(f"""
+            UPDATE validations SET {stage} = results.payload
+            FROM validation_results AS results
+            WHERE results.validation_id = validations.id
+              AND results.stage = '{stage}' AND results.encoding = 'json'
+        """))
+    
+    compressed = bind.execute(sa.text(
+        "SELECT validation_id, stage, compressed FROM validation_results WHERE encoding = 'zstd'"
+    )).fetchall()
+    if compressed:
+        import zstandard
+        decompressor = zstandard.ZstdDecompressor()
+        for validation_id, stage, blob in compressed:
+            bind.execute(
+                sa.text(f"UPDATE validations SET {stage} = CAST(:payload AS jsonb) WHERE id = :id"),
+                {'payload': decompressor.decompress(blob).decode(), 'id': validation_id},
+            )
+    
+    op.drop_table('validation_results')
@@ -11,17 +11,27 @@ This agent generates experiments for business validation including:
 import json
 import logging
 import re
+from difflib import SequenceMatcher
 from typing import Any, Dict, List, Optional
 
 from langchain.agents import AgentExecutor, create_openai_functions_agent
 from langchain.output_parsers import PydanticOutputParser
 from langchain.prompts import ChatPromptTemplate, MessagesPlaceholder
 from langchain.schema import SystemMessage
+from langchain_core.callbacks import BaseCallbackHandler
 from langchain_core.tools import Tool
-from langchain_openai import ChatOpenAI
 from pydantic import BaseModel, Field
 
+from app.agents.metering import CostMeterHandler
+from app.agents.providers import reset_chat_model, routed_chat_model
+from app.agents.routing import ModelTier
+from app.agents.structured import (
+    PartialSchemaValidator,
+    create_structured_functions_agent,
+    final_answer_instruction,
+)
 from app.core.config import settings
+from app.core.metrics import STRUCTURED_OUTPUT_RESULTS
 from app.schemas.validation import ExperimentResult
 
 logger = logging.getLogger(__name__)
@@ -85,25 +95,64 @@ class StructuredExperiments(BaseModel):
     rationale: str = Field(description="Brief rationale for experiment designs")
 
 
+# How much each research insight shapes the generated experiments
+INSIGHT_WEIGHTS = {
+    "unique_value_proposition": 0.4,
+    "customer_pain_points": 0.3,
+    "market_trends": 0.15,
+    "competitors": 0.15,
+}
+
+
+def research_insights(market_research: Dict[str, Any]) -> Dict[str, Any]:
+    """The market research fields experiment generation actually uses."""
+    return {
+        "unique_value_proposition": market_research.get("unique_value_proposition", ""),
+        "customer_pain_points": market_research.get("customer_pain_points", [])[:3],
+        "market_trends": market_research.get("market_trends", [])[:3],
+        "competitors": [c.get("name", "") for c in market_research.get("competitors", [])[:3]],
+    }
+
+
+def insight_similarity(first: Dict[str, Any], second: Dict[str, Any]) -> float:
+    """
+    Weighted 0-1 similarity of the insights two research results feed into
+    experiment generation: text ratio for the UVP, Jaccard for the lists.
+    """
+    a, b = research_insights(first), research_insights(second)
+    score = 0.0
+    for key, weight in INSIGHT_WEIGHTS.items():
+        if key == "unique_value_proposition":
+            similarity = SequenceMatcher(None, a[key].lower(), b[key].lower()).ratio()
+        else:
+            left = {item.lower().strip() for item in a[key]}
+            right = {item.lower().strip() for item in b[key]}
+            union = left | right
+            similarity = len(left & right) / len(union) if union else 1.0
+        score += weight * similarity
+    return score
+
+
 class ExperimentGeneratorAgent:
     """Agent for generating experiments based on market research."""
     
     def __init__(self):
         """Initialize the experiment generator agent."""
-        self.llm = ChatOpenAI(
-            model="gpt-4-turbo-preview",
-            temperature=0.8,  # Higher temperature for creative variations
-            openai_api_key=settings.OPENAI_API_KEY,
-        )
-        self.structured_llm = ChatOpenAI(
-            model="gpt-4-turbo-preview",
-            temperature=0.3,  # Lower temperature for structured output
-            openai_api_key=settings.OPENAI_API_KEY,
-        )
+        # Charges every call, fallbacks included, to the current validation
+        meter = CostMeterHandler("experiment_generator")
+        # Higher temperature for creative variations
+        self.llm = routed_chat_model("experiment_generator", ModelTier.REASONING, 0.8, callbacks=[meter])
+        # Only reformats text into JSON
+        self.structured_llm = routed_chat_model("experiment_generator", ModelTier.FORMATTING, 0.3, callbacks=[meter])
         self.tools = self._create_tools()
         self.agent = self._create_agent()
         self.output_parser = PydanticOutputParser(pydantic_object=StructuredExperiments)
     
+    def reset(self) -> None:
+        """Clear per-run state so a pooled instance can be reused."""
+        for llm in (self.llm, self.structured_llm):
+            reset_chat_model(llm)
+    
     def _create_tools(self) -> List[Tool]:
         """Create tools for the agent."""
         tools = []
@@ -191,8 +240,7 @@ class ExperimentGeneratorAgent:
     
     def _create_agent(self) -> AgentExecutor:
         """Create the agent executor."""
-        system_message = SystemMessage(
-            content="""You are an expert conversion rate optimizer and experimental marketer.
+        system_prompt = """You are an expert conversion rate optimizer and experimental marketer.
             
 Your goal is to design comprehensive experiments for validating business ideas. You must:
 
@@ -227,7 +275,9 @@ Focus on creating diverse, testable variations that will provide clear validatio
 Be specific and actionable in all recommendations.
 Base predictions on realistic industry standards.
 """
-        )
+        if settings.AGENT_NATIVE_STRUCTURED_OUTPUT:
+            system_prompt += final_answer_instruction(StructuredExperiments)
+        system_message = SystemMessage(content=system_prompt)
         
         prompt = ChatPromptTemplate.from_messages([
             system_message,
@@ -236,11 +286,19 @@ Base predictions on realistic industry standards.
             MessagesPlaceholder(variable_name="agent_scratchpad"),
         ])
         
-        agent = create_openai_functions_agent(
-            llm=self.llm,
-            tools=self.tools,
-            prompt=prompt,
-        )
+        if settings.AGENT_NATIVE_STRUCTURED_OUTPUT:
+            agent = create_structured_functions_agent(
+                llm=self.llm,
+                tools=self.tools,
+                prompt=prompt,
+                schema=StructuredExperiments,
+            )
+        else:
+            agent = create_openai_functions_agent(
+                llm=self.llm,
+                tools=self.tools,
+                prompt=prompt,
+            )
         
         return AgentExecutor(
             agent=agent,
@@ -251,14 +309,16 @@ Base predictions on realistic industry standards.
             handle_parsing_errors=True,
         )
     
-    def _parse_structured_output(self, raw_output: str) -> StructuredExperiments:
+    async def _parse_structured_output(self, raw_output: str) -> StructuredExperiments:
         """Parse the agent's output into structured format."""
         try:
             # First try to extract JSON from the output
             json_match = re.search(r'\{[\s\S]*\}', raw_output)
             if json_match:
                 json_str = json_match.group()
-                return self.output_parser.parse(json_str)
+                parsed = self.output_parser.parse(json_str)
+                STRUCTURED_OUTPUT_RESULTS.labels(agent="experiment_generator", path="regex").inc()
+                return parsed
         except Exception as e:
             logger.warning(f"Failed to parse JSON from output: {e}")
         
@@ -283,11 +343,19 @@ Make realistic predictions based on industry standards.
                 format_instructions=format_instructions
             )
             
-            response = self.structured_llm.invoke(messages)
-            return self.output_parser.parse(response.content)
+            # Async and streamed, so the event loop stays free and an
+            # off-schema response is abandoned as soon as it goes wrong
+            response = await self.structured_llm.ainvoke(
+                messages,
+                config={"callbacks": [PartialSchemaValidator(StructuredExperiments)]},
+            )
+            parsed = self.output_parser.parse(response.content)
+            STRUCTURED_OUTPUT_RESULTS.labels(agent="experiment_generator", path="llm_fallback").inc()
+            return parsed
             
         except Exception as e:
             logger.error(f"Failed to structure output: {e}")
+            STRUCTURED_OUTPUT_RESULTS.labels(agent="experiment_generator", path="default").inc()
             # Return a default structure with the raw output
             return StructuredExperiments(
                 landing_pages=[],
@@ -366,6 +434,7 @@ Make realistic predictions based on industry standards.
         market_research: Dict[str, Any],
         target_market: str = None,
         industry: str = None,
+        callbacks: Optional[List[BaseCallbackHandler]] = None,
     ) -> Dict[str, Any]:
         """
         Generate experiments based on business idea and market research.
@@ -375,25 +444,27 @@ Make realistic predictions based on industry standards.
             market_research: Market research results to inform experiments
             target_market: Optional target market specification
             industry: Optional industry specification
+            callbacks: Callback handlers for the agent run, e.g. to stream
+                tokens and tool steps to clients
             
         Returns:
             Experiment generation results
         """
         try:
             # Extract key insights from market research
-            competitors = market_research.get("competitors", [])
-            pain_points = market_research.get("customer_pain_points", [])
-            value_prop = market_research.get("unique_value_proposition", "")
-            market_trends = market_research.get("market_trends", [])
+            insights = research_insights(market_research)
+            pain_points = insights["customer_pain_points"]
+            market_trends = insights["market_trends"]
+            competitors = insights["competitors"]
             
             # Construct experiment generation query
             query = f"""Design comprehensive experiments for: {business_idea}
 
 Key Market Insights:
-- Value Proposition: {value_prop}
-- Top Customer Pain Points: {', '.join(pain_points[:3]) if pain_points else 'Not specified'}
-- Key Market Trends: {', '.join(market_trends[:3]) if market_trends else 'Not specified'}
-- Main Competitors: {', '.join([c.get('name', '') for c in competitors[:3]]) if competitors else 'Not specified'}
+- Value Proposition: {insights["unique_value_proposition"]}
+- Top Customer Pain Points: {', '.join(pain_points) if pain_points else 'Not specified'}
+- Key Market Trends: {', '.join(market_trends) if market_trends else 'Not specified'}
+- Main Competitors: {', '.join(competitors) if competitors else 'Not specified'}
 """
             
             if target_market:
@@ -409,11 +480,15 @@ Base all predictions on realistic industry benchmarks."""
             
             # Run the agent
             logger.info(f"Generating experiments for: {business_idea}")
-            result = await self.agent.ainvoke({"input": query})
+            result = await self.agent.ainvoke({"input": query}, config={"callbacks": callbacks})
             raw_output = result.get("output", "")
             
-            # Parse and structure the results
-            structured_data = self._parse_structured_output(raw_output)
+            # Use the natively structured answer when the agent delivered one
+            structured_data = result.get("structured")
+            if structured_data is not None:
+                STRUCTURED_OUTPUT_RESULTS.labels(agent="experiment_generator", path="native").inc()
+            else:
+                structured_data = await self._parse_structured_output(raw_output)
             
             # Convert to schema format
             experiment_result = self._convert_to_schema_format(structured_data)
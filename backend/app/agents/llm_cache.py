@@ -0,0 +1,214 @@
+"""
+Content-addressed LLM response cache shared by the ValidateIO agents.
+
+Plugs into LangChain's chat model cache hook, so every chat model call made
+through AgentExecutor.ainvoke or structured_llm.invoke is looked up by a hash
+of the model configuration (model name, temperature, bound tool/function
+schemas) and the serialized messages. Only models at or below
+LLM_CACHE_MAX_TEMPERATURE get a cache, since reusing creative, high
+temperature answers would change behaviour.
+
+Backends:
+- redis: shared across workers, reuses settings.REDIS_URL
+- sqlite: on-disk file for local development
+"""
+
+import hashlib
+import logging
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import defaultdict
+from typing import Any, Dict, Optional, Union
+
+from langchain_core.caches import RETURN_VAL_TYPE, BaseCache
+from langchain_core.load import dumps, loads
+
+from app.core.config import settings
+from app.core.metrics import LLM_CACHE_REQUESTS
+from app.core.redis import get_sync_redis
+
+logger = logging.getLogger(__name__)
+
+
+class LLMCacheBackend(ABC):
+    """Key/value storage with TTL and size eviction."""
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[str]:
+        """Return the cached value or None."""
+
+    @abstractmethod
+    def set(self, key: str, value: str) -> None:
+        """Store a value, evicting the oldest entries beyond the size limit."""
+
+    @abstractmethod
+    def clear(self) -> None:
+        """Remove every entry."""
+
+
+class RedisLLMCacheBackend(LLMCacheBackend):
+    """Redis backend; entries expire by TTL and a sorted set bounds the size."""
+
+    KEY_PREFIX = "llm_cache:"
+    INDEX_KEY = "llm_cache:index"
+
+    def __init__(self, ttl_seconds: int, max_entries: int):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+
+    def get(self, key: str) -> Optional[str]:
+        value = get_sync_redis().get(self.KEY_PREFIX + key)
+        return value.decode() if value is not None else None
+
+    def set(self, key: str, value: str) -> None:
+        client = get_sync_redis()
+        now = time.time()
+        pipe = client.pipeline()
+        pipe.set(self.KEY_PREFIX + key, value, ex=self.ttl_seconds)
+        pipe.zadd(self.INDEX_KEY, {key: now})
+        # Forget index entries whose values have already expired
+        pipe.zremrangebyscore(self.INDEX_KEY, 0, now - self.ttl_seconds)
+        pipe.zcard(self.INDEX_KEY)
+        size = pipe.execute()[-1]
+
+        overflow = size - self.max_entries
+        if overflow > 0:
+            evicted = client.zpopmin(self.INDEX_KEY, overflow)
+            if evicted:
+                client.delete(*[self.KEY_PREFIX + member.decode() for member, _ in evicted])
+
+    def clear(self) -> None:
+        client = get_sync_redis()
+        keys = client.zrange(self.INDEX_KEY, 0, -1)
+        if keys:
+            client.delete(*[self.KEY_PREFIX + key.decode() for key in keys])
+        client.delete(self.INDEX_KEY)
+
+
+class SQLiteLLMCacheBackend(LLMCacheBackend):
+    """On-disk SQLite backend for local use."""
+
+    def __init__(self, path: str, ttl_seconds: int, max_entries: int):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS llm_cache ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, created_at REAL NOT NULL)"
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_llm_cache_created_at ON llm_cache(created_at)"
+            )
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value FROM llm_cache WHERE key = ? AND created_at >= ?",
+                (key, time.time() - self.ttl_seconds),
+            ).fetchone()
+        return row[0] if row else None
+
+    def set(self, key: str, value: str) -> None:
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO llm_cache (key, value, created_at) VALUES (?, ?, ?)",
+                (key, value, now),
+            )
+            self._conn.execute(
+                "DELETE FROM llm_cache WHERE created_at < ?", (now - self.ttl_seconds,)
+            )
+            self._conn.execute(
+                "DELETE FROM llm_cache WHERE key IN ("
+                "SELECT key FROM llm_cache ORDER BY created_at DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,),
+            )
+
+    def clear(self) -> None:
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM llm_cache")
+
+
+class AgentLLMCache(BaseCache):
+    """LangChain cache adapter that records hits and misses per agent."""
+
+    def __init__(self, backend: LLMCacheBackend, agent: str):
+        self.backend = backend
+        self.agent = agent
+
+    @staticmethod
+    def _key(prompt: str, llm_string: str) -> str:
+        return hashlib.sha256(f"{llm_string}\x00{prompt}".encode()).hexdigest()
+
+    def lookup(self, prompt: str, llm_string: str) -> Optional[RETURN_VAL_TYPE]:
+        try:
+            value = self.backend.get(self._key(prompt, llm_string))
+        except Exception as e:
+            logger.warning(f"LLM cache lookup failed: {e}")
+            value = None
+
+        result = "hit" if value is not None else "miss"
+        LLM_CACHE_REQUESTS.labels(agent=self.agent, result=result).inc()
+        _stats[self.agent][result] += 1
+        return loads(value) if value is not None else None
+
+    def update(self, prompt: str, llm_string: str, return_val: RETURN_VAL_TYPE) -> None:
+        try:
+            self.backend.set(self._key(prompt, llm_string), dumps(return_val))
+        except Exception as e:
+            logger.warning(f"LLM cache update failed: {e}")
+
+    def clear(self, **kwargs: Any) -> None:
+        self.backend.clear()
+
+
+_backend: Optional[LLMCacheBackend] = None
+_backend_lock = threading.Lock()
+_stats: Dict[str, Dict[str, int]] = defaultdict(lambda: {"hit": 0, "miss": 0})
+
+
+def get_llm_cache_backend() -> LLMCacheBackend:
+    """Return the configured process-wide cache backend."""
+    global _backend
+    with _backend_lock:
+        if _backend is None:
+            if settings.LLM_CACHE_BACKEND == "sqlite":
+                _backend = SQLiteLLMCacheBackend(
+                    settings.LLM_CACHE_SQLITE_PATH,
+                    settings.LLM_CACHE_TTL_SECONDS,
+                    settings.LLM_CACHE_MAX_ENTRIES,
+                )
+            else:
+                _backend = RedisLLMCacheBackend(
+                    settings.LLM_CACHE_TTL_SECONDS,
+                    settings.LLM_CACHE_MAX_ENTRIES,
+                )
+        return _backend
+
+
+def build_llm_cache(agent: str, temperature: float) -> Union[AgentLLMCache, bool]:
+    """
+    Cache to pass as a chat model's `cache` argument.
+
+    Returns False (caching explicitly disabled) for non-deterministic models
+    or when the cache is turned off.
+    """
+    if not settings.LLM_CACHE_ENABLED or temperature > settings.LLM_CACHE_MAX_TEMPERATURE:
+        return False
+    return AgentLLMCache(get_llm_cache_backend(), agent)
+
+
+def llm_cache_stats() -> Dict[str, Dict[str, Any]]:
+    """Hit/miss counts and hit rate per agent for this process."""
+    report = {}
+    for agent, counts in _stats.items():
+        total = counts["hit"] + counts["miss"]
+        report[agent] = {
+            **counts,
+            "hit_rate": round(counts["hit"] / total, 3) if total else 0.0,
+        }
+    return report
@@ -6,12 +6,18 @@ This agent performs comprehensive market research for business ideas including:
 - Market sizing (TAM/SAM/SOM)
 - Customer pain point identification
 - Market trends analysis
+
+Research runs either as one agent covering every section ("sequential") or
+as one focused sub-agent per section run concurrently and merged
+("parallel"), so wall-clock time tracks the slowest section.
 """
 
+import asyncio
 import json
 import logging
 import re
-from typing import Any, Dict, List, Optional
+import time
+from typing import Any, Callable, Dict, List, Optional
 
 from langchain.agents import AgentExecutor, create_openai_functions_agent
 from langchain.output_parsers import PydanticOutputParser
@@ -26,12 +32,22 @@ try:
     from langchain_community.utilities import GoogleSearchAPIWrapper
 except ImportError:
     GoogleSearchAPIWrapper = None
+from langchain_core.callbacks import BaseCallbackHandler
 from langchain_core.tools import Tool
-from langchain_openai import ChatOpenAI
 from pydantic import BaseModel, Field
 
+from app.agents.metering import CostMeterHandler
+from app.agents.providers import reset_chat_model, routed_chat_model
+from app.agents.routing import ModelTier
+from app.agents.structured import (
+    PartialSchemaValidator,
+    create_structured_functions_agent,
+    final_answer_instruction,
+)
 from app.core.config import settings
-from app.schemas.validation import MarketResearchResult
+from app.core.metrics import RESEARCH_SECTION_DURATION, STRUCTURED_OUTPUT_RESULTS
+from app.schemas.validation import MarketResearchResult, ResearchMode
+from app.services.search_service import search_service
 
 logger = logging.getLogger(__name__)
 
@@ -66,25 +82,97 @@ class StructuredMarketResearch(BaseModel):
     sources: List[str] = Field(description="Sources used for research")
 
 
+class CompetitorSection(BaseModel):
+    """Competitor analysis section of the research."""
+    competitors: List[Competitor] = Field(description="Top 5 competitors analysis")
+    confidence_score: float = Field(description="Confidence score 0-1")
+    sources: List[str] = Field(description="Sources used for this section")
+
+
+class MarketSizeSection(BaseModel):
+    """Market sizing section of the research."""
+    market_size: MarketSize = Field(description="Market size breakdown")
+    confidence_score: float = Field(description="Confidence score 0-1")
+    sources: List[str] = Field(description="Sources used for this section")
+
+
+class PainPointSection(BaseModel):
+    """Customer pain point and value proposition section of the research."""
+    customer_pain_points: List[str] = Field(description="Key customer pain points")
+    unique_value_proposition: str = Field(description="Unique value proposition")
+    confidence_score: float = Field(description="Confidence score 0-1")
+    sources: List[str] = Field(description="Sources used for this section")
+
+
+class TrendSection(BaseModel):
+    """Market trends section of the research."""
+    market_trends: List[str] = Field(description="Current market trends")
+    confidence_score: float = Field(description="Confidence score 0-1")
+    sources: List[str] = Field(description="Sources used for this section")
+
+
+# Independent sections researched concurrently in parallel mode
+RESEARCH_SECTIONS = {
+    "competitors": (
+        CompetitorSection,
+        """**Identify and analyze top 5 competitors**
+   - Company name, description, strengths, weaknesses
+   - Market share and funding information if available""",
+    ),
+    "market_size": (
+        MarketSizeSection,
+        """**Estimate market size**
+   - TAM (Total Addressable Market) in USD
+   - SAM (Serviceable Addressable Market) in USD
+   - SOM (Serviceable Obtainable Market) in USD
+   - Annual growth rate percentage
+   - Cite the source of your market data""",
+    ),
+    "pain_points": (
+        PainPointSection,
+        """**Identify 5-7 key customer pain points**
+   - Specific problems customers face
+   - Why existing solutions fall short
+
+Then provide a unique value proposition: one clear sentence on how this idea
+uniquely solves those problems.""",
+    ),
+    "trends": (
+        TrendSection,
+        """**Analyze 5-7 current market trends**
+   - Emerging opportunities
+   - Shifts in customer behavior
+   - Technology or regulatory changes""",
+    ),
+}
+
+# Section whose completion publishes partial research (it carries the UVP)
+PARTIAL_TRIGGER_SECTION = "pain_points"
+
+
 class MarketResearchAgent:
     """Agent for conducting market research on business ideas."""
     
     def __init__(self):
         """Initialize the market research agent."""
-        self.llm = ChatOpenAI(
-            model="gpt-4-turbo-preview",
-            temperature=0.7,
-            openai_api_key=settings.OPENAI_API_KEY,
-        )
-        self.structured_llm = ChatOpenAI(
-            model="gpt-4-turbo-preview",
-            temperature=0.3,  # Lower temperature for structured output
-            openai_api_key=settings.OPENAI_API_KEY,
-        )
+        # Charges every call, fallbacks included, to the current validation
+        meter = CostMeterHandler("market_research")
+        self.llm = routed_chat_model("market_research", ModelTier.REASONING, 0.7, callbacks=[meter])
+        # Section sub-agents mostly pick searches
+        self.section_llm = routed_chat_model("market_research", ModelTier.TOOLS, 0.7, callbacks=[meter])
+        # Only reformats text into JSON
+        self.structured_llm = routed_chat_model("market_research", ModelTier.FORMATTING, 0.3, callbacks=[meter])
         self.tools = self._create_tools()
         self.agent = self._create_agent()
+        # Built on first parallel run and kept for pooled reuse
+        self._section_agents: Dict[str, AgentExecutor] = {}
         self.output_parser = PydanticOutputParser(pydantic_object=StructuredMarketResearch)
     
+    def reset(self) -> None:
+        """Clear per-run state so a pooled instance can be reused."""
+        for llm in (self.llm, self.section_llm, self.structured_llm):
+            reset_chat_model(llm)
+    
     def _create_tools(self) -> List[Tool]:
         """Create tools for the agent."""
         tools = []
@@ -97,6 +185,8 @@ class MarketResearchAgent:
                     name="web_search",
                     description="Search the web for current information about markets, competitors, and trends",
                     func=search.run,
+                    # Async calls go through the cached, coalesced search layer
+                    coroutine=search_service.search,
                 )
             )
         
@@ -106,8 +196,7 @@ class MarketResearchAgent:
     
     def _create_agent(self) -> AgentExecutor:
         """Create the agent executor."""
-        system_message = SystemMessage(
-            content="""You are a market research expert specializing in business validation.
+        system_prompt = """You are a market research expert specializing in business validation.
             
 Your goal is to provide comprehensive market research for business ideas. You must:
 
@@ -138,7 +227,9 @@ Always search for recent, credible data. Track all sources used.
 Focus on actionable insights backed by data.
 Be realistic in your assessments - don't overestimate market potential.
 """
-        )
+        if settings.AGENT_NATIVE_STRUCTURED_OUTPUT:
+            system_prompt += final_answer_instruction(StructuredMarketResearch)
+        system_message = SystemMessage(content=system_prompt)
         
         prompt = ChatPromptTemplate.from_messages([
             system_message,
@@ -147,11 +238,19 @@ Be realistic in your assessments - don't overestimate market potential.
             MessagesPlaceholder(variable_name="agent_scratchpad"),
         ])
         
-        agent = create_openai_functions_agent(
-            llm=self.llm,
-            tools=self.tools,
-            prompt=prompt,
-        )
+        if settings.AGENT_NATIVE_STRUCTURED_OUTPUT:
+            agent = create_structured_functions_agent(
+                llm=self.llm,
+                tools=self.tools,
+                prompt=prompt,
+                schema=StructuredMarketResearch,
+            )
+        else:
+            agent = create_openai_functions_agent(
+                llm=self.llm,
+                tools=self.tools,
+                prompt=prompt,
+            )
         
         return AgentExecutor(
             agent=agent,
@@ -162,14 +261,185 @@ Be realistic in your assessments - don't overestimate market potential.
             handle_parsing_errors=True,
         )
     
-    def _parse_structured_output(self, raw_output: str) -> StructuredMarketResearch:
+    def _get_section_agent(self, section: str) -> AgentExecutor:
+        """Return the sub-agent for one research section, building it on first use."""
+        section_agent = self._section_agents.get(section)
+        if section_agent is not None:
+            return section_agent
+        
+        schema, instructions = RESEARCH_SECTIONS[section]
+        system_prompt = f"""You are a market research expert specializing in business validation.
+
+You are responsible for one section of a larger market research report:
+
+{instructions}
+
+Always search for recent, credible data. Track all sources used.
+Be realistic in your assessments - don't overestimate market potential.
+"""
+        # Sections are merged field by field, so they always answer natively
+        system_prompt += final_answer_instruction(schema)
+        
+        prompt = ChatPromptTemplate.from_messages([
+            SystemMessage(content=system_prompt),
+            ("human", "{input}"),
+            MessagesPlaceholder(variable_name="agent_scratchpad"),
+        ])
+        section_agent = AgentExecutor(
+            agent=create_structured_functions_agent(
+                llm=self.section_llm,
+                tools=self.tools,
+                prompt=prompt,
+                schema=schema,
+            ),
+            tools=self.tools,
+            verbose=True,
+            max_iterations=settings.RESEARCH_SECTION_MAX_ITERATIONS,
+            max_execution_time=settings.AGENT_TIMEOUT_SECONDS,
+            handle_parsing_errors=True,
+        )
+        self._section_agents[section] = section_agent
+        return section_agent
+    
+    async def _research_section(
+        self,
+        section: str,
+        query: str,
+        callbacks: Optional[List[BaseCallbackHandler]] = None,
+    ) -> BaseModel:
+        """Run one section sub-agent and return its structured result."""
+        schema, _ = RESEARCH_SECTIONS[section]
+        start_time = time.time()
+        status = "failed"
+        try:
+            result = await self._get_section_agent(section).ainvoke(
+                {"input": query}, config={"callbacks": callbacks}
+            )
+            structured = result.get("structured")
+            if structured is None:
+                # Iteration or time limit hit before the schema function was called
+                json_match = re.search(r'\{[\s\S]*\}', result.get("output", ""))
+                if not json_match:
+                    raise ValueError(f"Section {section} returned no structured result")
+                structured = schema.model_validate_json(json_match.group())
+            status = "ok"
+            return structured
+        finally:
+            RESEARCH_SECTION_DURATION.labels(section=section, status=status).observe(
+                time.time() - start_time
+            )
+    
+    async def _research_parallel(
+        self,
+        query: str,
+        on_partial: Optional[Callable[[Dict[str, Any]], Any]] = None,
+        callbacks: Optional[List[BaseCallbackHandler]] = None,
+    ) -> StructuredMarketResearch:
+        """Research every section concurrently and merge the results."""
+        names = list(RESEARCH_SECTIONS)
+        tasks = {
+            name: asyncio.ensure_future(self._research_section(name, query, callbacks))
+            for name in names
+        }
+        if on_partial is not None:
+            tasks[PARTIAL_TRIGGER_SECTION].add_done_callback(
+                lambda _: self._publish_partial(tasks, on_partial)
+            )
+        outcomes = await asyncio.gather(*tasks.values(), return_exceptions=True)
+        
+        sections: Dict[str, Any] = {}
+        for name, outcome in zip(names, outcomes):
+            if isinstance(outcome, Exception):
+                logger.warning(f"Research section {name} failed: {outcome}")
+            else:
+                sections[name] = outcome
+        if not sections:
+            raise RuntimeError("All market research sections failed")
+        
+        return self._merge_sections(sections)
+    
+    @staticmethod
+    def _publish_partial(
+        tasks: Dict[str, "asyncio.Future[BaseModel]"],
+        on_partial: Callable[[Dict[str, Any]], Any],
+    ) -> None:
+        """Hand the sections finished so far to on_partial, in result format."""
+        sections = {
+            name: task.result()
+            for name, task in tasks.items()
+            if task.done() and not task.cancelled() and task.exception() is None
+        }
+        pain_points = sections.get(PARTIAL_TRIGGER_SECTION)
+        if pain_points is None:
+            return
+        competitors = sections.get("competitors")
+        trends = sections.get("trends")
+        
+        try:
+            on_partial({
+                "competitors": (
+                    [comp.model_dump() for comp in competitors.competitors] if competitors else []
+                ),
+                "customer_pain_points": pain_points.customer_pain_points,
+                "unique_value_proposition": pain_points.unique_value_proposition,
+                "market_trends": trends.market_trends if trends else [],
+                "partial_sections": sorted(sections),
+            })
+        except Exception as e:
+            logger.warning(f"Partial research callback failed: {e}")
+    
+    @staticmethod
+    def _merge_sections(sections: Dict[str, Any]) -> StructuredMarketResearch:
+        """Assemble section results into one report; missing sections get defaults."""
+        competitors = sections.get("competitors")
+        sizing = sections.get("market_size")
+        pain_points = sections.get("pain_points")
+        trends = sections.get("trends")
+        
+        sources: List[str] = []
+        for section in sections.values():
+            for source in section.sources:
+                if source not in sources:
+                    sources.append(source)
+        
+        return StructuredMarketResearch(
+            competitors=competitors.competitors if competitors else [],
+            market_size=sizing.market_size if sizing else MarketSize(
+                tam=0,
+                sam=0,
+                som=0,
+                growth_rate=0,
+                source="Unable to determine"
+            ),
+            customer_pain_points=(
+                pain_points.customer_pain_points if pain_points
+                else ["Unable to extract pain points from research"]
+            ),
+            unique_value_proposition=(
+                pain_points.unique_value_proposition if pain_points
+                else "Unable to determine from research"
+            ),
+            market_trends=(
+                trends.market_trends if trends
+                else ["Unable to extract trends from research"]
+            ),
+            # A failed section counts as zero confidence
+            confidence_score=sum(
+                section.confidence_score for section in sections.values()
+            ) / len(RESEARCH_SECTIONS),
+            sources=sources,
+        )
+    
+    async def _parse_structured_output(self, raw_output: str) -> StructuredMarketResearch:
         """Parse the agent's output into structured format."""
         try:
             # First try to extract JSON from the output
             json_match = re.search(r'\{[\s\S]*\}', raw_output)
             if json_match:
                 json_str = json_match.group()
-                return self.output_parser.parse(json_str)
+                parsed = self.output_parser.parse(json_str)
+                STRUCTURED_OUTPUT_RESULTS.labels(agent="market_research", path="regex").inc()
+                return parsed
         except Exception as e:
             logger.warning(f"Failed to parse JSON from output: {e}")
         
@@ -194,11 +464,19 @@ make educated estimates based on similar markets and clearly note they are estim
                 format_instructions=format_instructions
             )
             
-            response = self.structured_llm.invoke(messages)
-            return self.output_parser.parse(response.content)
+            # Async and streamed, so the event loop stays free and an
+            # off-schema response is abandoned as soon as it goes wrong
+            response = await self.structured_llm.ainvoke(
+                messages,
+                config={"callbacks": [PartialSchemaValidator(StructuredMarketResearch)]},
+            )
+            parsed = self.output_parser.parse(response.content)
+            STRUCTURED_OUTPUT_RESULTS.labels(agent="market_research", path="llm_fallback").inc()
+            return parsed
             
         except Exception as e:
             logger.error(f"Failed to structure output: {e}")
+            STRUCTURED_OUTPUT_RESULTS.labels(agent="market_research", path="default").inc()
             # Return a default structure with the raw output
             return StructuredMarketResearch(
                 competitors=[],
@@ -251,6 +529,9 @@ make educated estimates based on similar markets and clearly note they are estim
         business_idea: str,
         target_market: str = None,
         industry: str = None,
+        research_mode: str = None,
+        on_partial: Optional[Callable[[Dict[str, Any]], Any]] = None,
+        callbacks: Optional[List[BaseCallbackHandler]] = None,
     ) -> Dict[str, Any]:
         """
         Conduct market research for a business idea.
@@ -259,6 +540,13 @@ make educated estimates based on similar markets and clearly note they are estim
             business_idea: The business idea to research
             target_market: Optional target market specification
             industry: Optional industry specification
+            research_mode: "sequential" or "parallel"; defaults to
+                settings.MARKET_RESEARCH_MODE
+            on_partial: Called once, in parallel mode only, with the fields
+                experiment generation needs as soon as the pain point section
+                is done and before market sizing finishes
+            callbacks: Callback handlers for the agent run, e.g. to stream
+                tokens and tool steps to clients
             
         Returns:
             Market research results
@@ -273,13 +561,24 @@ make educated estimates based on similar markets and clearly note they are estim
             
             query += "\n\nProvide specific numbers, company names, and actionable insights."
             
-            # Run the agent
-            logger.info(f"Starting market research for: {business_idea}")
-            result = await self.agent.ainvoke({"input": query})
-            raw_output = result.get("output", "")
+            research_mode = ResearchMode(research_mode or settings.MARKET_RESEARCH_MODE)
+            logger.info(f"Starting {research_mode.value} market research for: {business_idea}")
             
-            # Parse and structure the results
-            structured_data = self._parse_structured_output(raw_output)
+            if research_mode == ResearchMode.PARALLEL:
+                # Fan out one sub-agent per section, then merge
+                structured_data = await self._research_parallel(query, on_partial, callbacks)
+                raw_output = structured_data.model_dump_json()
+            else:
+                # Run the agent
+                result = await self.agent.ainvoke({"input": query}, config={"callbacks": callbacks})
+                raw_output = result.get("output", "")
+                
+                # Use the natively structured answer when the agent delivered one
+                structured_data = result.get("structured")
+                if structured_data is not None:
+                    STRUCTURED_OUTPUT_RESULTS.labels(agent="market_research", path="native").inc()
+                else:
+                    structured_data = await self._parse_structured_output(raw_output)
             
             # Convert to schema format
             market_research_result = self._convert_to_schema_format(structured_data)
@@ -293,7 +592,8 @@ make educated estimates based on similar markets and clearly note they are estim
                 "unique_value_proposition": market_research_result.unique_value_proposition,
                 "market_trends": market_research_result.market_trends,
                 "confidence_score": market_research_result.confidence_score,
-                "sources": structured_data.sources
+                "sources": structured_data.sources,
+                "research_mode": research_mode.value
             }
             
         except Exception as e:
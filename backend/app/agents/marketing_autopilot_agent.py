@@ -18,11 +18,20 @@ from langchain.agents import AgentExecutor, create_openai_functions_agent
 from langchain.output_parsers import PydanticOutputParser
 from langchain.prompts import ChatPromptTemplate, MessagesPlaceholder
 from langchain.schema import SystemMessage
+from langchain_core.callbacks import BaseCallbackHandler
 from langchain_core.tools import Tool
-from langchain_openai import ChatOpenAI
 from pydantic import BaseModel, Field
 
+from app.agents.metering import CostMeterHandler
+from app.agents.providers import reset_chat_model, routed_chat_model
+from app.agents.routing import ModelTier
+from app.agents.structured import (
+    PartialSchemaValidator,
+    create_structured_functions_agent,
+    final_answer_instruction,
+)
 from app.core.config import settings
+from app.core.metrics import MARKETING_REFINEMENTS, STRUCTURED_OUTPUT_RESULTS
 from app.schemas.validation import MarketingCampaignResult
 
 logger = logging.getLogger(__name__)
@@ -90,20 +99,22 @@ class MarketingAutopilotAgent:
     
     def __init__(self):
         """Initialize the marketing autopilot agent."""
-        self.llm = ChatOpenAI(
-            model="gpt-4-turbo-preview",
-            temperature=0.7,
-            openai_api_key=settings.OPENAI_API_KEY,
-        )
-        self.structured_llm = ChatOpenAI(
-            model="gpt-4-turbo-preview",
-            temperature=0.3,  # Lower temperature for structured output
-            openai_api_key=settings.OPENAI_API_KEY,
-        )
+        # Charges every call, fallbacks included, to the current validation
+        meter = CostMeterHandler("marketing_autopilot")
+        self.llm = routed_chat_model("marketing_autopilot", ModelTier.REASONING, 0.7, callbacks=[meter])
+        # Only reformats text into JSON
+        self.structured_llm = routed_chat_model("marketing_autopilot", ModelTier.FORMATTING, 0.3, callbacks=[meter])
+        # Rewrites the draft campaigns, so it reasons
+        self.refine_llm = routed_chat_model("marketing_autopilot", ModelTier.REASONING, 0.3, callbacks=[meter])
         self.tools = self._create_tools()
         self.agent = self._create_agent()
         self.output_parser = PydanticOutputParser(pydantic_object=StructuredMarketingCampaigns)
     
+    def reset(self) -> None:
+        """Clear per-run state so a pooled instance can be reused."""
+        for llm in (self.llm, self.structured_llm, self.refine_llm):
+            reset_chat_model(llm)
+    
     def _create_tools(self) -> List[Tool]:
         """Create tools for the agent."""
         tools = []
@@ -264,8 +275,7 @@ class MarketingAutopilotAgent:
     
     def _create_agent(self) -> AgentExecutor:
         """Create the agent executor."""
-        system_message = SystemMessage(
-            content="""You are a marketing strategy expert and growth hacker.
+        system_prompt = """You are a marketing strategy expert and growth hacker.
             
 Your goal is to create comprehensive marketing campaigns based on market research and experiment results. You must:
 
@@ -308,7 +318,9 @@ Base all recommendations on:
 Be specific, actionable, and data-driven in all recommendations.
 Focus on channels and strategies that can show results within 30-60 days.
 """
-        )
+        if settings.AGENT_NATIVE_STRUCTURED_OUTPUT:
+            system_prompt += final_answer_instruction(StructuredMarketingCampaigns)
+        system_message = SystemMessage(content=system_prompt)
         
         prompt = ChatPromptTemplate.from_messages([
             system_message,
@@ -317,11 +329,19 @@ Focus on channels and strategies that can show results within 30-60 days.
             MessagesPlaceholder(variable_name="agent_scratchpad"),
         ])
         
-        agent = create_openai_functions_agent(
-            llm=self.llm,
-            tools=self.tools,
-            prompt=prompt,
-        )
+        if settings.AGENT_NATIVE_STRUCTURED_OUTPUT:
+            agent = create_structured_functions_agent(
+                llm=self.llm,
+                tools=self.tools,
+                prompt=prompt,
+                schema=StructuredMarketingCampaigns,
+            )
+        else:
+            agent = create_openai_functions_agent(
+                llm=self.llm,
+                tools=self.tools,
+                prompt=prompt,
+            )
         
         return AgentExecutor(
             agent=agent,
@@ -332,14 +352,16 @@ Focus on channels and strategies that can show results within 30-60 days.
             handle_parsing_errors=True,
         )
     
-    def _parse_structured_output(self, raw_output: str) -> StructuredMarketingCampaigns:
+    async def _parse_structured_output(self, raw_output: str) -> StructuredMarketingCampaigns:
         """Parse the agent's output into structured format."""
         try:
             # First try to extract JSON from the output
             json_match = re.search(r'\{[\s\S]*\}', raw_output)
             if json_match:
                 json_str = json_match.group()
-                return self.output_parser.parse(json_str)
+                parsed = self.output_parser.parse(json_str)
+                STRUCTURED_OUTPUT_RESULTS.labels(agent="marketing_autopilot", path="regex").inc()
+                return parsed
         except Exception as e:
             logger.warning(f"Failed to parse JSON from output: {e}")
         
@@ -364,11 +386,19 @@ Ensure all recommendations are data-driven and achievable within typical startup
                 format_instructions=format_instructions
             )
             
-            response = self.structured_llm.invoke(messages)
-            return self.output_parser.parse(response.content)
+            # Async and streamed, so the event loop stays free and an
+            # off-schema response is abandoned as soon as it goes wrong
+            response = await self.structured_llm.ainvoke(
+                messages,
+                config={"callbacks": [PartialSchemaValidator(StructuredMarketingCampaigns)]},
+            )
+            parsed = self.output_parser.parse(response.content)
+            STRUCTURED_OUTPUT_RESULTS.labels(agent="marketing_autopilot", path="llm_fallback").inc()
+            return parsed
             
         except Exception as e:
             logger.error(f"Failed to structure output: {e}")
+            STRUCTURED_OUTPUT_RESULTS.labels(agent="marketing_autopilot", path="default").inc()
             # Return a default structure
             return StructuredMarketingCampaigns(
                 ad_campaigns=[],
@@ -435,14 +465,59 @@ Ensure all recommendations are data-driven and achievable within typical startup
             expected_roi=structured_data.expected_roi
         )
     
+    @staticmethod
+    def _experiment_insights(experiment_results: Dict[str, Any]) -> str:
+        """Summarize the experiment fields campaigns build on."""
+        landing_pages = experiment_results.get("landing_pages", [])
+        best_copy = experiment_results.get("copy_variations", [])
+        target_audiences = experiment_results.get("target_audiences", [])
+        predicted_conversion = experiment_results.get("predicted_conversion_rate", 2.0)
+        
+        return f"""- Best Headlines: {', '.join([lp.get('headline', '') for lp in landing_pages[:2]]) if landing_pages else 'Not specified'}
+- Top Performing Copy Tone: {best_copy[0].get('tone', 'Not specified') if best_copy else 'Not specified'}
+- Primary Target Audiences: {', '.join([ta.get('segment_name', '') for ta in target_audiences[:2]]) if target_audiences else 'Not specified'}
+- Predicted Conversion Rate: {predicted_conversion}%
+"""
+    
+    def _to_result(self, raw_output: str, structured_data: StructuredMarketingCampaigns) -> Dict[str, Any]:
+        """Convert structured campaigns to the API result dict."""
+        campaign_result = self._convert_to_schema_format(structured_data)
+        
+        return {
+            "raw_output": raw_output,
+            "ad_campaigns": campaign_result.ad_campaigns,
+            "content_strategy": campaign_result.content_strategy,
+            "channel_recommendations": campaign_result.channel_recommendations,
+            "budget_allocation": campaign_result.budget_allocation,
+            "expected_roi": campaign_result.expected_roi,
+            "total_monthly_budget": structured_data.total_monthly_budget,
+            "expected_monthly_leads": structured_data.expected_monthly_leads,
+            "expected_cac": structured_data.expected_cac,
+            "confidence_score": structured_data.confidence_score,
+            "rationale": structured_data.rationale,
+            # Additional detailed recommendations from structured data
+            "channel_details": [
+                {
+                    "channel": rec.channel,
+                    "priority": rec.priority,
+                    "reasoning": rec.reasoning,
+                    "estimated_reach": rec.estimated_reach,
+                    "estimated_cost": rec.estimated_cost,
+                    "expected_roi": rec.expected_roi
+                }
+                for rec in structured_data.channel_recommendations
+            ]
+        }
+    
     async def generate_campaigns(
         self,
         business_idea: str,
         market_research: Dict[str, Any],
-        experiment_results: Dict[str, Any],
+        experiment_results: Optional[Dict[str, Any]] = None,
         target_market: str = None,
         industry: str = None,
         monthly_budget: float = None,
+        callbacks: Optional[List[BaseCallbackHandler]] = None,
     ) -> Dict[str, Any]:
         """
         Generate marketing campaigns based on market research and experiment results.
@@ -450,10 +525,13 @@ Ensure all recommendations are data-driven and achievable within typical startup
         Args:
             business_idea: The business idea to create campaigns for
             market_research: Market research results
-            experiment_results: Experiment results with winning variations
+            experiment_results: Experiment results with winning variations;
+                omit to draft campaigns from market research alone
             target_market: Optional target market specification
             industry: Optional industry specification
             monthly_budget: Optional monthly budget constraint
+            callbacks: Callback handlers for the agent run, e.g. to stream
+                tokens and tool steps to clients
             
         Returns:
             Marketing campaign results
@@ -465,12 +543,6 @@ Ensure all recommendations are data-driven and achievable within typical startup
             value_prop = market_research.get("unique_value_proposition", "")
             market_trends = market_research.get("market_trends", [])
             
-            # Extract winning experiments
-            landing_pages = experiment_results.get("landing_pages", [])
-            best_copy = experiment_results.get("copy_variations", [])
-            target_audiences = experiment_results.get("target_audiences", [])
-            predicted_conversion = experiment_results.get("predicted_conversion_rate", 2.0)
-            
             # Construct campaign generation query
             query = f"""Create comprehensive marketing campaigns for: {business_idea}
 
@@ -479,14 +551,13 @@ Market Research Insights:
 - Top Pain Points: {', '.join(pain_points[:3]) if pain_points else 'Not specified'}
 - Market Trends: {', '.join(market_trends[:3]) if market_trends else 'Not specified'}
 - Key Competitors: {', '.join([c.get('name', '') for c in competitors[:3]]) if competitors else 'Not specified'}
-
-Winning Experiment Results:
-- Best Headlines: {', '.join([lp.get('headline', '') for lp in landing_pages[:2]]) if landing_pages else 'Not specified'}
-- Top Performing Copy Tone: {best_copy[0].get('tone', 'Not specified') if best_copy else 'Not specified'}
-- Primary Target Audiences: {', '.join([ta.get('segment_name', '') for ta in target_audiences[:2]]) if target_audiences else 'Not specified'}
-- Predicted Conversion Rate: {predicted_conversion}%
 """
             
+            if experiment_results:
+                query += f"""
+Winning Experiment Results:
+{self._experiment_insights(experiment_results)}"""
+            
             if target_market:
                 query += f"\nTarget Market: {target_market}"
             if industry:
@@ -496,10 +567,17 @@ Winning Experiment Results:
             else:
                 query += "\nMonthly Budget: Recommend optimal budget for a startup"
             
-            query += """
+            if experiment_results:
+                query += """
 
 Design campaigns that:
-1. Leverage the winning messages and audiences from experiments
+1. Leverage the winning messages and audiences from experiments"""
+            else:
+                query += """
+
+Experiment results are not available yet. Design campaigns that:
+1. Derive messages and audiences from the value proposition and pain points"""
+            query += """
 2. Focus on channels where our target audience is most active
 3. Maximize ROI within budget constraints
 4. Can show measurable results within 30-60 days
@@ -509,42 +587,82 @@ Provide specific, actionable recommendations with realistic metrics."""
             
             # Run the agent
             logger.info(f"Generating marketing campaigns for: {business_idea}")
-            result = await self.agent.ainvoke({"input": query})
+            result = await self.agent.ainvoke({"input": query}, config={"callbacks": callbacks})
             raw_output = result.get("output", "")
             
-            # Parse and structure the results
-            structured_data = self._parse_structured_output(raw_output)
-            
-            # Convert to schema format
-            campaign_result = self._convert_to_schema_format(structured_data)
+            # Use the natively structured answer when the agent delivered one
+            structured_data = result.get("structured")
+            if structured_data is not None:
+                STRUCTURED_OUTPUT_RESULTS.labels(agent="marketing_autopilot", path="native").inc()
+            else:
+                structured_data = await self._parse_structured_output(raw_output)
             
             # Return as dict for API response
-            return {
-                "raw_output": raw_output,
-                "ad_campaigns": campaign_result.ad_campaigns,
-                "content_strategy": campaign_result.content_strategy,
-                "channel_recommendations": campaign_result.channel_recommendations,
-                "budget_allocation": campaign_result.budget_allocation,
-                "expected_roi": campaign_result.expected_roi,
-                "total_monthly_budget": structured_data.total_monthly_budget,
-                "expected_monthly_leads": structured_data.expected_monthly_leads,
-                "expected_cac": structured_data.expected_cac,
-                "confidence_score": structured_data.confidence_score,
-                "rationale": structured_data.rationale,
-                # Additional detailed recommendations from structured data
-                "channel_details": [
-                    {
-                        "channel": rec.channel,
-                        "priority": rec.priority,
-                        "reasoning": rec.reasoning,
-                        "estimated_reach": rec.estimated_reach,
-                        "estimated_cost": rec.estimated_cost,
-                        "expected_roi": rec.expected_roi
-                    }
-                    for rec in structured_data.channel_recommendations
-                ]
-            }
+            return self._to_result(raw_output, structured_data)
             
         except Exception as e:
             logger.error(f"Marketing campaign generation failed: {str(e)}")
-            raise
\ No newline at end of file
+            raise
+    
+    async def refine_campaigns(
+        self,
+        business_idea: str,
+        draft: Dict[str, Any],
+        experiment_results: Dict[str, Any],
+        callbacks: Optional[List[BaseCallbackHandler]] = None,
+    ) -> Dict[str, Any]:
+        """
+        Fold experiment results into campaigns drafted from research alone.
+        
+        A single structured LLM call with no tools, much cheaper than a full
+        generate_campaigns run. If it fails, the draft is returned unchanged.
+        
+        Args:
+            business_idea: The business idea the campaigns are for
+            draft: Result of generate_campaigns without experiment results
+            experiment_results: Experiment results with winning variations
+            callbacks: Extra callback handlers for the refinement call
+            
+        Returns:
+            Marketing campaign results
+        """
+        prompt = ChatPromptTemplate.from_template(
+            """Refine the marketing plan below for: {business_idea}
+
+The plan was drafted from market research before experiment results were available.
+The experiments have now produced:
+{experiment_insights}
+Update ad copy, key messages, targeting and expected conversion rates to use these
+headlines and audiences. Keep channels, budget and content strategy unless the
+audiences clearly call for a change.
+
+Current Plan:
+{draft}
+
+{format_instructions}
+"""
+        )
+        messages = prompt.format_messages(
+            business_idea=business_idea,
+            experiment_insights=self._experiment_insights(experiment_results),
+            draft=draft.get("raw_output") or json.dumps(draft),
+            format_instructions=self.output_parser.get_format_instructions(),
+        )
+        
+        try:
+            logger.info(f"Refining marketing campaigns for: {business_idea}")
+            response = await self.refine_llm.ainvoke(
+                messages,
+                config={"callbacks": [
+                    PartialSchemaValidator(StructuredMarketingCampaigns),
+                    *(callbacks or []),
+                ]},
+            )
+            structured_data = self.output_parser.parse(response.content)
+        except Exception as e:
+            logger.warning(f"Marketing campaign refinement failed, keeping draft: {e}")
+            MARKETING_REFINEMENTS.labels(result="kept_draft").inc()
+            return draft
+        
+        MARKETING_REFINEMENTS.labels(result="refined").inc()
+        return self._to_result(response.content, structured_data)
@@ -0,0 +1,151 @@
+"""
+LLM cost metering for the ValidateIO agents.
+
+CostMeterHandler is attached to every chat model the agents build, so it
+sees each call - agent steps, research sections and structured output
+fallbacks alike - whoever invokes it. Before a call it estimates the prompt
+tokens and refuses the call if the validation can no longer afford it; after
+the call it charges the tokens used to the validation bound by
+meter_validation() (see app/services/cost_meter.py).
+
+A call is charged when its result names the provider that answered, which
+MultiProviderChatModel sets on every live result; cache hits skip the model
+and are not charged. The usage the API reports is charged when there is one;
+otherwise tokens are counted with tiktoken from the prompt and the output.
+A call that fails is charged for the tokens it streamed before failing.
+"""
+
+from typing import Any, Dict, List, Optional, Tuple
+from uuid import UUID
+
+from langchain_core.callbacks import AsyncCallbackHandler
+
+from app.services.cost_meter import cost_meter
+
+try:
+    import tiktoken
+except ImportError:
+    tiktoken = None
+
+# Rough characters per token when tiktoken is unavailable
+CHARS_PER_TOKEN = 4
+# Per-message overhead of the chat format
+TOKENS_PER_MESSAGE = 4
+
+
+def count_tokens(model: str, text: str) -> int:
+    """Tokens in text for a model; a character-based estimate without tiktoken."""
+    if not text:
+        return 0
+    if tiktoken is None:
+        return len(text) // CHARS_PER_TOKEN + 1
+    try:
+        encoding = tiktoken.encoding_for_model(model)
+    except KeyError:
+        encoding = tiktoken.get_encoding("cl100k_base")
+    return len(encoding.encode(text))
+
+
+def _message_text(message: Any) -> str:
+    content = getattr(message, "content", "")
+    if not isinstance(content, str):
+        content = str(content)
+    function_call = getattr(message, "additional_kwargs", {}).get("function_call") or {}
+    return content + (function_call.get("name") or "") + (function_call.get("arguments") or "")
+
+
+class CostMeterHandler(AsyncCallbackHandler):
+    """Charge one agent's LLM calls to the validation being worked on."""
+
+    # Let BudgetExceeded from the callbacks stop the call
+    raise_error = True
+
+    def __init__(self, agent: str):
+        self.agent = agent
+        # run_id -> model, prompt token estimate and streamed output
+        self._runs: Dict[UUID, Dict[str, Any]] = {}
+
+    async def on_chat_model_start(
+        self,
+        serialized: Dict[str, Any],
+        messages: List[List[Any]],
+        *,
+        run_id: UUID,
+        invocation_params: Optional[Dict[str, Any]] = None,
+        **kwargs: Any,
+    ) -> None:
+        params = invocation_params or kwargs.get("invocation_params") or {}
+        # "model" carries the per-call override of routed models
+        model = params.get("model") or params.get("model_name") or "unknown"
+        tier = (kwargs.get("metadata") or {}).get("llm_tier", "unknown")
+        prompt = "".join(_message_text(message) for batch in messages for message in batch)
+        # Bound function schemas are sent with every call
+        prompt += str(params.get("functions") or params.get("tools") or "")
+        prompt_tokens = count_tokens(model, prompt) + TOKENS_PER_MESSAGE * sum(map(len, messages))
+        self._runs[run_id] = {"model": model, "tier": tier, "prompt_tokens": prompt_tokens, "output": [], "streamed": False}
+        await cost_meter.check_llm_call(model, prompt_tokens)
+
+    async def on_llm_new_token(self, token: str, *, run_id: UUID, **kwargs: Any) -> None:
+        run = self._runs.get(run_id)
+        if run is None:
+            return
+        # Any chunk, even an empty function call delta, means the API was called
+        run["streamed"] = True
+        if not token:
+            chunk = kwargs.get("chunk")
+            message = getattr(chunk, "message", None)
+            function_call = getattr(message, "additional_kwargs", {}).get("function_call") or {}
+            token = (function_call.get("name") or "") + (function_call.get("arguments") or "")
+        if token:
+            run["output"].append(token)
+
+    async def on_llm_end(self, response: Any, *, run_id: UUID, **kwargs: Any) -> None:
+        run = self._runs.pop(run_id, None)
+        llm_output = getattr(response, "llm_output", None) or {}
+        # Set by MultiProviderChatModel on live results only; tool calls on
+        # Anthropic answer without streaming tokens, so tokens are no signal
+        if run is None or not llm_output.get("provider"):
+            return
+        # The provider that answered may serve another model than expected
+        model = llm_output.get("model_name") or run["model"]
+        prompt_tokens, completion_tokens = self._usage(response)
+        if prompt_tokens is None:
+            prompt_tokens = run["prompt_tokens"]
+            # Counted from the result: tool calls may not have been streamed
+            output = "".join(
+                _message_text(generation.message) for generations in response.generations for generation in generations
+            )
+            completion_tokens = count_tokens(model, output)
+        await cost_meter.record_llm(self.agent, model, prompt_tokens, completion_tokens, tier=run["tier"])
+
+    async def on_llm_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any) -> None:
+        run = self._runs.pop(run_id, None)
+        if run is None or not run["streamed"]:
+            return
+        # Tokens streamed before the failure are still billed
+        completion_tokens = count_tokens(run["model"], "".join(run["output"]))
+        await cost_meter.record_llm(
+            self.agent, run["model"], run["prompt_tokens"], completion_tokens, tier=run["tier"]
+        )
+
+    def reset(self) -> None:
+        """Forget calls an aborted run left unfinished, e.g. one refused over budget."""
+        self._runs.clear()
+
+    @staticmethod
+    def _usage(response: Any) -> Tuple[Optional[int], int]:
+        """Token usage reported by the API, if any."""
+        llm_output = getattr(response, "llm_output", None) or {}
+        usage = llm_output.get("token_usage") or {}
+        if usage.get("prompt_tokens"):
+            return usage["prompt_tokens"], usage.get("completion_tokens", 0)
+        # Anthropic reports input and output tokens
+        usage = llm_output.get("usage") or {}
+        if usage.get("input_tokens"):
+            return usage["input_tokens"], usage.get("output_tokens", 0)
+        for generations in getattr(response, "generations", None) or []:
+            for generation in generations:
+                metadata = getattr(getattr(generation, "message", None), "usage_metadata", None)
+                if metadata:
+                    return metadata.get("input_tokens", 0), metadata.get("output_tokens", 0)
+        return None, 0
@@ -0,0 +1,122 @@
+"""
+Per-process agent pool for ValidateIO.
+
+Constructing an agent builds a ChatOpenAI client per sub-call (each with
+its own HTTP connection pool), the tool objects and an AgentExecutor. The
+pool keeps idle instances around so Celery tasks lease a warm agent instead
+of paying that setup cost - and the TLS handshakes that come with it - on every task.
+"""
+
+import logging
+import threading
+from collections import defaultdict
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional
+
+from app.core.metrics import AGENT_POOL_CREATED, AGENT_POOL_REUSED
+
+from .experiment_generator_agent import ExperimentGeneratorAgent
+from .market_research_agent import MarketResearchAgent
+from .marketing_autopilot_agent import MarketingAutopilotAgent
+
+logger = logging.getLogger(__name__)
+
+AGENT_FACTORIES: Dict[str, Callable[[], Any]] = {
+    "market_research": MarketResearchAgent,
+    "experiment_generator": ExperimentGeneratorAgent,
+    "marketing_autopilot": MarketingAutopilotAgent,
+}
+
+
+class AgentPool:
+    """Registry of reusable agent instances, keyed by agent name."""
+
+    def __init__(self, factories: Optional[Dict[str, Callable[[], Any]]] = None):
+        """Initialize an empty pool."""
+        self._factories = factories or AGENT_FACTORIES
+        self._idle: Dict[str, List[Any]] = defaultdict(list)
+        self._lock = threading.Lock()
+        self._created: Dict[str, int] = defaultdict(int)
+        self._reused: Dict[str, int] = defaultdict(int)
+
+    def warm(self, names: Optional[Iterable[str]] = None) -> None:
+        """
+        Construct one idle instance per agent ahead of the first task.
+
+        Args:
+            names: Agents to warm, defaults to every registered agent
+        """
+        for name in names or self._factories:
+            try:
+                agent = self._create(name)
+            except Exception as e:
+                # A missing API key should not take the worker down; the task
+                # will surface the error when it actually needs the agent.
+                logger.warning(f"Could not warm agent '{name}': {e}")
+                continue
+            with self._lock:
+                self._idle[name].append(agent)
+        logger.info(f"Agent pool warmed: {dict(self._created)}")
+
+    def acquire(self, name: str) -> Any:
+        """Take an idle agent from the pool, constructing one if none is idle."""
+        with self._lock:
+            idle = self._idle[name]
+            agent = idle.pop() if idle else None
+            if agent is not None:
+                self._reused[name] += 1
+        if agent is None:
+            return self._create(name)
+        AGENT_POOL_REUSED.labels(agent=name).inc()
+        return agent
+
+    def release(self, name: str, agent: Any) -> None:
+        """Reset an agent's per-run state and return it to the pool."""
+        try:
+            agent.reset()
+        except Exception as e:
+            # An agent that cannot be reset is dropped rather than reused.
+            logger.warning(f"Discarding agent '{name}' after failed reset: {e}")
+            return
+        with self._lock:
+            self._idle[name].append(agent)
+
+    @contextmanager
+    def lease(self, name: str) -> Iterator[Any]:
+        """Context manager that acquires an agent and always releases it."""
+        agent = self.acquire(name)
+        try:
+            yield agent
+        finally:
+            self.release(name, agent)
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        """Return created/reused/idle counts per agent."""
+        with self._lock:
+            return {
+                name: {
+                    "created": self._created[name],
+                    "reused": self._reused[name],
+                    "idle": len(self._idle[name]),
+                }
+                for name in self._factories
+            }
+
+    def clear(self) -> None:
+        """Drop every idle instance."""
+        with self._lock:
+            self._idle.clear()
+
+    def _create(self, name: str) -> Any:
+        """Construct a new agent instance and record it."""
+        if name not in self._factories:
+            raise KeyError(f"Unknown agent: {name}")
+        agent = self._factories[name]()
+        with self._lock:
+            self._created[name] += 1
+        AGENT_POOL_CREATED.labels(agent=name).inc()
+        return agent
+
+
+# Global agent pool for this process
+agent_pool = AgentPool()
@@ -0,0 +1,519 @@
+"""
+LLM providers behind the ValidateIO agents.
+
+The agents talk to one chat model per sub-call, built by routed_chat_model().
+Underneath, MultiProviderChatModel sends each call to OpenAI or Anthropic:
+- providers are tried in LLM_PROVIDERS order, healthy ones first; a provider
+  whose success rate (an EWMA over its calls in this process) drops below
+  LLM_PROVIDER_MIN_HEALTH is skipped until LLM_PROVIDER_COOLDOWN_SECONDS
+  after its last failure
+- calls wait for capacity under the fleet-wide provider rate limits
+  (app/services/rate_limiter.py) instead of running into 429s
+- a call that fails before its first token fails over to the next provider;
+  request timeouts are short (LLM_REQUEST_TIMEOUT_SECONDS) so a stalled
+  provider is abandoned long before the agent's own timeout
+- with LLM_HEDGING_ENABLED, if the first provider has not responded by the
+  p90 of its recent response times, the same call is also sent to the next
+  one; whichever responds first is streamed and the other is cancelled
+
+Agents are written against OpenAI function calling, so Anthropic calls are
+translated: functions become tools, and tool calls in the reply become a
+function_call again.
+
+Callbacks, the LLM cache and the model router (app/agents/routing.py) all
+work at this level, so the provider that answers is invisible to the agents.
+"""
+
+import asyncio
+import json
+import logging
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+from langchain_core.callbacks import (
+    AsyncCallbackHandler,
+    AsyncCallbackManagerForLLMRun,
+    BaseCallbackHandler,
+    CallbackManagerForLLMRun,
+)
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, BaseMessage, FunctionMessage, ToolMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+from langchain_openai import ChatOpenAI
+
+from app.agents.llm_cache import build_llm_cache
+from app.agents.metering import count_tokens
+from app.agents.routing import ModelTier, TierLatencyHandler, model_router, tier_model
+from app.core.config import settings
+from app.core.metrics import (
+    LLM_FAILOVERS,
+    LLM_HEDGES,
+    LLM_PROVIDER_CALLS,
+    LLM_PROVIDER_HEALTH,
+    LLM_PROVIDER_RESPONSE_TIME,
+)
+from app.services.cost_meter import EXPECTED_COMPLETION_TOKENS, cost_meter
+from app.services.rate_limiter import provider_limiter
+
+try:
+    from langchain_anthropic import ChatAnthropic
+except ImportError:
+    ChatAnthropic = None
+
+logger = logging.getLogger(__name__)
+
+# Weight of the latest call in a provider's health score
+HEALTH_EWMA_ALPHA = 0.2
+# Response times kept per provider for the hedging delay
+RESPONSE_TIME_SAMPLES = 200
+
+
+@dataclass
+class ProviderHealth:
+    """Health of one provider as seen by this process."""
+
+    score: float = 1.0  # EWMA of call success, 1.0 = every call succeeded
+    failed_at: float = 0.0
+    response_times: Deque[float] = field(default_factory=lambda: deque(maxlen=RESPONSE_TIME_SAMPLES))
+
+    def record(self, provider: str, ok: bool) -> None:
+        self.score += HEALTH_EWMA_ALPHA * ((1.0 if ok else 0.0) - self.score)
+        if not ok:
+            self.failed_at = time.monotonic()
+        LLM_PROVIDER_HEALTH.labels(provider=provider).set(self.score)
+
+    def available(self) -> bool:
+        """Whether calls should go to this provider; unhealthy ones get a retry after the cooldown."""
+        return (
+            self.score >= settings.LLM_PROVIDER_MIN_HEALTH
+            or time.monotonic() - self.failed_at >= settings.LLM_PROVIDER_COOLDOWN_SECONDS
+        )
+
+    def hedge_delay(self) -> float:
+        """Seconds to wait for a response before hedging: the p90 response time."""
+        if len(self.response_times) < settings.LLM_LATENCY_MIN_SAMPLES:
+            return settings.LLM_HEDGE_DEFAULT_DELAY_SECONDS
+        ordered = sorted(self.response_times)
+        return ordered[int(0.9 * (len(ordered) - 1))]
+
+
+# provider -> health, shared by every chat model in the process
+provider_health: Dict[str, ProviderHealth] = {}
+
+
+def _health(provider: str) -> ProviderHealth:
+    health = provider_health.get(provider)
+    if health is None:
+        health = provider_health[provider] = ProviderHealth()
+    return health
+
+
+class _LostRace(Exception):
+    """Raised into a hedged call when the other provider responded first."""
+
+
+class _Race:
+    """Streams the tokens of whichever provider responds first to the real run."""
+
+    def __init__(self, run_manager: Optional[AsyncCallbackManagerForLLMRun]):
+        self.run_manager = run_manager
+        self.started_at = time.monotonic()
+        self.winner: Optional[str] = None
+        self.claimed = asyncio.Event()
+        # Error raised by the caller's callbacks, e.g. an off-schema abort
+        self.callback_error: Optional[BaseException] = None
+
+    def claim(self, provider: str) -> bool:
+        """Make provider the winner if nobody responded yet; whether it is the winner."""
+        if self.winner is None:
+            self.winner = provider
+            self.claimed.set()
+            response_time = time.monotonic() - self.started_at
+            _health(provider).response_times.append(response_time)
+            LLM_PROVIDER_RESPONSE_TIME.labels(provider=provider).observe(response_time)
+        return self.winner == provider
+
+    def run_manager_for(self, provider: str) -> Optional[AsyncCallbackManagerForLLMRun]:
+        if self.run_manager is None:
+            return None
+        return AsyncCallbackManagerForLLMRun(
+            run_id=self.run_manager.run_id,
+            handlers=[_RaceHandler(self, provider)],
+            inheritable_handlers=[],
+        )
+
+
+class _RaceHandler(AsyncCallbackHandler):
+    """Forward one provider's tokens to the real run while it is winning."""
+
+    raise_error = True
+
+    def __init__(self, race: _Race, provider: str):
+        self.race = race
+        self.provider = provider
+
+    async def on_llm_new_token(self, token: str, *, chunk: Any = None, **kwargs: Any) -> None:
+        if not self.race.claim(self.provider):
+            raise _LostRace()
+        try:
+            await self.race.run_manager.on_llm_new_token(token, chunk=chunk)
+        except Exception as e:
+            self.race.callback_error = e
+            raise
+
+
+def _to_anthropic(
+    messages: List[BaseMessage],
+    kwargs: Dict[str, Any],
+) -> Tuple[List[BaseMessage], Dict[str, Any]]:
+    """Translate an OpenAI function calling request to Anthropic tools."""
+    kwargs = dict(kwargs)
+    functions = kwargs.pop("functions", None)
+    function_call = kwargs.pop("function_call", None)
+    if functions:
+        kwargs["tools"] = [
+            {
+                "name": function["name"],
+                "description": function.get("description", ""),
+                "input_schema": function.get("parameters") or {"type": "object", "properties": {}},
+            }
+            for function in functions
+        ]
+        if isinstance(function_call, dict) and function_call.get("name"):
+            kwargs["tool_choice"] = {"type": "tool", "name": function_call["name"]}
+
+    translated: List[BaseMessage] = []
+    call_ids: List[str] = []
+    for message in messages:
+        call = message.additional_kwargs.get("function_call") if isinstance(message, AIMessage) else None
+        if call:
+            call_ids.append(f"call_{len(call_ids)}")
+            translated.append(AIMessage(
+                content=message.content,
+                tool_calls=[{
+                    "name": call["name"],
+                    "args": json.loads(call.get("arguments") or "{}"),
+                    "id": call_ids[-1],
+                }],
+            ))
+        elif isinstance(message, FunctionMessage):
+            translated.append(ToolMessage(
+                content=message.content,
+                tool_call_id=call_ids[-1] if call_ids else message.name,
+            ))
+        else:
+            translated.append(message)
+    return translated, kwargs
+
+
+def _from_anthropic(result: ChatResult) -> ChatResult:
+    """Turn Anthropic tool calls in a reply into the function_call the agents parse."""
+    generations = []
+    for generation in result.generations:
+        message = generation.message
+        content = message.content
+        if not isinstance(content, str):
+            content = "".join(
+                block.get("text", "") if isinstance(block, dict) else str(block) for block in content
+            )
+        additional_kwargs = dict(message.additional_kwargs)
+        tool_calls = getattr(message, "tool_calls", None) or []
+        if tool_calls:
+            additional_kwargs["function_call"] = {
+                "name": tool_calls[0]["name"],
+                "arguments": json.dumps(tool_calls[0]["args"]),
+            }
+        generations.append(ChatGeneration(
+            message=AIMessage(
+                content=content,
+                additional_kwargs=additional_kwargs,
+                usage_metadata=getattr(message, "usage_metadata", None),
+            ),
+            generation_info=generation.generation_info,
+        ))
+    return ChatResult(generations=generations, llm_output=result.llm_output)
+
+
+class MultiProviderChatModel(BaseChatModel):
+    """Chat model that fails over and hedges between providers."""
+
+    agent: str
+    tier: ModelTier = ModelTier.REASONING
+    temperature: float = 0.7
+    # provider name -> chat model; created without callbacks or cache
+    providers: Dict[str, Any]
+
+    @property
+    def _llm_type(self) -> str:
+        return "validateio-multi-provider"
+
+    @property
+    def _identifying_params(self) -> Dict[str, Any]:
+        return {"tier": self.tier.value, "temperature": self.temperature, "providers": list(self.providers)}
+
+    def provider_order(self) -> List[str]:
+        """Providers to try, configured order with unavailable ones last."""
+        configured = [
+            name.strip() for name in settings.LLM_PROVIDERS.split(",") if name.strip() in self.providers
+        ] or list(self.providers)
+        return sorted(configured, key=lambda name: not _health(name).available())
+
+    def generate(
+        self, messages: Any, stop: Optional[List[str]] = None, callbacks: Any = None, **kwargs: Any
+    ):
+        provider = self.provider_order()[0]
+        tier = model_router.route_sync(self.tier, provider)
+        kwargs.setdefault("llm_tier", tier.value)
+        kwargs.setdefault("model", tier_model(tier, provider))
+        return super().generate(messages, stop, callbacks, **kwargs)
+
+    async def agenerate(
+        self, messages: Any, stop: Optional[List[str]] = None, callbacks: Any = None, **kwargs: Any
+    ):
+        # Routed before the callbacks start, so metering and the cache key see the model
+        provider = self.provider_order()[0]
+        tier = await model_router.route(self.tier, provider)
+        kwargs.setdefault("llm_tier", tier.value)
+        kwargs.setdefault("model", tier_model(tier, provider))
+        return await super().agenerate(messages, stop, callbacks, **kwargs)
+
+    def _generate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[CallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        """Sync calls fail over between providers but are never hedged."""
+        tier = ModelTier(kwargs.pop("llm_tier", self.tier.value))
+        kwargs.pop("model", None)
+        error: Optional[Exception] = None
+        for provider in self.provider_order():
+            call_messages, call_kwargs = self._prepare(provider, messages, kwargs)
+            model = tier_model(tier, provider)
+            provider_limiter.acquire_sync(provider, model, self._expected_tokens(model, messages))
+            try:
+                result = self.providers[provider]._generate(
+                    call_messages, stop=stop, run_manager=run_manager, model=model, **call_kwargs
+                )
+            except Exception as e:
+                self._record_failure(provider, e)
+                error = e
+                continue
+            _health(provider).record(provider, ok=True)
+            LLM_PROVIDER_CALLS.labels(provider=provider, result="ok").inc()
+            return self._finish(provider, model, result)
+        raise error
+
+    async def _agenerate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[AsyncCallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        tier = ModelTier(kwargs.pop("llm_tier", self.tier.value))
+        kwargs.pop("model", None)
+        remaining = self.provider_order()
+        race = _Race(run_manager)
+        calls: Dict[str, asyncio.Task[ChatResult]] = {}
+        hedge_at = (
+            time.monotonic() + _health(remaining[0]).hedge_delay()
+            if settings.LLM_HEDGING_ENABLED
+            else None
+        )
+
+        def launch() -> str:
+            provider = remaining.pop(0)
+            calls[provider] = asyncio.ensure_future(
+                self._acall(provider, tier, race, messages, stop, kwargs)
+            )
+            return provider
+
+        primary = launch()
+        error: Optional[BaseException] = None
+        try:
+            while race.winner is None:
+                running = [call for call in calls.values() if not call.done()]
+                if not running:
+                    # Everything launched failed before responding
+                    if not remaining:
+                        raise error
+                    LLM_FAILOVERS.labels(from_provider=primary, to_provider=remaining[0]).inc()
+                    logger.warning(f"LLM provider {primary} failed ({error}), failing over to {remaining[0]}")
+                    primary = launch()
+                    continue
+                timeout = None
+                if hedge_at is not None and remaining:
+                    timeout = max(0.0, hedge_at - time.monotonic())
+                claimed = asyncio.ensure_future(race.claimed.wait())
+                done, _ = await asyncio.wait(
+                    [*running, claimed], timeout=timeout, return_when=asyncio.FIRST_COMPLETED
+                )
+                claimed.cancel()
+                for call in done:
+                    if call is not claimed and call.exception() is not None and race.winner is None:
+                        error = call.exception()
+                if not done and hedge_at is not None and remaining:
+                    # The primary is slower than its p90: race the next provider
+                    LLM_HEDGES.labels(result="fired").inc()
+                    launch()
+                    hedge_at = None
+            if len(calls) > 1:
+                LLM_HEDGES.labels(result="won_by_hedge" if race.winner != primary else "won_by_primary").inc()
+            # Stop the loser now rather than when the winner finishes streaming
+            losers = [provider for provider in calls if provider != race.winner]
+            await self._cancel(calls, losers, tier, messages)
+            return await calls[race.winner]
+        finally:
+            await self._cancel(calls, list(calls), tier, messages)
+
+    def _prepare(
+        self,
+        provider: str,
+        messages: List[BaseMessage],
+        kwargs: Dict[str, Any],
+    ) -> Tuple[List[BaseMessage], Dict[str, Any]]:
+        if provider == "anthropic":
+            return _to_anthropic(messages, kwargs)
+        return messages, dict(kwargs)
+
+    async def _acall(
+        self,
+        provider: str,
+        tier: ModelTier,
+        race: _Race,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]],
+        kwargs: Dict[str, Any],
+    ) -> ChatResult:
+        call_messages, call_kwargs = self._prepare(provider, messages, kwargs)
+        model = tier_model(tier, provider)
+        # Wait for fleet-wide capacity rather than collect a 429
+        await provider_limiter.acquire(provider, model, self._expected_tokens(model, messages))
+        try:
+            result = await self.providers[provider]._agenerate(
+                call_messages,
+                stop=stop,
+                run_manager=race.run_manager_for(provider),
+                model=model,
+                **call_kwargs,
+            )
+        except (asyncio.CancelledError, _LostRace):
+            LLM_PROVIDER_CALLS.labels(provider=provider, result="cancelled").inc()
+            raise
+        except Exception as e:
+            if race.callback_error is not None:
+                # Aborted by the caller's callbacks, not the provider's fault
+                raise
+            self._record_failure(provider, e)
+            raise
+        _health(provider).record(provider, ok=True)
+        LLM_PROVIDER_CALLS.labels(provider=provider, result="ok").inc()
+        if not race.claim(provider):
+            raise _LostRace()
+        return self._finish(provider, model, result)
+
+    @staticmethod
+    def _expected_tokens(model: str, messages: List[BaseMessage]) -> int:
+        """Tokens a call is expected to use, for the tokens-per-minute limit."""
+        prompt = "".join(str(message.content) for message in messages)
+        return count_tokens(model, prompt) + EXPECTED_COMPLETION_TOKENS
+
+    @staticmethod
+    def _record_failure(provider: str, error: Exception) -> None:
+        _health(provider).record(provider, ok=False)
+        LLM_PROVIDER_CALLS.labels(provider=provider, result="error").inc()
+        logger.warning(f"LLM provider {provider} call failed: {error}")
+
+    @staticmethod
+    def _finish(provider: str, model: str, result: ChatResult) -> ChatResult:
+        if provider == "anthropic":
+            result = _from_anthropic(result)
+        # Callbacks read the model that answered from here
+        result.llm_output = {**(result.llm_output or {}), "model_name": model, "provider": provider}
+        return result
+
+    async def _cancel(
+        self,
+        calls: Dict[str, "asyncio.Task[ChatResult]"],
+        providers: List[str],
+        tier: ModelTier,
+        messages: List[BaseMessage],
+    ) -> None:
+        """Cancel the given providers' calls, charging the prompt of those still running."""
+        for provider in providers:
+            call = calls.pop(provider)
+            if not call.done():
+                call.cancel()
+                await self._charge_cancelled(provider, tier, messages)
+
+    async def _charge_cancelled(self, provider: str, tier: ModelTier, messages: List[BaseMessage]) -> None:
+        """A cancelled call still consumed its prompt."""
+        model = tier_model(tier, provider)
+        prompt_tokens = self._expected_tokens(model, messages) - EXPECTED_COMPLETION_TOKENS
+        try:
+            await cost_meter.record_llm(self.agent, model, prompt_tokens, 0, tier=tier.value)
+        except Exception as e:
+            logger.warning(f"Failed to charge cancelled {provider} call: {e}")
+
+
+def _provider_models(temperature: float, tier: ModelTier) -> Dict[str, Any]:
+    providers: Dict[str, Any] = {
+        "openai": ChatOpenAI(
+            model=tier_model(tier, "openai"),
+            temperature=temperature,
+            openai_api_key=settings.OPENAI_API_KEY,
+            streaming=True,
+            request_timeout=settings.LLM_REQUEST_TIMEOUT_SECONDS,
+            # Fail over instead of retrying a struggling provider
+            max_retries=settings.LLM_PROVIDER_MAX_RETRIES,
+        ),
+    }
+    if ChatAnthropic is not None and settings.ANTHROPIC_API_KEY:
+        providers["anthropic"] = ChatAnthropic(
+            model=tier_model(tier, "anthropic"),
+            temperature=temperature,
+            anthropic_api_key=settings.ANTHROPIC_API_KEY,
+            streaming=True,
+            max_tokens=settings.LLM_ANTHROPIC_MAX_TOKENS,
+            default_request_timeout=settings.LLM_REQUEST_TIMEOUT_SECONDS,
+            max_retries=settings.LLM_PROVIDER_MAX_RETRIES,
+        )
+    return providers
+
+
+def routed_chat_model(
+    agent: str,
+    tier: ModelTier,
+    temperature: float,
+    callbacks: Optional[List[BaseCallbackHandler]] = None,
+) -> BaseChatModel:
+    """
+    Build the chat model for one of an agent's sub-calls.
+
+    Args:
+        agent: Agent name, for the LLM cache and cost metrics
+        tier: Tier the sub-call declares
+        temperature: Sampling temperature
+        callbacks: Handlers for every call, e.g. cost metering
+    """
+    return MultiProviderChatModel(
+        agent=agent,
+        tier=tier,
+        temperature=temperature,
+        providers=_provider_models(temperature, tier),
+        cache=build_llm_cache(agent, temperature),
+        callbacks=[*(callbacks or []), TierLatencyHandler(tier)],
+        metadata={"llm_tier": tier.value},
+    )
+
+
+def reset_chat_model(model: BaseChatModel) -> None:
+    """Clear the per-run state of a routed chat model's handlers before the model is reused."""
+    for handler in model.callbacks or []:
+        reset = getattr(handler, "reset", None)
+        if reset is not None:
+            reset()
@@ -0,0 +1,172 @@
+"""
+Model tiering for the ValidateIO agents.
+
+Each LLM sub-call an agent makes declares a tier rather than a model:
+- reasoning: the main agent loop, where answer quality matters most
+- tools: research section sub-agents, which mostly pick searches
+- formatting: structured output fallbacks reformatting text into JSON
+
+ModelRouter picks the tier a call actually runs at, and each provider maps
+it to the model configured for it (LLM_MODEL_<TIER> for OpenAI,
+LLM_ANTHROPIC_MODEL_<TIER> for Anthropic). A call falls down to the next
+tier when
+- the tier's model is breaching its latency SLO in this process: the p90 of
+  its calls over the last LLM_LATENCY_WINDOW_SECONDS is above
+  LLM_LATENCY_SLO_<TIER>_SECONDS; the tier recovers once slow samples age out
+- the validation being worked on has spent BUDGET_DOWNGRADE_RATIO of its
+  budget (see app/services/cost_meter.py)
+
+The chat models routed this way are built by routed_chat_model() in
+app/agents/providers.py.
+"""
+
+import logging
+import time
+from collections import defaultdict, deque
+from enum import Enum
+from typing import Any, Deque, Dict, List, Optional, Tuple
+from uuid import UUID
+
+from langchain_core.callbacks import BaseCallbackHandler
+
+from app.core.config import settings
+from app.core.metrics import LLM_TIER_DOWNGRADES, LLM_TIER_LATENCY, LLM_TIER_REQUESTS
+from app.services.cost_meter import BudgetExceeded, cost_meter
+
+logger = logging.getLogger(__name__)
+
+
+class ModelTier(str, Enum):
+    REASONING = "reasoning"
+    TOOLS = "tools"
+    FORMATTING = "formatting"
+
+
+# Downgrade order, most capable first
+TIER_ORDER = [ModelTier.REASONING, ModelTier.TOOLS, ModelTier.FORMATTING]
+
+
+# Settings naming each provider's model for a tier
+PROVIDER_MODEL_SETTINGS = {
+    "openai": "LLM_MODEL_{tier}",
+    "anthropic": "LLM_ANTHROPIC_MODEL_{tier}",
+}
+
+
+def tier_model(tier: ModelTier, provider: str = "openai") -> str:
+    """Model a provider serves a tier with."""
+    return getattr(settings, PROVIDER_MODEL_SETTINGS[provider].format(tier=tier.name))
+
+
+def tier_latency_slo(tier: ModelTier) -> float:
+    """Latency SLO of a tier's calls in seconds."""
+    return getattr(settings, f"LLM_LATENCY_SLO_{tier.name}_SECONDS")
+
+
+class ModelRouter:
+    """Picks the model for each LLM call from its tier, latency and budget."""
+
+    def __init__(self):
+        """Initialize empty latency windows."""
+        # model -> (finished_at, seconds) of recent calls in this process
+        self._latencies: Dict[str, Deque[Tuple[float, float]]] = defaultdict(deque)
+
+    def observe(self, model: str, seconds: float) -> None:
+        """Record how long a call to a model took."""
+        self._latencies[model].append((time.monotonic(), seconds))
+
+    def p90(self, model: str) -> Optional[float]:
+        """p90 latency of a model's recent calls, or None with too few samples."""
+        samples = self._latencies[model]
+        cutoff = time.monotonic() - settings.LLM_LATENCY_WINDOW_SECONDS
+        while samples and samples[0][0] < cutoff:
+            samples.popleft()
+        if len(samples) < settings.LLM_LATENCY_MIN_SAMPLES:
+            return None
+        ordered = sorted(seconds for _, seconds in samples)
+        return ordered[int(0.9 * (len(ordered) - 1))]
+
+    def route_sync(
+        self,
+        tier: ModelTier,
+        provider: str = "openai",
+        budget_pressure: float = 0.0,
+    ) -> ModelTier:
+        """Tier a call declared at the given tier runs at on a provider."""
+        if not settings.LLM_ROUTING_ENABLED:
+            return tier
+        index = TIER_ORDER.index(tier)
+        if budget_pressure >= settings.BUDGET_DOWNGRADE_RATIO and index < len(TIER_ORDER) - 1:
+            LLM_TIER_DOWNGRADES.labels(tier=tier.value, reason="budget").inc()
+            index += 1
+        # Fall down while the candidate is breaching its own SLO
+        while index < len(TIER_ORDER) - 1:
+            candidate = TIER_ORDER[index]
+            p90 = self.p90(tier_model(candidate, provider))
+            if p90 is None or p90 <= tier_latency_slo(candidate):
+                break
+            LLM_TIER_DOWNGRADES.labels(tier=candidate.value, reason="latency").inc()
+            index += 1
+        routed = TIER_ORDER[index]
+        LLM_TIER_REQUESTS.labels(tier=tier.value, model=tier_model(routed, provider)).inc()
+        return routed
+
+    async def route(self, tier: ModelTier, provider: str = "openai") -> ModelTier:
+        """route_sync, also downgrading when the current validation's budget is nearly spent."""
+        return self.route_sync(tier, provider, await cost_meter.current_budget_pressure())
+
+
+# Global router instance for this process
+model_router = ModelRouter()
+
+
+class TierLatencyHandler(BaseCallbackHandler):
+    """Feed the duration of a tier's live calls to the router and the tier metrics."""
+
+    # Bookkeeping only; no need to hop to a thread from async runs
+    run_inline = True
+
+    def __init__(self, tier: ModelTier):
+        self.tier = tier
+        # run_id -> (model, started_at)
+        self._runs: Dict[UUID, Tuple[str, float]] = {}
+
+    def on_chat_model_start(
+        self,
+        serialized: Dict[str, Any],
+        messages: List[List[Any]],
+        *,
+        run_id: UUID,
+        invocation_params: Optional[Dict[str, Any]] = None,
+        **kwargs: Any,
+    ) -> None:
+        params = invocation_params or kwargs.get("invocation_params") or {}
+        model = params.get("model") or params.get("model_name") or "unknown"
+        self._runs[run_id] = (model, time.monotonic())
+
+    def on_llm_end(self, response: Any, *, run_id: UUID, **kwargs: Any) -> None:
+        run = self._runs.pop(run_id, None)
+        llm_output = getattr(response, "llm_output", None) or {}
+        # Only live results name the provider (MultiProviderChatModel._finish);
+        # cache hits say nothing about the model's latency
+        if run is None or not llm_output.get("provider"):
+            return
+        # The provider that answered may serve another model than expected
+        self._observe(llm_output.get("model_name") or run[0], run[1])
+
+    def on_llm_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any) -> None:
+        run = self._runs.pop(run_id, None)
+        # Failed and timed out calls count against the SLO too; a call
+        # refused over budget never reached a model
+        if run is None or isinstance(error, BudgetExceeded):
+            return
+        self._observe(*run)
+
+    def reset(self) -> None:
+        """Forget calls an aborted run left unfinished, e.g. one refused over budget."""
+        self._runs.clear()
+
+    def _observe(self, model: str, started_at: float) -> None:
+        seconds = time.monotonic() - started_at
+        model_router.observe(model, seconds)
+        LLM_TIER_LATENCY.labels(tier=self.tier.value, model=model).observe(seconds)
@@ -0,0 +1,137 @@
+"""
+Live agent output for ValidateIO clients.
+
+ValidationEventHandler is a LangChain callback handler that forwards what an
+agent is doing to the validation's event channel: streamed LLM tokens
+(including the arguments of a function call as they are generated) and
+tool calls. Tokens are buffered per LLM run and flushed at most every
+STREAM_TOKEN_FLUSH_SECONDS, so a busy generation costs a handful of Redis
+publishes per second rather than one per token.
+
+StageProgressHandler turns the same callbacks into step-level progress
+reports (see app/tasks/progress.py).
+"""
+
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+from uuid import UUID
+
+from langchain_core.callbacks import AsyncCallbackHandler
+
+from app.core.config import settings
+from app.services.validation_events import publish_event
+
+# Tool inputs are echoed to clients; keep them short
+TOOL_INPUT_PREVIEW_CHARS = 200
+
+
+class ValidationEventHandler(AsyncCallbackHandler):
+    """Publish one stage's tokens and tool steps to its validation's channel."""
+
+    def __init__(self, validation_id: str, stage: str):
+        self.validation_id = validation_id
+        self.stage = stage
+        self._buffers: Dict[UUID, List[str]] = {}
+        self._tools: Dict[UUID, str] = {}
+        self._last_flush = time.monotonic()
+
+    async def _flush(self, run_id: Optional[UUID] = None) -> None:
+        """Publish buffered tokens for one run, or for every run."""
+        run_ids = [run_id] if run_id is not None else list(self._buffers)
+        for buffered_run in run_ids:
+            chunks = self._buffers.pop(buffered_run, None)
+            if chunks:
+                await publish_event(
+                    self.validation_id,
+                    "token",
+                    stage=self.stage,
+                    run_id=str(buffered_run),
+                    text="".join(chunks),
+                )
+        self._last_flush = time.monotonic()
+
+    async def on_llm_new_token(self, token: str, *, run_id: UUID, **kwargs: Any) -> None:
+        if not token:
+            # Function call deltas arrive with empty content
+            chunk = kwargs.get("chunk")
+            message = getattr(chunk, "message", None)
+            function_call = getattr(message, "additional_kwargs", {}).get("function_call") or {}
+            token = function_call.get("arguments") or ""
+            if not token:
+                return
+        self._buffers.setdefault(run_id, []).append(token)
+        if time.monotonic() - self._last_flush >= settings.STREAM_TOKEN_FLUSH_SECONDS:
+            await self._flush()
+
+    async def on_llm_end(self, response: Any, *, run_id: UUID, **kwargs: Any) -> None:
+        await self._flush(run_id)
+
+    async def on_llm_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any) -> None:
+        self._buffers.pop(run_id, None)
+
+    async def on_tool_start(
+        self,
+        serialized: Dict[str, Any],
+        input_str: str,
+        *,
+        run_id: UUID,
+        **kwargs: Any,
+    ) -> None:
+        name = (serialized or {}).get("name") or kwargs.get("name") or "tool"
+        self._tools[run_id] = name
+        await publish_event(
+            self.validation_id,
+            "tool",
+            stage=self.stage,
+            tool=name,
+            status="started",
+            input=input_str[:TOOL_INPUT_PREVIEW_CHARS],
+        )
+
+    async def on_tool_end(self, output: Any, *, run_id: UUID, **kwargs: Any) -> None:
+        await publish_event(
+            self.validation_id,
+            "tool",
+            stage=self.stage,
+            tool=self._tools.pop(run_id, "tool"),
+            status="completed",
+        )
+
+    async def on_tool_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any) -> None:
+        await publish_event(
+            self.validation_id,
+            "tool",
+            stage=self.stage,
+            tool=self._tools.pop(run_id, "tool"),
+            status="failed",
+            error=str(error),
+        )
+
+
+class StageProgressHandler(AsyncCallbackHandler):
+    """Report a step of progress for every finished LLM call and tool call."""
+
+    def __init__(self, report: Callable[[str, int], Awaitable[None]], label: str):
+        """
+        Args:
+            report: Coroutine taking a description and the steps completed
+            label: Stage name used in descriptions, e.g. "Market research"
+        """
+        self.report = report
+        self.label = label
+
+    async def on_llm_start(self, serialized: Dict[str, Any], prompts: List[str], **kwargs: Any) -> None:
+        await self.report(f"{self.label}: analyzing", 0)
+
+    async def on_chat_model_start(self, serialized: Dict[str, Any], messages: List[Any], **kwargs: Any) -> None:
+        await self.report(f"{self.label}: analyzing", 0)
+
+    async def on_llm_end(self, response: Any, **kwargs: Any) -> None:
+        await self.report(f"{self.label}: analysis step complete", 1)
+
+    async def on_tool_start(self, serialized: Dict[str, Any], input_str: str, **kwargs: Any) -> None:
+        name = (serialized or {}).get("name") or kwargs.get("name") or "tool"
+        await self.report(f'{self.label}: {name} "{input_str[:TOOL_INPUT_PREVIEW_CHARS]}"', 0)
+
+    async def on_tool_end(self, output: Any, **kwargs: Any) -> None:
+        await self.report(f"{self.label}: tool call complete", 1)
@@ -0,0 +1,157 @@
+"""
+Native structured output for ValidateIO agents.
+
+By default an agent finishes with free text, which _parse_structured_output
+then has to regex for JSON and, when that fails, send through a second LLM
+call to reformat. Here the result schema is offered to the model as one more
+function next to the tools. When the agent calls that function, its
+validated arguments become the agent's final answer - no second call needed.
+
+When the fallback reformatting call does run, PartialSchemaValidator checks
+the JSON as it streams in, so a response going off-schema is abandoned early
+instead of after the full generation.
+"""
+
+import logging
+from typing import Any, Callable, Dict, Optional, Sequence, Type
+
+from langchain.agents.format_scratchpad.openai_functions import (
+    format_to_openai_function_messages,
+)
+from langchain.agents.output_parsers.openai_functions import (
+    OpenAIFunctionsAgentOutputParser,
+)
+from langchain_core.agents import AgentFinish
+from langchain_core.callbacks import AsyncCallbackHandler
+from langchain_core.exceptions import OutputParserException
+from langchain_core.language_models import BaseLanguageModel
+from langchain_core.messages import AIMessage
+from langchain_core.prompts import ChatPromptTemplate
+from langchain_core.runnables import Runnable, RunnableLambda, RunnablePassthrough
+from langchain_core.tools import BaseTool
+from langchain_core.utils.function_calling import convert_to_openai_function
+from langchain_core.utils.json import parse_partial_json
+from pydantic import BaseModel, TypeAdapter
+
+logger = logging.getLogger(__name__)
+
+
+def final_answer_instruction(schema: Type[BaseModel]) -> str:
+    """System prompt addition telling the agent how to deliver its answer."""
+    return (
+        f"\nWhen you are done, deliver your final answer by calling the "
+        f"`{schema.__name__}` function with every field filled in. "
+        f"Do not write the final answer as plain text."
+    )
+
+
+def create_structured_functions_agent(
+    llm: BaseLanguageModel,
+    tools: Sequence[BaseTool],
+    prompt: ChatPromptTemplate,
+    schema: Type[BaseModel],
+) -> Runnable:
+    """
+    Create an OpenAI functions agent whose final step emits `schema` directly.
+
+    Mirrors langchain's create_openai_functions_agent, with the schema added
+    as a function. Calling it finishes the run with return values
+    {"output": <arguments JSON>, "structured": <schema instance>}.
+    """
+    functions = [convert_to_openai_function(tool) for tool in tools]
+    functions.append(convert_to_openai_function(schema))
+    return (
+        RunnablePassthrough.assign(
+            agent_scratchpad=lambda x: format_to_openai_function_messages(
+                x["intermediate_steps"]
+            )
+        )
+        | prompt
+        | llm.bind(functions=functions)
+        | RunnableLambda(_structured_finish_parser(schema))
+    )
+
+
+def _structured_finish_parser(schema: Type[BaseModel]):
+    """Build a parser that treats a call to the schema function as AgentFinish."""
+    name = schema.__name__
+
+    def parse(message: AIMessage) -> Any:
+        function_call = message.additional_kwargs.get("function_call")
+        if not function_call or function_call.get("name") != name:
+            return OpenAIFunctionsAgentOutputParser._parse_ai_message(message)
+
+        arguments = function_call.get("arguments") or "{}"
+        try:
+            structured = schema.model_validate_json(arguments)
+        except Exception as e:
+            # With handle_parsing_errors the executor sends this back to the
+            # model as an observation so it can correct the call.
+            raise OutputParserException(
+                f"Invalid arguments for {name}: {e}",
+                observation=f"Invalid arguments for {name}: {e}. Call {name} again with valid arguments.",
+                llm_output=arguments,
+                send_to_llm=True,
+            ) from e
+        return AgentFinish(
+            return_values={"output": arguments, "structured": structured},
+            log=f"Structured result delivered via {name}",
+        )
+
+    return parse
+
+
+class PartialSchemaValidator(AsyncCallbackHandler):
+    """
+    Streaming callback that validates a JSON response field by field.
+
+    Once a top-level field is complete (the next key has started), it is
+    validated against the schema; a mismatch raises and aborts the
+    generation. Optionally reports each partial object as it grows.
+    """
+
+    raise_error = True
+
+    def __init__(
+        self,
+        schema: Type[BaseModel],
+        on_partial: Optional[Callable[[Dict[str, Any]], Any]] = None,
+    ):
+        self.schema = schema
+        self.on_partial = on_partial
+        self._adapters = {
+            name: TypeAdapter(field.annotation)
+            for name, field in schema.model_fields.items()
+        }
+        self._buffer = ""
+        self._validated = set()
+
+    async def on_llm_new_token(self, token: str, **kwargs: Any) -> None:
+        self._buffer += token
+        # Fields can only complete at a delimiter; skip parsing otherwise
+        if not any(char in token for char in ",}]"):
+            return
+
+        start = self._buffer.find("{")
+        if start == -1:
+            return
+        partial = parse_partial_json(self._buffer[start:])
+        if not isinstance(partial, dict):
+            return
+
+        # Every key except the last one being streamed is complete
+        for key in list(partial)[:-1]:
+            if key in self._validated or key not in self._adapters:
+                continue
+            try:
+                self._adapters[key].validate_python(partial[key])
+            except Exception as e:
+                raise OutputParserException(
+                    f"Streaming {self.schema.__name__}.{key} does not match the schema: {e}"
+                ) from e
+            self._validated.add(key)
+
+        if self.on_partial is not None:
+            result = self.on_partial(partial)
+            if hasattr(result, "__await__"):
+                await result
@@ -17,6 +17,16 @@ async def get_current_user(token: str = Depends(oauth2_scheme)) -> User:
     """
     Decode JWT token and return the current user.
     """
+    return await get_user_from_token(token)
+
+
+async def get_user_from_token(token: str) -> User:
+    """
+    Decode a JWT token and return its user.
+    
+    Used directly where the token cannot come from an Authorization header,
+    such as WebSocket connections opened from a browser.
+    """
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
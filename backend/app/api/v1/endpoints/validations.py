@@ -1,18 +1,33 @@
 import logging
-from datetime import datetime
-from typing import List
+from typing import Optional
 from uuid import uuid4
 
-from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks
+from fastapi import (
+    APIRouter,
+    BackgroundTasks,
+    Depends,
+    HTTPException,
+    Query,
+    WebSocket,
+    WebSocketDisconnect,
+    status,
+)
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.api import deps
 from app.core.config import settings
+from app.db.session import AsyncSessionLocal, get_db
+from app.models.validation import ValidationStatus
 from app.schemas.validation import (
     ValidationCreate,
+    ValidationPage,
     ValidationResponse,
-    ValidationStatus,
+    ValidationSummary,
+    ValidationStatusBatchRequest,
 )
+from app.services.realtime_service import realtime_service
+from app.services.validation_repository import ValidationRepository
 from app.services.validation_service import ValidationService
 from app.models.user import User
 
@@ -26,6 +41,7 @@ async def create_validation(
     validation_in: ValidationCreate,
     background_tasks: BackgroundTasks,
     current_user: User = Depends(deps.get_current_user),
+    db: AsyncSession = Depends(get_db),
 ) -> ValidationResponse:
     """
     Create a new business idea validation.
@@ -35,100 +51,235 @@ async def create_validation(
     - Experiment generation
     - Marketing campaign creation
     """
-    # Create validation record
+    # Create validation record; committed before queueing so workers can update it
     validation_id = str(uuid4())
-    validation = ValidationResponse(
-        id=validation_id,
+    validation = await ValidationRepository.create(
+        db,
+        validation_id=validation_id,
         user_id=current_user.id,
         business_idea=validation_in.business_idea,
         target_market=validation_in.target_market,
         industry=validation_in.industry,
-        status=ValidationStatus.PENDING,
-        created_at=datetime.utcnow(),
-        updated_at=datetime.utcnow(),
     )
-    
-    # TODO: Save to database
+    await db.commit()
     
     # Queue validation task with Celery
-    task_id = await ValidationService.process_validation(
-        validation_id=validation_id,
-        user_id=current_user.id,
-        business_idea=validation_in.business_idea,
-        target_market=validation_in.target_market,
-        industry=validation_in.industry,
-    )
+    try:
+        task_id = await ValidationService.process_validation(
+            validation_id=validation_id,
+            user_id=current_user.id,
+            business_idea=validation_in.business_idea,
+            target_market=validation_in.target_market,
+            industry=validation_in.industry,
+            bypass_cache=validation_in.bypass_cache,
+            research_mode=validation_in.research_mode.value if validation_in.research_mode else None,
+            pipeline_mode=validation_in.pipeline_mode.value if validation_in.pipeline_mode else None,
+        )
+    except Exception:
+        validation.status = ValidationStatus.FAILED
+        await db.commit()
+        raise
     
-    # Store task_id in validation (in real app, save to database)
-    validation.task_id = task_id  # type: ignore
+    validation.task_id = task_id
+    await db.commit()
     
-    return validation
+    return ValidationResponse.model_validate(validation)
 
 
-@router.get("/", response_model=List[ValidationResponse])
+@router.get("/", response_model=ValidationPage)
 async def list_validations(
-    skip: int = 0,
-    limit: int = 20,
+    cursor: Optional[str] = None,
+    limit: int = Query(20, ge=1, le=100),
     current_user: User = Depends(deps.get_current_user),
-) -> List[ValidationResponse]:
+    db: AsyncSession = Depends(get_db),
+) -> ValidationPage:
     """
-    List all validations for the current user.
+    List the current user's validations, newest first.
+    
+    Items omit the result payloads; fetch a validation by ID for those.
+    Pass a page's `next_cursor` as `cursor` to get the next page.
     """
-    # TODO: Implement database query
-    return []
+    try:
+        rows, next_cursor = await ValidationRepository.list_summaries_for_user(
+            db, user_id=current_user.id, limit=limit, cursor=cursor
+        )
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor") from None
+    return ValidationPage(
+        items=[ValidationSummary.model_validate(row) for row in rows],
+        next_cursor=next_cursor,
+    )
 
 
 @router.get("/{validation_id}", response_model=ValidationResponse)
 async def get_validation(
     validation_id: str,
     current_user: User = Depends(deps.get_current_user),
+    db: AsyncSession = Depends(get_db),
 ) -> ValidationResponse:
     """
     Get a specific validation by ID.
     """
-    # TODO: Implement database query
-    raise HTTPException(status_code=404, detail="Validation not found")
+    validation = await ValidationRepository.get_for_user(
+        db, validation_id=validation_id, user_id=current_user.id
+    )
+    if validation is None:
+        raise HTTPException(status_code=404, detail="Validation not found")
+    return ValidationResponse.model_validate(validation)
+
+
+@router.post("/status/batch")
+async def get_validation_statuses(
+    batch_in: ValidationStatusBatchRequest,
+    current_user: User = Depends(deps.get_current_user),
+    db: AsyncSession = Depends(get_db),
+) -> dict:
+    """
+    Get the current status of many validations in one request.
+    
+    Returns a map of validation ID to status information (without
+    results), with null for unknown validations and those of other users.
+    """
+    owned = await ValidationRepository.owned_ids(
+        db, user_id=current_user.id, validation_ids=batch_in.validation_ids
+    )
+    # Other users' validations are reported like unknown ones
+    statuses = {}
+    if owned:
+        statuses = await ValidationService.get_validation_statuses(
+            [validation_id for validation_id in batch_in.validation_ids if validation_id in owned]
+        )
+    return {validation_id: statuses.get(validation_id) for validation_id in batch_in.validation_ids}
 
 
 @router.get("/{validation_id}/status")
 async def get_validation_status(
     validation_id: str,
-    task_id: str,  # In real app, get from database using validation_id
+    task_id: Optional[str] = None,
     current_user: User = Depends(deps.get_current_user),
+    db: AsyncSession = Depends(get_db),
 ) -> dict:
     """
     Get the current status of a validation.
     
     Args:
         validation_id: The validation ID
-        task_id: The Celery task ID (query param for now, from DB in production)
+        task_id: Optional workflow ID, only needed for validations whose
+            status record has expired
         current_user: The authenticated user
         
     Returns:
         Status information including progress and current step
     """
-    # TODO: Verify user owns this validation
+    owned = await ValidationRepository.owned_ids(
+        db, user_id=current_user.id, validation_ids=[validation_id]
+    )
+    if not owned:
+        raise HTTPException(status_code=404, detail="Validation not found")
     
     status_info = await ValidationService.get_validation_status(
         validation_id=validation_id,
         task_id=task_id
     )
+    if status_info is None:
+        raise HTTPException(status_code=404, detail="Validation not found")
     
     return status_info
 
 
+@router.get("/{validation_id}/stream")
+async def stream_validation(
+    validation_id: str,
+    current_user: User = Depends(deps.get_current_user),
+    db: AsyncSession = Depends(get_db),
+) -> StreamingResponse:
+    """
+    Stream a validation's progress as Server-Sent Events.
+    
+    Relays stage transitions, progress, streamed agent tokens and tool
+    steps as they happen. Each SSE event is named after the event type
+    ("stage", "progress", "token", "tool", "update", "complete", "failed",
+    "cancelled") and carries the event JSON as data. The stream ends after "complete", "failed" or
+    "cancelled"; comment lines keep idle connections open.
+    """
+    validation = await ValidationRepository.get_for_user(
+        db, validation_id=validation_id, user_id=current_user.id
+    )
+    if validation is None:
+        raise HTTPException(status_code=404, detail="Validation not found")
+    
+    async def event_source():
+        async for event in realtime_service.stream_validation_events(validation_id):
+            if event is None:
+                yield ": keep-alive\n\n"
+                continue
+            yield f"event: {event.type}\ndata: {event.data}\n\n"
+    
+    return StreamingResponse(
+        event_source(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.websocket("/{validation_id}/stream")
+async def stream_validation_websocket(
+    websocket: WebSocket,
+    validation_id: str,
+    token: str = Query(...),
+) -> None:
+    """
+    Stream a validation's progress over a WebSocket.
+    
+    Same events as the SSE stream, one JSON text frame each, with
+    {"type": "heartbeat"} frames on idle connections. Browsers cannot set
+    headers on WebSockets, so the access token is passed as a query param.
+    The server closes the socket after the terminal event.
+    """
+    try:
+        current_user = await deps.get_user_from_token(token)
+    except HTTPException:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
+    
+    # A short-lived session; a dependency one would be held open for the whole stream
+    async with AsyncSessionLocal() as db:
+        validation = await ValidationRepository.get_for_user(
+            db, validation_id=validation_id, user_id=current_user.id
+        )
+    if validation is None:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
+    
+    await websocket.accept()
+    try:
+        async for event in realtime_service.stream_validation_events(validation_id):
+            await websocket.send_text('{"type": "heartbeat"}' if event is None else event.data)
+        await websocket.close()
+    except WebSocketDisconnect:
+        pass
+
+
 @router.post("/{validation_id}/cancel")
 async def cancel_validation(
     validation_id: str,
-    task_id: str,  # In real app, get from database using validation_id
+    task_id: Optional[str] = None,
     current_user: User = Depends(deps.get_current_user),
+    db: AsyncSession = Depends(get_db),
 ) -> dict:
     """
     Cancel a running validation.
     """
-    # TODO: Verify user owns this validation
+    validation = await ValidationRepository.get_for_user(
+        db, validation_id=validation_id, user_id=current_user.id
+    )
+    if validation is None:
+        raise HTTPException(status_code=404, detail="Validation not found")
+    task_id = task_id or validation.task_id
+    if not task_id:
+        raise HTTPException(status_code=409, detail="Validation has not been queued")
     
-    success = await ValidationService.cancel_validation(task_id)
+    success = await ValidationService.cancel_validation(task_id, validation_id=validation_id)
     
     return {
         "validation_id": validation_id,
@@ -0,0 +1,276 @@
+"""
+Asyncio execution engine for ValidateIO.
+
+An alternative to the prefork Celery worker for the I/O-bound validation
+stages. A prefork child holds one validation at a time
+(worker_prefetch_multiplier=1) and spends nearly all of it waiting on OpenAI
+or Serper. This engine consumes the same research/experiments/marketing
+queues and runs many stage coroutines concurrently in one process, bounded
+by a semaphore.
+
+Task names, result payloads, retries and canvas callbacks are the same as
+with the Celery worker, so producers and result readers do not change.
+
+Usage:
+    python -m app.async_worker --concurrency 32 --queues research,experiments,marketing
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import queue
+import signal
+import socket
+import threading
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from celery import signature, states
+from celery.app.task import Context
+
+from app.agents.pool import agent_pool
+from app.core.config import settings
+from app.services.cost_meter import BudgetExceeded
+from app.services.validation_repository import validation_writer
+from app.tasks.progress import stage_request
+from app.tasks.validation import (
+    experiment_generation_stage,
+    market_research_stage,
+    marketing_campaigns_stage,
+    marketing_draft_stage,
+    marketing_refinement_stage,
+    retry_countdown,
+    run_experiment_generation,
+    run_market_research,
+    run_marketing_campaigns,
+    run_marketing_draft,
+    run_marketing_refinement,
+)
+from app.worker import celery_app
+
+logger = logging.getLogger(__name__)
+
+# Celery task name -> stage coroutine with the same signature and result
+STAGE_COROUTINES: Dict[str, Callable[..., Awaitable[Dict[str, Any]]]] = {
+    run_market_research.name: market_research_stage,
+    run_experiment_generation.name: experiment_generation_stage,
+    run_marketing_campaigns.name: marketing_campaigns_stage,
+    run_marketing_draft.name: marketing_draft_stage,
+    run_marketing_refinement.name: marketing_refinement_stage,
+}
+
+DEFAULT_QUEUES = ["research", "experiments", "marketing"]
+
+
+class AsyncValidationWorker:
+    """Consumes validation queues and runs stages concurrently on one loop."""
+
+    def __init__(self, queues: List[str], concurrency: int):
+        """
+        Initialize the worker.
+
+        Args:
+            queues: Names of the Celery queues to consume
+            concurrency: Maximum number of stages running at once
+        """
+        self.queues = queues
+        self.concurrency = concurrency
+        self.hostname = f"async@{socket.gethostname()}"
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        # Futures of running stages; added by the consumer thread, discarded on the loop
+        self._in_flight: set = set()
+        self._in_flight_lock = threading.Lock()
+        self._stopping = threading.Event()
+        # Messages must be acked from the thread that owns the connection
+        self._pending_acks: queue.SimpleQueue = queue.SimpleQueue()
+
+    async def run(self) -> None:
+        """Consume messages until stopped, then drain in-flight stages."""
+        self._loop = asyncio.get_running_loop()
+        self._semaphore = asyncio.Semaphore(self.concurrency)
+        validation_writer.bind(self._loop)
+        agent_pool.warm()
+
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            self._loop.add_signal_handler(sig, self.stop)
+
+        logger.info(
+            f"Async worker {self.hostname} consuming {self.queues} "
+            f"with concurrency {self.concurrency}"
+        )
+        # The consumer thread only returns once in-flight stages have finished
+        # and their messages have been acked.
+        await self._loop.run_in_executor(None, self._consume)
+        await validation_writer.close()
+        logger.info(f"Agent pool stats: {agent_pool.stats()}")
+
+    def stop(self) -> None:
+        """Stop consuming new messages."""
+        logger.info("Async worker shutting down")
+        self._stopping.set()
+
+    def _consume(self) -> None:
+        """Consumer thread: drain the broker and hand messages to the loop."""
+        with celery_app.connection_for_read() as conn:
+            queues = [celery_app.amqp.queues[name] for name in self.queues]
+            with conn.Consumer(
+                queues,
+                callbacks=[self._on_message],
+                accept=celery_app.conf.accept_content,
+                prefetch_count=self.concurrency,
+            ):
+                while not self._stopping.is_set() or self._busy():
+                    self._flush_acks()
+                    try:
+                        conn.drain_events(timeout=0.5)
+                    except socket.timeout:
+                        pass
+                self._flush_acks()
+
+    def _flush_acks(self) -> None:
+        """Ack messages whose stage has finished."""
+        while True:
+            try:
+                message = self._pending_acks.get_nowait()
+            except queue.Empty:
+                return
+            message.ack()
+
+    def _on_message(self, body: Any, message: Any) -> None:
+        """Schedule a received task message on the event loop."""
+        headers = message.headers or {}
+        task_name = headers.get("task")
+        if task_name not in STAGE_COROUTINES:
+            # Requeueing would hand it straight back to this consumer
+            logger.error(f"Async worker cannot run task {task_name}, rejecting message {headers.get('id')}")
+            message.reject()
+            return
+        if self._stopping.is_set():
+            message.requeue()
+            return
+
+        args, kwargs, embed = message.decode()
+        request = Context(
+            {**headers, **(embed or {})},
+            args=args,
+            kwargs=kwargs,
+            hostname=self.hostname,
+        )
+        future = asyncio.run_coroutine_threadsafe(
+            self._execute(task_name, request, message), self._loop
+        )
+        with self._in_flight_lock:
+            self._in_flight.add(future)
+        future.add_done_callback(self._discard_in_flight)
+
+    def _discard_in_flight(self, future: Any) -> None:
+        with self._in_flight_lock:
+            self._in_flight.discard(future)
+
+    def _busy(self) -> bool:
+        """Whether stages are still running."""
+        with self._in_flight_lock:
+            return bool(self._in_flight)
+
+    async def _execute(self, task_name: str, request: Context, message: Any) -> None:
+        """Run one stage and record its result exactly as a Celery worker would."""
+        backend = celery_app.backend
+        try:
+            async with self._semaphore:
+                await self._in_executor(
+                    backend.store_result,
+                    request.id,
+                    {"hostname": self.hostname, "pid": os.getpid()},
+                    states.STARTED,
+                    request=request,
+                )
+                # Stage progress is stored against this request
+                stage_request.set(request)
+                try:
+                    result = await asyncio.wait_for(
+                        STAGE_COROUTINES[task_name](*request.args, **request.kwargs),
+                        timeout=settings.AGENT_MAX_EXECUTION_TIME,
+                    )
+                except Exception as e:
+                    logger.error(f"Task {request.id} failed: {e}")
+                    await self._in_executor(self._retry_or_fail, task_name, request, e)
+                    return
+
+            await self._in_executor(self._on_success, request, result)
+        finally:
+            self._pending_acks.put(message)
+
+    def _on_success(self, request: Context, result: Dict[str, Any]) -> None:
+        """Trigger linked callbacks and the next chain step, then store the result."""
+        for callback in request.callbacks or []:
+            signature(callback, app=celery_app).apply_async(
+                (result,), parent_id=request.id, root_id=request.root_id
+            )
+        chain = request.chain
+        if chain:
+            next_step = signature(chain.pop(), app=celery_app)
+            next_step.apply_async(
+                (result,), chain=chain, parent_id=request.id, root_id=request.root_id
+            )
+        celery_app.backend.mark_as_done(request.id, result, request=request)
+
+    def _retry_or_fail(self, task_name: str, request: Context, exc: Exception) -> None:
+        """Republish the task with a countdown, or mark it failed after max retries or over budget."""
+        retries = request.retries or 0
+        if retries < settings.AGENT_MAX_RETRIES and not isinstance(exc, BudgetExceeded):
+            logger.warning(f"Task {request.id} retrying: {exc}")
+            celery_app.backend.store_result(
+                request.id, exc, states.RETRY, request=request
+            )
+            celery_app.send_task(
+                task_name,
+                args=request.args,
+                kwargs=request.kwargs,
+                task_id=request.id,
+                countdown=retry_countdown(retries),
+                retries=retries + 1,
+                link=request.callbacks,
+                link_error=request.errbacks,
+                chain=request.chain,
+                chord=request.chord,
+                group_id=request.group,
+                group_index=request.group_index,
+                root_id=request.root_id,
+                parent_id=request.parent_id,
+            )
+            return
+        celery_app.backend.mark_as_failure(request.id, exc, request=request)
+        # Same failure hook the Celery worker runs once retries are exhausted
+        celery_app.tasks[task_name].on_failure(exc, request.id, request.args, request.kwargs, None)
+
+    async def _in_executor(self, func: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        """Run a blocking result-backend/broker call off the event loop."""
+        return await self._loop.run_in_executor(None, lambda: func(*args, **kwargs))
+
+
+def main() -> None:
+    """Command-line entry point."""
+    parser = argparse.ArgumentParser(description="ValidateIO asyncio worker")
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=settings.ASYNC_WORKER_CONCURRENCY,
+        help="Maximum number of validation stages running at once",
+    )
+    parser.add_argument(
+        "--queues",
+        default=",".join(DEFAULT_QUEUES),
+        help="Comma-separated queues to consume",
+    )
+    options = parser.parse_args()
+
+    worker = AsyncValidationWorker(
+        queues=[name.strip() for name in options.queues.split(",") if name.strip()],
+        concurrency=options.concurrency,
+    )
+    asyncio.run(worker.run())
+
+
+if __name__ == "__main__":
+    main()
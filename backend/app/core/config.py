@@ -1,5 +1,5 @@
 import secrets
-from typing import Any, List, Optional, Union
+from typing import Any, Dict, List, Optional, Union
 
 from pydantic import AnyHttpUrl, Field, PostgresDsn, field_validator
 from pydantic_settings import BaseSettings, SettingsConfigDict
@@ -42,6 +42,18 @@ class Settings(BaseSettings):
     
     # Database
     DATABASE_URL: Optional[PostgresDsn] = Field(default=None, env="DATABASE_URL")
+    DATABASE_POOL_SIZE: int = Field(default=5, env="DATABASE_POOL_SIZE")
+    DATABASE_MAX_OVERFLOW: int = Field(default=10, env="DATABASE_MAX_OVERFLOW")
+    
+    # Batched validation writes from workers
+    VALIDATION_WRITE_BATCH_SIZE: int = Field(default=50, env="VALIDATION_WRITE_BATCH_SIZE")
+    VALIDATION_WRITE_FLUSH_SECONDS: float = Field(default=0.5, env="VALIDATION_WRITE_FLUSH_SECONDS")
+    VALIDATION_WRITE_MAX_ATTEMPTS: int = Field(default=3, env="VALIDATION_WRITE_MAX_ATTEMPTS")
+    
+    # Stored stage results
+    VALIDATION_RESULT_COMPRESSION: str = Field(default="zstd", env="VALIDATION_RESULT_COMPRESSION")  # zstd | none
+    VALIDATION_RESULT_COMPRESS_MIN_BYTES: int = Field(default=4096, env="VALIDATION_RESULT_COMPRESS_MIN_BYTES")
+    VALIDATION_RESULT_ZSTD_LEVEL: int = Field(default=3, env="VALIDATION_RESULT_ZSTD_LEVEL")
     
     # Supabase Configuration
     SUPABASE_URL: Optional[str] = Field(default=None, env="SUPABASE_URL")
@@ -55,6 +67,14 @@ class Settings(BaseSettings):
     CELERY_BROKER_URL: str = Field(default="redis://localhost:6379/0", env="CELERY_BROKER_URL")
     CELERY_RESULT_BACKEND: str = Field(default="redis://localhost:6379/0", env="CELERY_RESULT_BACKEND")
     
+    # Celery message serialization
+    CELERY_SERIALIZER: str = Field(default="validateio", env="CELERY_SERIALIZER")  # validateio | json
+    CELERY_COMPRESSION_MIN_BYTES: int = Field(default=1024, env="CELERY_COMPRESSION_MIN_BYTES")
+    CELERY_ZSTD_LEVEL: int = Field(default=3, env="CELERY_ZSTD_LEVEL")
+    CELERY_CLAIM_CHECK_ENABLED: bool = Field(default=True, env="CELERY_CLAIM_CHECK_ENABLED")
+    CELERY_CLAIM_CHECK_MIN_BYTES: int = Field(default=16384, env="CELERY_CLAIM_CHECK_MIN_BYTES")
+    CELERY_CLAIM_CHECK_TTL_SECONDS: int = Field(default=2 * 86400, env="CELERY_CLAIM_CHECK_TTL_SECONDS")
+    
     # AI/LLM
     OPENAI_API_KEY: Optional[str] = Field(default=None, env="OPENAI_API_KEY")
     ANTHROPIC_API_KEY: Optional[str] = Field(default=None, env="ANTHROPIC_API_KEY")
@@ -62,15 +82,45 @@ class Settings(BaseSettings):
     LANGCHAIN_TRACING_V2: bool = Field(default=True, env="LANGCHAIN_TRACING_V2")
     LANGCHAIN_PROJECT: str = Field(default="validateio", env="LANGCHAIN_PROJECT")
     
+    # LLM Response Cache
+    LLM_CACHE_ENABLED: bool = Field(default=True, env="LLM_CACHE_ENABLED")
+    LLM_CACHE_BACKEND: str = Field(default="redis", env="LLM_CACHE_BACKEND")  # redis | sqlite
+    LLM_CACHE_SQLITE_PATH: str = Field(default="./.llm_cache.sqlite", env="LLM_CACHE_SQLITE_PATH")
+    LLM_CACHE_TTL_SECONDS: int = Field(default=86400, env="LLM_CACHE_TTL_SECONDS")
+    LLM_CACHE_MAX_ENTRIES: int = Field(default=10000, env="LLM_CACHE_MAX_ENTRIES")
+    LLM_CACHE_MAX_TEMPERATURE: float = Field(default=0.3, env="LLM_CACHE_MAX_TEMPERATURE")
+    
+    # Validation Event Streaming
+    VALIDATION_STREAMING_ENABLED: bool = Field(default=True, env="VALIDATION_STREAMING_ENABLED")
+    STREAM_TOKEN_FLUSH_SECONDS: float = Field(default=0.25, env="STREAM_TOKEN_FLUSH_SECONDS")
+    STREAM_HEARTBEAT_SECONDS: int = Field(default=15, env="STREAM_HEARTBEAT_SECONDS")
+    STREAM_SUBSCRIBER_QUEUE_SIZE: int = Field(default=256, env="STREAM_SUBSCRIBER_QUEUE_SIZE")
+    PROGRESS_UPDATE_INTERVAL_SECONDS: float = Field(default=2.0, env="PROGRESS_UPDATE_INTERVAL_SECONDS")
+    STREAM_OVERFLOW_POLICY: str = Field(default="drop_oldest", env="STREAM_OVERFLOW_POLICY")  # drop_oldest | drop_newest | coalesce
+    
+    # Validation Status
+    VALIDATION_STATUS_TTL_SECONDS: int = Field(default=7 * 86400, env="VALIDATION_STATUS_TTL_SECONDS")
+    
     # Vector Store
     CHROMA_HOST: str = Field(default="localhost", env="CHROMA_HOST")
     CHROMA_PORT: int = Field(default=8001, env="CHROMA_PORT")
     CHROMA_PERSIST_DIRECTORY: str = Field(default="./.chroma", env="CHROMA_PERSIST_DIRECTORY")
     
+    # Research Cache
+    RESEARCH_CACHE_ENABLED: bool = Field(default=True, env="RESEARCH_CACHE_ENABLED")
+    RESEARCH_CACHE_TTL_SECONDS: int = Field(default=86400, env="RESEARCH_CACHE_TTL_SECONDS")
+    RESEARCH_CACHE_SIMILARITY_THRESHOLD: float = Field(default=0.92, env="RESEARCH_CACHE_SIMILARITY_THRESHOLD")
+    RESEARCH_CACHE_EMBEDDING_MODEL: str = Field(default="text-embedding-3-small", env="RESEARCH_CACHE_EMBEDDING_MODEL")
+    
     # External APIs
     SERPER_API_KEY: Optional[str] = Field(default=None, env="SERPER_API_KEY")
     RESEND_API_KEY: Optional[str] = Field(default=None, env="RESEND_API_KEY")
     
+    # Web Search
+    SEARCH_CACHE_TTL_SECONDS: int = Field(default=21600, env="SEARCH_CACHE_TTL_SECONDS")
+    SEARCH_MAX_CONCURRENCY: int = Field(default=8, env="SEARCH_MAX_CONCURRENCY")
+    SEARCH_TIMEOUT_SECONDS: float = Field(default=10.0, env="SEARCH_TIMEOUT_SECONDS")
+    
     # Feature Flags
     ENABLE_MARKETING_AGENT: bool = Field(default=False, env="ENABLE_MARKETING_AGENT")
     ENABLE_EXPERIMENT_AGENT: bool = Field(default=True, env="ENABLE_EXPERIMENT_AGENT")
@@ -79,14 +129,68 @@ class Settings(BaseSettings):
     # Rate Limiting
     RATE_LIMIT_REQUESTS_PER_MINUTE: int = Field(default=60, env="RATE_LIMIT_REQUESTS_PER_MINUTE")
     RATE_LIMIT_REQUESTS_PER_HOUR: int = Field(default=1000, env="RATE_LIMIT_REQUESTS_PER_HOUR")
+    RATE_LIMIT_ENABLED: bool = Field(default=True, env="RATE_LIMIT_ENABLED")
+    RATE_LIMIT_CREATE_WEIGHT: int = Field(default=10, env="RATE_LIMIT_CREATE_WEIGHT")  # POST /validations
+    RATE_LIMIT_IP_MULTIPLIER: int = Field(default=5, env="RATE_LIMIT_IP_MULTIPLIER")
+    RATE_LIMIT_TRUST_FORWARDED_FOR: bool = Field(default=False, env="RATE_LIMIT_TRUST_FORWARDED_FOR")
+    RATE_LIMIT_REDIS_TIMEOUT_SECONDS: float = Field(default=0.25, env="RATE_LIMIT_REDIS_TIMEOUT_SECONDS")
+    RATE_LIMIT_REDIS_RETRY_SECONDS: float = Field(default=5.0, env="RATE_LIMIT_REDIS_RETRY_SECONDS")
     
     # Agent Configuration
     AGENT_MAX_EXECUTION_TIME: int = 180  # 3 minutes in seconds
     AGENT_MAX_RETRIES: int = 3
     AGENT_TIMEOUT_SECONDS: int = 30
+    AGENT_NATIVE_STRUCTURED_OUTPUT: bool = Field(default=True, env="AGENT_NATIVE_STRUCTURED_OUTPUT")
+    ASYNC_WORKER_CONCURRENCY: int = Field(default=32, env="ASYNC_WORKER_CONCURRENCY")
+    MARKET_RESEARCH_MODE: str = Field(default="sequential", env="MARKET_RESEARCH_MODE")  # sequential | parallel
+    RESEARCH_SECTION_MAX_ITERATIONS: int = Field(default=3, env="RESEARCH_SECTION_MAX_ITERATIONS")
+    PIPELINE_MODE: str = Field(default="chain", env="PIPELINE_MODE")  # chain | dag
+    SPECULATIVE_EXPERIMENTS: bool = Field(default=False, env="SPECULATIVE_EXPERIMENTS")
+    SPECULATIVE_EXPERIMENTS_MIN_SIMILARITY: float = Field(default=0.8, env="SPECULATIVE_EXPERIMENTS_MIN_SIMILARITY")
+    
+    # Model Routing (see app/agents/routing.py)
+    LLM_ROUTING_ENABLED: bool = Field(default=True, env="LLM_ROUTING_ENABLED")
+    LLM_MODEL_REASONING: str = Field(default="gpt-4-turbo-preview", env="LLM_MODEL_REASONING")
+    LLM_MODEL_TOOLS: str = Field(default="gpt-4o", env="LLM_MODEL_TOOLS")
+    LLM_MODEL_FORMATTING: str = Field(default="gpt-4o-mini", env="LLM_MODEL_FORMATTING")
+    LLM_LATENCY_SLO_REASONING_SECONDS: float = Field(default=60.0, env="LLM_LATENCY_SLO_REASONING_SECONDS")
+    LLM_LATENCY_SLO_TOOLS_SECONDS: float = Field(default=30.0, env="LLM_LATENCY_SLO_TOOLS_SECONDS")
+    LLM_LATENCY_SLO_FORMATTING_SECONDS: float = Field(default=20.0, env="LLM_LATENCY_SLO_FORMATTING_SECONDS")
+    LLM_LATENCY_WINDOW_SECONDS: int = Field(default=300, env="LLM_LATENCY_WINDOW_SECONDS")
+    LLM_LATENCY_MIN_SAMPLES: int = Field(default=5, env="LLM_LATENCY_MIN_SAMPLES")
+    LLM_ANTHROPIC_MODEL_REASONING: str = Field(default="claude-3-5-sonnet-20240620", env="LLM_ANTHROPIC_MODEL_REASONING")
+    LLM_ANTHROPIC_MODEL_TOOLS: str = Field(default="claude-3-5-sonnet-20240620", env="LLM_ANTHROPIC_MODEL_TOOLS")
+    LLM_ANTHROPIC_MODEL_FORMATTING: str = Field(default="claude-3-haiku-20240307", env="LLM_ANTHROPIC_MODEL_FORMATTING")
+    LLM_ANTHROPIC_MAX_TOKENS: int = Field(default=4096, env="LLM_ANTHROPIC_MAX_TOKENS")
+    
+    # LLM Providers (see app/agents/providers.py)
+    LLM_PROVIDERS: str = Field(default="openai,anthropic", env="LLM_PROVIDERS")  # preference order
+    LLM_REQUEST_TIMEOUT_SECONDS: float = Field(default=20.0, env="LLM_REQUEST_TIMEOUT_SECONDS")
+    LLM_PROVIDER_MAX_RETRIES: int = Field(default=1, env="LLM_PROVIDER_MAX_RETRIES")
+    LLM_PROVIDER_MIN_HEALTH: float = Field(default=0.5, env="LLM_PROVIDER_MIN_HEALTH")
+    LLM_PROVIDER_COOLDOWN_SECONDS: float = Field(default=30.0, env="LLM_PROVIDER_COOLDOWN_SECONDS")
+    LLM_HEDGING_ENABLED: bool = Field(default=False, env="LLM_HEDGING_ENABLED")
+    LLM_HEDGE_DEFAULT_DELAY_SECONDS: float = Field(default=5.0, env="LLM_HEDGE_DEFAULT_DELAY_SECONDS")
+    TASK_RETRY_BASE_SECONDS: float = Field(default=5.0, env="TASK_RETRY_BASE_SECONDS")
+    TASK_RETRY_MAX_SECONDS: float = Field(default=120.0, env="TASK_RETRY_MAX_SECONDS")
+    
+    # Provider Rate Limits, shared by all workers (see app/services/rate_limiter.py)
+    # "provider:model" or "provider" -> requests (rpm) and tokens (tpm) per minute
+    PROVIDER_RATE_LIMITS: Dict[str, Dict[str, int]] = Field(
+        default={
+            "openai": {"rpm": 500, "tpm": 300000},
+            "openai:gpt-4o-mini": {"rpm": 500, "tpm": 2000000},
+            "anthropic": {"rpm": 50, "tpm": 40000},
+            "serper": {"rpm": 300},
+        },
+        env="PROVIDER_RATE_LIMITS",
+    )
+    PROVIDER_RATE_LIMIT_MAX_WAIT_SECONDS: float = Field(default=120.0, env="PROVIDER_RATE_LIMIT_MAX_WAIT_SECONDS")
     
     # Cost Configuration
     MAX_COST_PER_VALIDATION: float = 2.00  # $2.00 USD
+    BUDGET_DOWNGRADE_RATIO: float = Field(default=0.8, env="BUDGET_DOWNGRADE_RATIO")  # skip optional work past this share
+    SEARCH_COST_PER_QUERY: float = Field(default=0.001, env="SEARCH_COST_PER_QUERY")  # Serper, USD
     
     model_config = SettingsConfigDict(
         env_file=".env",
@@ -0,0 +1,213 @@
+"""
+Prometheus metrics for ValidateIO.
+
+All collectors are defined here so the API, the Celery workers and the
+agents share a single registry and consistent metric names.
+"""
+
+from prometheus_client import Counter, Gauge, Histogram
+
+# Agent pool
+AGENT_POOL_CREATED = Counter(
+    "validateio_agent_pool_created_total",
+    "Agent instances constructed by the per-process agent pool",
+    ["agent"],
+)
+AGENT_POOL_REUSED = Counter(
+    "validateio_agent_pool_reused_total",
+    "Agent leases served by an already-warm pooled instance",
+    ["agent"],
+)
+
+# Validation stages
+STAGE_DURATION = Histogram(
+    "validateio_stage_duration_seconds",
+    "Wall-clock duration of a validation stage",
+    ["stage"],
+    buckets=(1, 2.5, 5, 10, 20, 30, 45, 60, 90, 120, 180),
+)
+
+# Parallel research sections
+RESEARCH_SECTION_DURATION = Histogram(
+    "validateio_research_section_duration_seconds",
+    "Wall-clock duration of a parallel market research section by outcome",
+    ["section", "status"],
+    buckets=(1, 2.5, 5, 10, 20, 30, 45, 60, 90, 120, 180),
+)
+
+# Speculative experiment generation
+SPECULATIVE_EXPERIMENTS = Counter(
+    "validateio_speculative_experiments_total",
+    "Experiments generated from partial research: reused, rerun or failed",
+    ["result"],
+)
+
+# DAG pipeline marketing refinement
+MARKETING_REFINEMENTS = Counter(
+    "validateio_marketing_refinements_total",
+    "Refinement passes over research-only marketing drafts by outcome",
+    ["result"],
+)
+
+# Realtime event fan-out
+STREAM_SUBSCRIBERS = Gauge(
+    "validateio_stream_subscribers",
+    "Event stream subscribers attached to this process's fan-out hub",
+)
+STREAM_FANOUT_LATENCY = Histogram(
+    "validateio_stream_fanout_latency_seconds",
+    "Time from event publish to delivery into local subscriber queues",
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5),
+)
+STREAM_DROPPED_EVENTS = Counter(
+    "validateio_stream_dropped_events_total",
+    "Events dropped or coalesced away for slow subscribers, by overflow policy",
+    ["policy"],
+)
+
+# Batched validation writes
+VALIDATION_WRITES = Counter(
+    "validateio_validation_writes_total",
+    "Validation row updates flushed by the batched writer by outcome",
+    ["result"],
+)
+VALIDATION_WRITE_BATCH_SIZE = Histogram(
+    "validateio_validation_write_batch_size",
+    "Validation rows updated per batched writer flush",
+    buckets=(1, 2, 5, 10, 20, 50, 100, 200),
+)
+
+# Research cache
+RESEARCH_CACHE_REQUESTS = Counter(
+    "validateio_research_cache_requests_total",
+    "Market research cache lookups by outcome",
+    ["result"],
+)
+
+# LLM response cache
+LLM_CACHE_REQUESTS = Counter(
+    "validateio_llm_cache_requests_total",
+    "LLM response cache lookups by agent and outcome",
+    ["agent", "result"],
+)
+
+# Web search
+SEARCH_REQUESTS = Counter(
+    "validateio_search_requests_total",
+    "web_search tool calls by outcome",
+    ["result"],
+)
+SEARCH_LATENCY = Histogram(
+    "validateio_search_upstream_seconds",
+    "Latency of upstream search provider calls",
+    buckets=(0.1, 0.25, 0.5, 1, 2, 5, 10),
+)
+
+# Structured output
+STRUCTURED_OUTPUT_RESULTS = Counter(
+    "validateio_structured_output_total",
+    "How agent results were structured: native, regex, llm_fallback or default",
+    ["agent", "path"],
+)
+
+# Cost metering
+LLM_TOKENS = Counter(
+    "validateio_llm_tokens_total",
+    "LLM tokens billed by agent, model and kind (prompt or completion)",
+    ["agent", "model", "kind"],
+)
+LLM_COST = Counter(
+    "validateio_llm_cost_usd_total",
+    "LLM spend in USD by agent, model and model tier",
+    ["agent", "model", "tier"],
+)
+SEARCH_COST = Counter(
+    "validateio_search_cost_usd_total",
+    "Upstream web search spend in USD",
+)
+BUDGET_ENFORCEMENTS = Counter(
+    "validateio_budget_enforcements_total",
+    "Budget enforcement actions: downgraded (optional work skipped) or aborted",
+    ["action"],
+)
+VALIDATION_COST = Histogram(
+    "validateio_validation_cost_usd",
+    "Total cost of finished validations in USD",
+    buckets=(0.05, 0.1, 0.25, 0.5, 1, 1.5, 2, 3),
+)
+
+# Model routing
+LLM_TIER_REQUESTS = Counter(
+    "validateio_llm_tier_requests_total",
+    "LLM calls by declared model tier and the model routed to",
+    ["tier", "model"],
+)
+LLM_TIER_DOWNGRADES = Counter(
+    "validateio_llm_tier_downgrades_total",
+    "LLM calls moved down from a tier, by reason (latency or budget)",
+    ["tier", "reason"],
+)
+LLM_TIER_LATENCY = Histogram(
+    "validateio_llm_tier_latency_seconds",
+    "Duration of uncached LLM calls by declared tier and model",
+    ["tier", "model"],
+    buckets=(0.5, 1, 2.5, 5, 10, 20, 30, 60, 120),
+)
+
+# LLM providers
+LLM_PROVIDER_CALLS = Counter(
+    "validateio_llm_provider_calls_total",
+    "LLM provider calls by outcome: ok, error or cancelled",
+    ["provider", "result"],
+)
+LLM_PROVIDER_HEALTH = Gauge(
+    "validateio_llm_provider_health",
+    "Health score (EWMA of call success) of each LLM provider in this process",
+    ["provider"],
+)
+LLM_PROVIDER_RESPONSE_TIME = Histogram(
+    "validateio_llm_provider_response_seconds",
+    "Time to an LLM provider's first token (or full reply)",
+    ["provider"],
+    buckets=(0.25, 0.5, 1, 2, 3, 5, 10, 20),
+)
+LLM_FAILOVERS = Counter(
+    "validateio_llm_failovers_total",
+    "LLM calls failed over to another provider before responding",
+    ["from_provider", "to_provider"],
+)
+LLM_HEDGES = Counter(
+    "validateio_llm_hedges_total",
+    "Hedged LLM calls: fired, won_by_primary or won_by_hedge",
+    ["result"],
+)
+
+# Provider rate limiting
+PROVIDER_RATE_LIMIT_WAIT = Histogram(
+    "validateio_provider_rate_limit_wait_seconds",
+    "Time provider calls waited for rate limit capacity",
+    ["provider", "model"],
+    buckets=(0.01, 0.1, 0.5, 1, 2.5, 5, 10, 30, 60, 120),
+)
+PROVIDER_RATE_LIMIT_THROTTLED = Counter(
+    "validateio_provider_rate_limit_throttled_total",
+    "Provider calls that had to wait for rate limit capacity",
+    ["provider", "model"],
+)
+PROVIDER_RATE_LIMIT_WAITING = Gauge(
+    "validateio_provider_rate_limit_waiting",
+    "Provider calls currently waiting for rate limit capacity in this process",
+    ["provider"],
+)
+
+# API rate limiting
+API_RATE_LIMITED = Counter(
+    "validateio_api_rate_limited_total",
+    "API requests rejected with 429 by key scope (user or ip) and window seconds",
+    ["scope", "window"],
+)
+API_RATE_LIMIT_BACKEND = Counter(
+    "validateio_api_rate_limit_checks_total",
+    "API rate limit checks by counter backend (redis or local fallback)",
+    ["backend"],
+)
@@ -0,0 +1,214 @@
+"""
+API rate limiting for ValidateIO.
+
+RateLimitMiddleware enforces RATE_LIMIT_REQUESTS_PER_MINUTE and
+RATE_LIMIT_REQUESTS_PER_HOUR with sliding window counters in Redis:
+each window keeps a counter for the current and the previous period, and a
+request is allowed while
+
+    previous * (share of the window still overlapping it) + current <= limit
+
+Requests are counted per user (the bearer token's user, verified by the
+same get_user_from_token the endpoints use) and per client IP, with
+RATE_LIMIT_IP_MULTIPLIER times the limits for IPs since many users can share
+one. Requests cost weights rather than 1: creating a validation starts
+several agent runs, so it costs RATE_LIMIT_CREATE_WEIGHT, reads cost 1.
+
+Every key and window is updated in one pipelined round trip per request.
+Requests over the limit are counted too, so a client hammering the API stays
+limited until it backs off. If Redis is unavailable the same counters are
+kept in process memory, making the limits per API process, and Redis is
+tried again after RATE_LIMIT_REDIS_RETRY_SECONDS.
+"""
+
+import asyncio
+import logging
+import math
+import time
+from typing import Dict, List, Optional, Tuple
+
+from fastapi import HTTPException
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from app.api.deps import get_user_from_token
+from app.core.config import settings
+from app.core.metrics import API_RATE_LIMIT_BACKEND, API_RATE_LIMITED
+from app.core.redis import get_redis
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = "rate_limit:api:"
+
+# Paths never limited: probes, metrics and docs
+EXEMPT_PATHS = ("/health", "/metrics", "/docs", "/redoc", f"{settings.API_V1_STR}/openapi.json")
+
+# Local counters are pruned once this many are kept
+LOCAL_MAX_COUNTERS = 100_000
+
+
+def windows() -> List[Tuple[int, int]]:
+    """(window seconds, limit) pairs enforced."""
+    return [
+        (60, settings.RATE_LIMIT_REQUESTS_PER_MINUTE),
+        (3600, settings.RATE_LIMIT_REQUESTS_PER_HOUR),
+    ]
+
+
+def request_weight(method: str, path: str) -> int:
+    """How much of the limits a request uses."""
+    if method == "POST" and path.rstrip("/") == f"{settings.API_V1_STR}/validations":
+        return settings.RATE_LIMIT_CREATE_WEIGHT
+    return 1
+
+
+def sliding_count(previous: int, current: int, now: float, window: int) -> float:
+    """Requests in the sliding window ending now."""
+    elapsed = (now % window) / window
+    return previous * (1 - elapsed) + current
+
+
+def retry_after(previous: int, current: int, now: float, window: int, limit: int) -> int:
+    """Seconds until a window's sliding count is back within its limit."""
+    elapsed = (now % window) / window
+    if current > limit or previous == 0:
+        # Only the next period brings relief
+        return max(1, math.ceil(window * (1 - elapsed)))
+    # previous * (1 - elapsed') + current <= limit
+    needed = 1 - (limit - current) / previous
+    return max(1, math.ceil(window * (needed - elapsed)))
+
+
+class _LocalCounters:
+    """In-process stand-in for the Redis counters."""
+
+    def __init__(self):
+        self._counts: Dict[str, int] = {}
+
+    def incr(self, key: str, amount: int) -> int:
+        if len(self._counts) >= LOCAL_MAX_COUNTERS:
+            self._prune()
+        self._counts[key] = self._counts.get(key, 0) + amount
+        return self._counts[key]
+
+    def get(self, key: str) -> int:
+        return self._counts.get(key, 0)
+
+    def _prune(self) -> None:
+        # Keys end in <window>:<period>; only the current and previous periods matter
+        now = time.time()
+        kept = {}
+        for key, count in self._counts.items():
+            window, period = key.rsplit(":", 2)[1:]
+            if int(period) >= int(now // int(window)) - 1:
+                kept[key] = count
+        self._counts = kept
+
+
+class RateLimitMiddleware:
+    """ASGI middleware rejecting requests over the per-user and per-IP limits with 429."""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+        self._local = _LocalCounters()
+        # Until when Redis is skipped after a failure
+        self._redis_down_until = 0.0
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if (
+            scope["type"] != "http"
+            or not settings.RATE_LIMIT_ENABLED
+            or scope["method"] == "OPTIONS"
+            or scope["path"].startswith(EXEMPT_PATHS)
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        identities = [(f"ip:{self._client_ip(scope)}", settings.RATE_LIMIT_IP_MULTIPLIER)]
+        user_id = await self._user_id(scope)
+        if user_id is not None:
+            identities.insert(0, (f"user:{user_id}", 1))
+
+        wait = await self._check(identities, request_weight(scope["method"], scope["path"]))
+        if wait is not None:
+            response = JSONResponse(
+                {"detail": "Rate limit exceeded"},
+                status_code=429,
+                headers={"Retry-After": str(wait)},
+            )
+            await response(scope, receive, send)
+            return
+        await self.app(scope, receive, send)
+
+    async def _check(self, identities: List[Tuple[str, int]], weight: int) -> Optional[int]:
+        """Count the request; seconds to wait if it is over a limit, else None."""
+        now = time.time()
+        checks = []
+        for identity, multiplier in identities:
+            for window, limit in windows():
+                period = int(now // window)
+                key = f"{KEY_PREFIX}{identity}:{window}"
+                checks.append((identity, window, limit * multiplier, key, period))
+
+        counts = await self._count(checks, weight)
+        wait = None
+        for (identity, window, limit, _, _), (previous, current) in zip(checks, counts):
+            if sliding_count(previous, current, now, window) > limit:
+                API_RATE_LIMITED.labels(scope=identity.split(":", 1)[0], window=str(window)).inc()
+                seconds = retry_after(previous, current, now, window, limit)
+                wait = max(wait or 0, seconds)
+        return wait
+
+    async def _count(
+        self,
+        checks: List[Tuple[str, int, int, str, int]],
+        weight: int,
+    ) -> List[Tuple[int, int]]:
+        """Add weight to each current counter; (previous, current) counts per check."""
+        if time.monotonic() >= self._redis_down_until:
+            try:
+                async with get_redis().pipeline(transaction=False) as pipe:
+                    for _, window, _, key, period in checks:
+                        pipe.incrby(f"{key}:{period}", weight)
+                        pipe.expire(f"{key}:{period}", 2 * window)
+                        pipe.get(f"{key}:{period - 1}")
+                    results = await asyncio.wait_for(
+                        pipe.execute(), timeout=settings.RATE_LIMIT_REDIS_TIMEOUT_SECONDS
+                    )
+                API_RATE_LIMIT_BACKEND.labels(backend="redis").inc()
+                return [
+                    (int(results[i + 2] or 0), int(results[i]))
+                    for i in range(0, len(results), 3)
+                ]
+            except Exception as e:
+                logger.warning(f"Rate limiting in process memory, Redis unavailable: {e}")
+                self._redis_down_until = time.monotonic() + settings.RATE_LIMIT_REDIS_RETRY_SECONDS
+        API_RATE_LIMIT_BACKEND.labels(backend="local").inc()
+        return [
+            (self._local.get(f"{key}:{period - 1}"), self._local.incr(f"{key}:{period}", weight))
+            for _, _, _, key, period in checks
+        ]
+
+    @staticmethod
+    def _client_ip(scope: Scope) -> str:
+        if settings.RATE_LIMIT_TRUST_FORWARDED_FOR:
+            for name, value in scope.get("headers", []):
+                if name == b"x-forwarded-for":
+                    return value.decode("latin-1").split(",")[0].strip()
+        client = scope.get("client")
+        return client[0] if client else "unknown"
+
+    @staticmethod
+    async def _user_id(scope: Scope) -> Optional[str]:
+        """User of a valid bearer token; requests without one are limited by IP only."""
+        for name, value in scope.get("headers", []):
+            if name == b"authorization":
+                scheme, _, token = value.decode("latin-1").partition(" ")
+                if scheme.lower() != "bearer" or not token:
+                    return None
+                try:
+                    user = await get_user_from_token(token)
+                except HTTPException:
+                    return None
+                return str(user.id)
+        return None
@@ -0,0 +1,38 @@
+"""
+Shared Redis clients for ValidateIO.
+
+Async clients hold connections bound to the event loop that opened them, so
+one client is kept per running loop (the API's loop, the Celery worker's
+long-lived loop, or the asyncio worker's loop).
+"""
+
+import asyncio
+import weakref
+
+import redis
+import redis.asyncio as aioredis
+
+from app.core.config import settings
+
+_async_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, aioredis.Redis]" = (
+    weakref.WeakKeyDictionary()
+)
+_sync_client = None
+
+
+def get_redis() -> aioredis.Redis:
+    """Return the async Redis client for the running event loop."""
+    loop = asyncio.get_running_loop()
+    client = _async_clients.get(loop)
+    if client is None:
+        client = aioredis.from_url(settings.REDIS_URL)
+        _async_clients[loop] = client
+    return client
+
+
+def get_sync_redis() -> redis.Redis:
+    """Return the process-wide synchronous Redis client."""
+    global _sync_client
+    if _sync_client is None:
+        _sync_client = redis.from_url(settings.REDIS_URL)
+    return _sync_client
@@ -0,0 +1,185 @@
+"""
+Compact Celery message serialization for ValidateIO.
+
+Stage results travel between pipeline stages as task arguments: the market
+research dict goes to the experiments task, then again (with the
+experiments) to the marketing task, and each stage's result is stored in
+the result backend too. With JSON that is the same text several times per
+validation. The "validateio" serializer replaces it:
+
+- Bodies are msgpack, compressed with zstd once they reach
+  CELERY_COMPRESSION_MIN_BYTES (if the zstandard package is installed).
+- Claim check: any dict in a body that packs to at least
+  CELERY_CLAIM_CHECK_MIN_BYTES is stored in Redis under the hash of its
+  content and replaced in the message by a reference. The research dict is
+  therefore stored once, and every later message that carries it - chain
+  args, group args, results - carries a 64-byte key instead. Keys expire
+  after CELERY_CLAIM_CHECK_TTL_SECONDS, which outlives result_expires.
+
+Frames are one flag byte followed by the payload: 0 for plain msgpack, 1
+for zstd-compressed msgpack. References are a msgpack extension type.
+
+Claim checks make dumps and loads blocking Redis calls, so code on an event
+loop publishes tasks and reads results in a thread (asyncio.to_thread).
+"""
+
+import datetime
+import decimal
+import hashlib
+import logging
+import uuid
+from typing import Any, Tuple
+
+from kombu.serialization import register
+
+from app.core.config import settings
+from app.core.redis import get_sync_redis
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+logger = logging.getLogger(__name__)
+
+SERIALIZER_NAME = "validateio"
+CONTENT_TYPE = "application/x-validateio-msgpack"
+
+CLAIM_PREFIX = "celery_claim:"
+CLAIM_EXT_TYPE = 1
+
+_PLAIN = b"\x00"
+_ZSTD = b"\x01"
+
+
+def _default(value: Any) -> Any:
+    # Same conversions as Celery's JSON serializer
+    if isinstance(value, (datetime.datetime, datetime.date, datetime.time)):
+        return value.isoformat()
+    if isinstance(value, (uuid.UUID, decimal.Decimal)):
+        return str(value)
+    raise TypeError(f"Cannot serialize {type(value).__name__}")
+
+
+def _pack(value: Any) -> bytes:
+    return msgpack.packb(value, use_bin_type=True, default=_default)
+
+
+def _frame(packed: bytes) -> bytes:
+    if zstandard is not None and len(packed) >= settings.CELERY_COMPRESSION_MIN_BYTES:
+        return _ZSTD + zstandard.ZstdCompressor(level=settings.CELERY_ZSTD_LEVEL).compress(packed)
+    return _PLAIN + packed
+
+
+def _unframe(data: bytes) -> bytes:
+    flag, payload = data[:1], data[1:]
+    if flag == _ZSTD:
+        if zstandard is None:
+            raise RuntimeError("zstandard is required to decode compressed Celery messages")
+        return zstandard.ZstdDecompressor().decompress(payload)
+    return payload
+
+
+def _store_claim(packed: bytes) -> bytes:
+    """Store a packed value once under its content hash; return the key."""
+    key = f"{CLAIM_PREFIX}{hashlib.sha256(packed).hexdigest()}"
+    redis = get_sync_redis()
+    # Refreshing an existing claim costs no payload bytes
+    if not redis.expire(key, settings.CELERY_CLAIM_CHECK_TTL_SECONDS):
+        redis.set(key, _frame(packed), ex=settings.CELERY_CLAIM_CHECK_TTL_SECONDS)
+    return key.encode()
+
+
+def _header_size(length: int) -> int:
+    # msgpack map and array headers: fix (1 byte), 16-bit or 32-bit length
+    if length < 16:
+        return 1
+    return 3 if length < 2 ** 16 else 5
+
+
+def _claim_large(value: Any) -> Tuple[Any, int]:
+    """
+    Replace large dicts with claim references, innermost first.
+
+    Returns the value and its packed size. Sizes are summed up from the
+    leaves, so nothing is packed again for every dict enclosing it: each
+    container's scalar items are packed together once, and only dicts
+    large enough to be claimed are packed whole.
+    """
+    if isinstance(value, dict):
+        replaced = {}
+        scalars = {}
+        size = _header_size(len(value))
+        for key, item in value.items():
+            if isinstance(item, (dict, list, tuple)):
+                replaced[key], item_size = _claim_large(item)
+                size += len(_pack(key)) + item_size
+            else:
+                replaced[key] = scalars[key] = item
+        if scalars:
+            size += len(_pack(scalars)) - _header_size(len(scalars))
+        if size < settings.CELERY_CLAIM_CHECK_MIN_BYTES:
+            return replaced, size
+        reference = msgpack.ExtType(CLAIM_EXT_TYPE, _store_claim(_pack(replaced)))
+        return reference, len(_pack(reference))
+    if isinstance(value, (list, tuple)):
+        replaced = []
+        scalars = []
+        size = _header_size(len(value))
+        for item in value:
+            if isinstance(item, (dict, list, tuple)):
+                item, item_size = _claim_large(item)
+                size += item_size
+            else:
+                scalars.append(item)
+            replaced.append(item)
+        if scalars:
+            size += len(_pack(scalars)) - _header_size(len(scalars))
+        return replaced, size
+    return value, len(_pack(value))
+
+
+def _ext_hook(code: int, data: bytes) -> Any:
+    if code != CLAIM_EXT_TYPE:
+        return msgpack.ExtType(code, data)
+    stored = get_sync_redis().get(data.decode())
+    if stored is None:
+        raise KeyError(f"Claim-checked payload {data.decode()} has expired")
+    return _unpack(_unframe(stored))
+
+
+def _unpack(packed: bytes) -> Any:
+    return msgpack.unpackb(packed, raw=False, strict_map_key=False, ext_hook=_ext_hook)
+
+
+def dumps(body: Any) -> bytes:
+    """Serialize a task message body or result."""
+    if settings.CELERY_CLAIM_CHECK_ENABLED:
+        body, _ = _claim_large(body)
+    return _frame(_pack(body))
+
+
+def loads(data: bytes) -> Any:
+    """Deserialize what dumps produced, fetching claim-checked values."""
+    if isinstance(data, str):
+        data = data.encode("latin-1")
+    return _unpack(_unframe(data))
+
+
+def register_serializer() -> bool:
+    """Register the serializer with kombu; False if msgpack is not installed."""
+    if msgpack is None:
+        logger.warning("msgpack is not installed; Celery messages stay JSON")
+        return False
+    register(
+        SERIALIZER_NAME,
+        dumps,
+        loads,
+        content_type=CONTENT_TYPE,
+        content_encoding="binary",
+    )
+    return True
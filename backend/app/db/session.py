@@ -36,8 +36,8 @@ engine = create_async_engine(
     echo=settings.DEBUG,
     future=True,
     pool_pre_ping=True,  # Enable connection health checks
-    pool_size=5,  # Connection pool size
-    max_overflow=10,  # Maximum overflow connections
+    pool_size=settings.DATABASE_POOL_SIZE,  # Connection pool size
+    max_overflow=settings.DATABASE_MAX_OVERFLOW,  # Maximum overflow connections
 )
 
 # Create async session factory
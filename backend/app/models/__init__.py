@@ -2,5 +2,6 @@
 
 from .user import User
 from .validation import Validation, ValidationStatus
+from .validation_result import ValidationResult
 
-__all__ = ["User", "Validation", "ValidationStatus"]
\ No newline at end of file
+__all__ = ["User", "Validation", "ValidationResult", "ValidationStatus"]
\ No newline at end of file
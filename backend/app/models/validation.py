@@ -1,11 +1,14 @@
 """
 Validation model for ValidateIO.
 
-Stores business idea validation requests and results.
+Stores business idea validation requests. Stage results live in
+validation_results (see validation_result.py) and are only loaded on request.
 """
 
-from sqlalchemy import Column, String, Text, Float, ForeignKey, DateTime, Enum
-from sqlalchemy.dialects.postgresql import UUID, JSONB
+from typing import Any, Dict, Optional
+
+from sqlalchemy import Column, String, Text, Float, ForeignKey, DateTime, Enum, Index
+from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 import uuid
 import enum
@@ -26,6 +29,17 @@ class Validation(Base):
     """Model for business idea validation requests."""
     
     __tablename__ = "validations"
+    __table_args__ = (
+        Index("idx_validations_user_id", "user_id"),
+        # Keyset pagination of a user's validations, newest first
+        Index(
+            "idx_validations_user_created_at",
+            "user_id",
+            "created_at",
+            "id",
+            postgresql_ops={"created_at": "DESC", "id": "DESC"},
+        ),
+    )
     
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False)
@@ -39,11 +53,6 @@ class Validation(Base):
     status = Column(Enum(ValidationStatus), default=ValidationStatus.PENDING, nullable=False)
     task_id = Column(String, nullable=True)  # Celery task ID
     
-    # Results
-    market_research = Column(JSONB, nullable=True)
-    experiments = Column(JSONB, nullable=True)
-    marketing_campaigns = Column(JSONB, nullable=True)
-    
     # Metrics
     total_cost = Column(Float, nullable=True)
     execution_time_seconds = Column(Float, nullable=True)
@@ -52,4 +61,33 @@ class Validation(Base):
     completed_at = Column(DateTime, nullable=True)
     
     # Relationships
-    user = relationship("User", back_populates="validations")
\ No newline at end of file
+    user = relationship("User", back_populates="validations")
+    # Never loaded implicitly; query with selectinload(Validation.results)
+    results = relationship(
+        "ValidationResult",
+        back_populates="validation",
+        cascade="all, delete-orphan",
+        passive_deletes=True,
+        lazy="raise",
+    )
+    
+    def _result(self, stage: str) -> Optional[Dict[str, Any]]:
+        for result in self.results:
+            if result.stage == stage:
+                return result.data
+        return None
+    
+    @property
+    def market_research(self) -> Optional[Dict[str, Any]]:
+        """Market research result, if loaded and stored."""
+        return self._result("market_research")
+    
+    @property
+    def experiments(self) -> Optional[Dict[str, Any]]:
+        """Experiment generation result, if loaded and stored."""
+        return self._result("experiments")
+    
+    @property
+    def marketing_campaigns(self) -> Optional[Dict[str, Any]]:
+        """Marketing campaigns result, if loaded and stored."""
+        return self._result("marketing_campaigns")
\ No newline at end of file
@@ -0,0 +1,82 @@
+"""
+Validation result model for ValidateIO.
+
+Stores each stage's result payload of a validation in its own row, away
+from the validations table, so status and list queries never read (or
+detoast) the payloads. Large payloads are zstd-compressed when the
+zstandard package is available.
+"""
+
+import json
+import logging
+from typing import Any, Dict, Optional
+
+from sqlalchemy import Column, ForeignKey, Integer, LargeBinary, String
+from sqlalchemy.dialects.postgresql import JSONB, UUID
+from sqlalchemy.orm import relationship
+
+from app.core.config import settings
+from app.db.base import Base
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+logger = logging.getLogger(__name__)
+
+# Stages with a stored result, named after the API's result fields
+RESULT_STAGES = ("market_research", "experiments", "marketing_campaigns")
+
+
+def encode_result(data: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Column values storing a result payload.
+
+    Payloads of at least VALIDATION_RESULT_COMPRESS_MIN_BYTES are stored
+    compressed when VALIDATION_RESULT_COMPRESSION is "zstd"; smaller ones
+    stay plain JSONB.
+    """
+    raw = json.dumps(data, default=str).encode()
+    if (
+        settings.VALIDATION_RESULT_COMPRESSION == "zstd"
+        and len(raw) >= settings.VALIDATION_RESULT_COMPRESS_MIN_BYTES
+    ):
+        if zstandard is not None:
+            return {
+                "encoding": "zstd",
+                "payload": None,
+                "compressed": zstandard.ZstdCompressor(level=settings.VALIDATION_RESULT_ZSTD_LEVEL).compress(raw),
+                "size_bytes": len(raw),
+            }
+        logger.warning("zstandard is not installed; storing validation results uncompressed")
+    return {"encoding": "json", "payload": data, "compressed": None, "size_bytes": len(raw)}
+
+
+class ValidationResult(Base):
+    """One stage's result payload of a validation."""
+
+    __tablename__ = "validation_results"
+
+    validation_id = Column(
+        UUID(as_uuid=True), ForeignKey("validations.id", ondelete="CASCADE"), primary_key=True
+    )
+    stage = Column(String, primary_key=True)  # One of RESULT_STAGES
+
+    # Payload, as plain JSONB or as zstd-compressed JSON
+    encoding = Column(String, nullable=False, default="json")  # json | zstd
+    payload = Column(JSONB(none_as_null=True), nullable=True)
+    compressed = Column(LargeBinary, nullable=True)
+    size_bytes = Column(Integer, nullable=False)  # Uncompressed JSON size
+
+    # Relationships
+    validation = relationship("Validation", back_populates="results")
+
+    @property
+    def data(self) -> Optional[Dict[str, Any]]:
+        """The decoded payload."""
+        if self.encoding == "zstd":
+            if zstandard is None:
+                raise RuntimeError("zstandard is required to read compressed validation results")
+            return json.loads(zstandard.ZstdDecompressor().decompress(self.compressed))
+        return self.payload
@@ -1,8 +1,9 @@
 from datetime import datetime
-from typing import Any, Dict, Optional
+from typing import Any, Dict, List, Optional
 from enum import Enum
+from uuid import UUID
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, field_validator
 
 
 class ValidationStatus(str, Enum):
@@ -10,12 +11,30 @@ class ValidationStatus(str, Enum):
     PROCESSING = "processing"
     COMPLETED = "completed"
     FAILED = "failed"
+    CANCELLED = "cancelled"
+
+
+class ResearchMode(str, Enum):
+    SEQUENTIAL = "sequential"
+    PARALLEL = "parallel"
+
+
+class PipelineMode(str, Enum):
+    CHAIN = "chain"
+    DAG = "dag"
 
 
 class ValidationCreate(BaseModel):
     business_idea: str = Field(..., min_length=10, max_length=1000)
     target_market: Optional[str] = Field(None, max_length=500)
     industry: Optional[str] = Field(None, max_length=100)
+    bypass_cache: bool = Field(False, description="Skip cached market research and run a fresh analysis")
+    research_mode: Optional[ResearchMode] = Field(
+        None, description="Run research as one agent or as parallel section agents; defaults to the server setting"
+    )
+    pipeline_mode: Optional[PipelineMode] = Field(
+        None, description="Run stages strictly in order or draft marketing alongside experiments; defaults to the server setting"
+    )
     
     class Config:
         json_schema_extra = {
@@ -27,30 +46,47 @@ class ValidationCreate(BaseModel):
         }
 
 
-class ValidationResponse(BaseModel):
+class ValidationSummary(BaseModel):
+    """A validation without its result payloads, as listed."""
     id: str
     user_id: str
     business_idea: str
     target_market: Optional[str]
     industry: Optional[str]
     status: ValidationStatus
+    task_id: Optional[str] = None
     created_at: datetime
     updated_at: datetime
     completed_at: Optional[datetime] = None
     
-    # Results
-    market_research: Optional[Dict[str, Any]] = None
-    experiments: Optional[Dict[str, Any]] = None
-    marketing_campaigns: Optional[Dict[str, Any]] = None
-    
     # Metrics
     total_cost: Optional[float] = None
     execution_time_seconds: Optional[float] = None
     
+    @field_validator("id", "user_id", mode="before")
+    @classmethod
+    def uuid_to_str(cls, value: Any) -> Any:
+        # Database rows carry UUIDs
+        return str(value) if isinstance(value, UUID) else value
+    
     class Config:
         from_attributes = True
 
 
+class ValidationResponse(ValidationSummary):
+    # Results
+    market_research: Optional[Dict[str, Any]] = None
+    experiments: Optional[Dict[str, Any]] = None
+    marketing_campaigns: Optional[Dict[str, Any]] = None
+
+
+class ValidationPage(BaseModel):
+    items: List[ValidationSummary]
+    next_cursor: Optional[str] = Field(
+        None, description="Pass as `cursor` to fetch the next page; null on the last page"
+    )
+
+
 class ValidationUpdate(BaseModel):
     status: Optional[ValidationStatus] = None
     market_research: Optional[Dict[str, Any]] = None
@@ -61,6 +97,10 @@ class ValidationUpdate(BaseModel):
     completed_at: Optional[datetime] = None
 
 
+class ValidationStatusBatchRequest(BaseModel):
+    validation_ids: List[str] = Field(..., min_length=1, max_length=100)
+
+
 class MarketResearchResult(BaseModel):
     competitors: list[Dict[str, Any]]
     market_size: Dict[str, Any]  # TAM, SAM, SOM
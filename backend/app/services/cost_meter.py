@@ -0,0 +1,175 @@
+"""
+Per-validation cost metering for ValidateIO.
+
+Every LLM call the agents make (see app/agents/metering.py) and every
+upstream web search is priced and added to the validation's running cost in
+its status record, so spend is shared by all workers running its stages.
+A stage binds the validation it works for with meter_validation(); agent
+calls and searches made from that stage are charged to it.
+
+The budget is MAX_COST_PER_VALIDATION:
+- an LLM call that would start at or over budget raises BudgetExceeded, as
+  does a finished call that takes the total over it, so a runaway agent loop
+  stops at the next step;
+- stages check the budget before they start, so a spent validation fails
+  instead of running its remaining stages;
+- past BUDGET_DOWNGRADE_RATIO of the budget, stages skip optional work
+  (speculative experiments, the DAG marketing refinement) and LLM calls
+  move down a model tier (app/agents/routing.py).
+BudgetExceeded is never retried.
+
+Metering is best effort: if Redis is unavailable, calls are not charged and
+the budget is not enforced.
+"""
+
+import contextvars
+import logging
+from typing import Dict, Optional, Tuple
+
+from app.core.config import settings
+from app.core.metrics import BUDGET_ENFORCEMENTS, LLM_COST, LLM_TOKENS, SEARCH_COST
+from app.services.validation_status import validation_status
+
+logger = logging.getLogger(__name__)
+
+# USD per 1M (prompt, completion) tokens
+MODEL_PRICES: Dict[str, Tuple[float, float]] = {
+    "gpt-4-turbo-preview": (10.00, 30.00),
+    "gpt-4-turbo": (10.00, 30.00),
+    "gpt-4o": (2.50, 10.00),
+    "gpt-4o-mini": (0.15, 0.60),
+    "gpt-4.1": (2.00, 8.00),
+    "gpt-4.1-mini": (0.40, 1.60),
+    "claude-3-opus": (15.00, 75.00),
+    "claude-3-5-sonnet": (3.00, 15.00),
+    "claude-3-haiku": (0.25, 1.25),
+    "gpt-3.5-turbo": (0.50, 1.50),
+}
+# Unknown models are charged at the most expensive known price
+DEFAULT_PRICE = max(MODEL_PRICES.values())
+
+# Completion tokens assumed when checking whether a call can still start
+EXPECTED_COMPLETION_TOKENS = 1000
+
+# Validation the current stage works for, and the stage name
+metered_validation: "contextvars.ContextVar[Optional[Tuple[str, str]]]" = contextvars.ContextVar(
+    "metered_validation", default=None
+)
+
+
+class BudgetExceeded(Exception):
+    """A validation has spent, or is about to spend, its cost budget."""
+
+    def __init__(self, validation_id: str, spent_usd: float):
+        self.validation_id = validation_id
+        self.spent_usd = spent_usd
+        super().__init__(
+            f"Validation {validation_id} reached its ${settings.MAX_COST_PER_VALIDATION:.2f} "
+            f"budget (spent ${spent_usd:.4f})"
+        )
+
+
+def meter_validation(validation_id: str, stage: str) -> None:
+    """Charge LLM calls and searches made from the current stage to a validation."""
+    metered_validation.set((validation_id, stage))
+
+
+def model_price(model: str) -> Tuple[float, float]:
+    """USD per 1M prompt and completion tokens for a model."""
+    price = MODEL_PRICES.get(model)
+    if price is None:
+        # Dated snapshots, e.g. gpt-4o-2024-08-06
+        price = next((p for name, p in MODEL_PRICES.items() if model.startswith(f"{name}-")), None)
+    return price or DEFAULT_PRICE
+
+
+def llm_cost(model: str, prompt_tokens: int, completion_tokens: int) -> float:
+    """Price of one LLM call in USD."""
+    prompt_price, completion_price = model_price(model)
+    return (prompt_tokens * prompt_price + completion_tokens * completion_price) / 1_000_000
+
+
+class CostMeter:
+    """Charges calls to the current stage's validation and enforces its budget."""
+
+    async def spent(self, validation_id: str) -> float:
+        """The validation's cost so far in USD."""
+        return await validation_status.get_cost(validation_id)
+
+    async def budget_pressure(self, validation_id: str) -> float:
+        """Share of the budget spent, e.g. 0.5 when half is gone."""
+        return await self.spent(validation_id) / settings.MAX_COST_PER_VALIDATION
+
+    async def current_budget_pressure(self) -> float:
+        """budget_pressure of the validation the current stage works for; 0 outside stages."""
+        metered = metered_validation.get()
+        if metered is None:
+            return 0.0
+        return await self.budget_pressure(metered[0])
+
+    async def should_downgrade(self, validation_id: str) -> bool:
+        """Whether remaining stages should skip optional work to save budget."""
+        downgrade = await self.budget_pressure(validation_id) >= settings.BUDGET_DOWNGRADE_RATIO
+        if downgrade:
+            BUDGET_ENFORCEMENTS.labels(action="downgraded").inc()
+        return downgrade
+
+    async def check(self, validation_id: str, upcoming_usd: float = 0.0) -> None:
+        """Raise BudgetExceeded if the validation cannot afford upcoming_usd more."""
+        spent = await self.spent(validation_id)
+        if spent + upcoming_usd >= settings.MAX_COST_PER_VALIDATION:
+            BUDGET_ENFORCEMENTS.labels(action="aborted").inc()
+            raise BudgetExceeded(validation_id, spent)
+
+    async def check_llm_call(self, model: str, prompt_tokens: int) -> None:
+        """Refuse an LLM call the current validation can no longer afford."""
+        metered = metered_validation.get()
+        if metered is None:
+            return
+        await self.check(metered[0], llm_cost(model, prompt_tokens, EXPECTED_COMPLETION_TOKENS))
+
+    async def record_llm(
+        self,
+        agent: str,
+        model: str,
+        prompt_tokens: int,
+        completion_tokens: int,
+        tier: str = "unknown",
+    ) -> None:
+        """Charge a finished LLM call; raise BudgetExceeded if it used up the budget."""
+        cost = llm_cost(model, prompt_tokens, completion_tokens)
+        LLM_TOKENS.labels(agent=agent, model=model, kind="prompt").inc(prompt_tokens)
+        LLM_TOKENS.labels(agent=agent, model=model, kind="completion").inc(completion_tokens)
+        LLM_COST.labels(agent=agent, model=model, tier=tier).inc(cost)
+        await self._charge(cost, prompt_tokens, completion_tokens)
+
+    async def record_search(self) -> None:
+        """Charge one upstream web search."""
+        SEARCH_COST.inc(settings.SEARCH_COST_PER_QUERY)
+        # Never fails the search, whose result may be shared; the next LLM call stops the run
+        await self._charge(settings.SEARCH_COST_PER_QUERY, enforce=False)
+
+    async def _charge(
+        self,
+        cost: float,
+        prompt_tokens: int = 0,
+        completion_tokens: int = 0,
+        enforce: bool = True,
+    ) -> None:
+        metered = metered_validation.get()
+        if metered is None:
+            return
+        validation_id, stage = metered
+        total = await validation_status.add_cost(
+            validation_id, cost, prompt_tokens=prompt_tokens, completion_tokens=completion_tokens
+        )
+        if enforce and total is not None and total >= settings.MAX_COST_PER_VALIDATION:
+            logger.warning(
+                f"Validation {validation_id} exceeded its budget during {stage}: ${total:.4f}"
+            )
+            BUDGET_ENFORCEMENTS.labels(action="aborted").inc()
+            raise BudgetExceeded(validation_id, total)
+
+
+# Global cost meter instance
+cost_meter = CostMeter()
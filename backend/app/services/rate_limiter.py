@@ -0,0 +1,205 @@
+"""
+Client-side rate limiting of the LLM and search providers for ValidateIO.
+
+Every worker process calls OpenAI, Anthropic and Serper on its own, so under
+burst load the provider's rate limits are hit and whole stages are retried.
+ProviderRateLimiter keeps the fleet under the limits instead: each provider
+and model gets two token buckets in Redis, one metering requests per minute
+and one metering tokens per minute, shared by every worker. A Lua script
+refills and takes from both atomically, timed by the Redis server clock, and
+tells the caller how long to wait when either is short. Callers wait for
+capacity rather than fail.
+
+Limits come from PROVIDER_RATE_LIMITS, looked up by "provider:model" and
+then "provider"; buckets are per model either way. A provider without limits
+is not metered, and if Redis is unavailable calls go through unmetered.
+"""
+
+import asyncio
+import logging
+import random
+import time
+import weakref
+from typing import Any, Dict, Optional
+
+from app.core.config import settings
+from app.core.metrics import (
+    PROVIDER_RATE_LIMIT_THROTTLED,
+    PROVIDER_RATE_LIMIT_WAIT,
+    PROVIDER_RATE_LIMIT_WAITING,
+)
+from app.core.redis import get_redis, get_sync_redis
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = "rate_limit:provider:"
+
+# KEYS: request bucket, token bucket
+# ARGV: requests per minute, tokens per minute, tokens wanted
+# Returns 0 once both buckets had capacity and were drawn from, else the
+# milliseconds until they will have.
+TOKEN_BUCKET_SCRIPT = """
+local time = redis.call('TIME')
+local now = tonumber(time[1]) * 1000 + math.floor(tonumber(time[2]) / 1000)
+local wait = 0
+local levels = {}
+for i, key in ipairs(KEYS) do
+    local rate = tonumber(ARGV[i])
+    local wanted = i == 1 and 1 or tonumber(ARGV[3])
+    levels[i] = -1
+    if rate > 0 then
+        -- A minute's worth of capacity; larger requests wait for a full bucket
+        wanted = math.min(wanted, rate)
+        local bucket = redis.call('HMGET', key, 'level', 'ts')
+        local level = tonumber(bucket[1]) or rate
+        local ts = tonumber(bucket[2]) or now
+        local refill = rate / 60000
+        level = math.min(rate, level + math.max(0, now - ts) * refill)
+        if level < wanted then
+            wait = math.max(wait, math.ceil((wanted - level) / refill))
+        end
+        levels[i] = level - wanted
+    end
+end
+if wait == 0 then
+    for i, key in ipairs(KEYS) do
+        if levels[i] >= 0 then
+            redis.call('HSET', key, 'level', levels[i], 'ts', now)
+            redis.call('PEXPIRE', key, 60000)
+        end
+    end
+end
+return wait
+"""
+
+
+def provider_limits(provider: str, model: str) -> Optional[Dict[str, int]]:
+    """Configured {"rpm": ..., "tpm": ...} limits of a provider's model, or None."""
+    limits = settings.PROVIDER_RATE_LIMITS
+    return limits.get(f"{provider}:{model}") or limits.get(provider)
+
+
+class ProviderRateLimiter:
+    """Makes provider calls wait for capacity in fleet-wide token buckets."""
+
+    def __init__(self):
+        """Initialize the limiter; the script is registered once per Redis client."""
+        self._scripts: weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Any] = (
+            weakref.WeakKeyDictionary()
+        )
+        self._sync_script: Any = None
+
+    def _script(self) -> Any:
+        """TOKEN_BUCKET_SCRIPT registered on the running loop's client."""
+        loop = asyncio.get_running_loop()
+        client = get_redis()
+        script = self._scripts.get(loop)
+        if script is None or script.registered_client is not client:
+            script = self._scripts[loop] = client.register_script(TOKEN_BUCKET_SCRIPT)
+        return script
+
+    def _script_sync(self) -> Any:
+        """TOKEN_BUCKET_SCRIPT registered on the sync client."""
+        client = get_sync_redis()
+        if self._sync_script is None or self._sync_script.registered_client is not client:
+            self._sync_script = client.register_script(TOKEN_BUCKET_SCRIPT)
+        return self._sync_script
+
+    def _args(self, provider: str, model: str, tokens: int):
+        limits = provider_limits(provider, model)
+        if not limits:
+            return None
+        keys = [f"{KEY_PREFIX}{provider}:{model}:requests", f"{KEY_PREFIX}{provider}:{model}:tokens"]
+        return keys, [limits.get("rpm", 0), limits.get("tpm", 0), tokens]
+
+    async def acquire(self, provider: str, model: str, tokens: int = 0) -> float:
+        """
+        Wait until a call of the given size fits the provider's limits.
+
+        Args:
+            provider: "openai", "anthropic" or "serper"
+            model: Model called (e.g. "search" for Serper)
+            tokens: Tokens the call is expected to use, prompt and completion
+
+        Returns:
+            Seconds waited
+        """
+        args = self._args(provider, model, tokens)
+        if args is None:
+            return 0.0
+        keys, argv = args
+        started = time.monotonic()
+        throttled = False
+        try:
+            script = self._script()
+            while True:
+                wait_ms = int(await script(keys=keys, args=argv))
+                if wait_ms == 0:
+                    break
+                delay = self._delay(provider, model, wait_ms, started, throttled)
+                if delay is None:
+                    break
+                if not throttled:
+                    throttled = True
+                    PROVIDER_RATE_LIMIT_WAITING.labels(provider=provider).inc()
+                await asyncio.sleep(delay)
+        except Exception as e:
+            logger.warning(f"Rate limiter unavailable, calling {provider} unmetered: {e}")
+        finally:
+            if throttled:
+                PROVIDER_RATE_LIMIT_WAITING.labels(provider=provider).dec()
+        return self._observe(provider, model, started)
+
+    def acquire_sync(self, provider: str, model: str, tokens: int = 0) -> float:
+        """acquire for sync code."""
+        args = self._args(provider, model, tokens)
+        if args is None:
+            return 0.0
+        keys, argv = args
+        started = time.monotonic()
+        throttled = False
+        try:
+            script = self._script_sync()
+            while True:
+                wait_ms = int(script(keys=keys, args=argv))
+                if wait_ms == 0:
+                    break
+                delay = self._delay(provider, model, wait_ms, started, throttled)
+                if delay is None:
+                    break
+                throttled = True
+                time.sleep(delay)
+        except Exception as e:
+            logger.warning(f"Rate limiter unavailable, calling {provider} unmetered: {e}")
+        return self._observe(provider, model, started)
+
+    @staticmethod
+    def _delay(
+        provider: str,
+        model: str,
+        wait_ms: int,
+        started: float,
+        throttled: bool,
+    ) -> Optional[float]:
+        """Seconds to sleep before trying again, or None to give up waiting."""
+        if not throttled:
+            PROVIDER_RATE_LIMIT_THROTTLED.labels(provider=provider, model=model).inc()
+        remaining = settings.PROVIDER_RATE_LIMIT_MAX_WAIT_SECONDS - (time.monotonic() - started)
+        if remaining <= 0:
+            logger.warning(
+                f"Waited {settings.PROVIDER_RATE_LIMIT_MAX_WAIT_SECONDS}s for {provider}:{model} "
+                f"capacity; calling anyway"
+            )
+            return None
+        # Jitter so waiting workers do not all retry in the same millisecond
+        return min(wait_ms / 1000 * random.uniform(1.0, 1.2), remaining)
+
+    @staticmethod
+    def _observe(provider: str, model: str, started: float) -> float:
+        waited = time.monotonic() - started
+        PROVIDER_RATE_LIMIT_WAIT.labels(provider=provider, model=model).observe(waited)
+        return waited
+
+
+# Global limiter instance
+provider_limiter = ProviderRateLimiter()
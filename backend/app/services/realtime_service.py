@@ -2,24 +2,257 @@
 Real-time service for ValidateIO using Supabase Realtime.
 
 Handles real-time subscriptions for validation status updates.
+
+Without Supabase Realtime, updates travel over Redis pub/sub and are relayed
+by EventStreamHub: each API process keeps one pub/sub connection per event
+loop, subscribed to exactly the channels that have local subscribers, and
+fans every message out to in-process subscriber queues. Subscribers cost a
+queue each, not a Redis connection each, and because every replica listens
+to the same Redis channels an update published anywhere reaches viewers
+connected to any replica.
+
+Topics are per validation (everything, including streamed tokens) and per
+user (lifecycle events of all the user's validations); see
+app/services/validation_events.py.
 """
 
 import asyncio
-from typing import Callable, Optional
+import itertools
+import json
+import time
+import weakref
+from collections import deque
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from enum import Enum
+from typing import (
+    Any,
+    AsyncIterator,
+    Callable,
+    Deque,
+    Dict,
+    List,
+    NamedTuple,
+    Optional,
+    Set,
+)
 from uuid import UUID
 
+from redis.asyncio.client import PubSub
+
 from app.core.config import settings
 from app.core.logging import logger
+from app.core.metrics import (
+    STREAM_DROPPED_EVENTS,
+    STREAM_FANOUT_LATENCY,
+    STREAM_SUBSCRIBERS,
+)
+from app.core.redis import get_redis
 from app.core.supabase import get_supabase
+from app.services.validation_events import (
+    SNAPSHOT_EVENTS,
+    TERMINAL_EVENTS,
+    encode_event,
+    publish_event,
+    user_channel,
+    validation_channel,
+)
+from app.services.validation_status import validation_status
+
+
+class StreamEvent(NamedTuple):
+    """One event as delivered to a subscriber queue."""
+
+    type: str
+    data: str  # the event JSON, relayed verbatim
+    validation_id: Optional[str] = None
+
+
+class OverflowPolicy(str, Enum):
+    """What a full subscriber queue does with the next event."""
+
+    DROP_OLDEST = "drop_oldest"  # evict the oldest queued event
+    DROP_NEWEST = "drop_newest"  # discard the incoming event
+    COALESCE = "coalesce"  # a snapshot event replaces queued ones it supersedes
+
+
+class SubscriberQueue:
+    """
+    Bounded event queue for one subscriber.
+
+    Filled synchronously by the hub's dispatcher, so a slow consumer never
+    holds up delivery to the others; when the queue is full the overflow
+    policy decides what gives. Terminal events are always delivered.
+    """
+
+    def __init__(self, maxsize: int, policy: OverflowPolicy):
+        self.maxsize = maxsize
+        self.policy = policy
+        self._events: Deque[StreamEvent] = deque()
+        self._ready = asyncio.Event()
+
+    def __len__(self) -> int:
+        return len(self._events)
+
+    def put(self, event: StreamEvent) -> None:
+        """Enqueue an event, applying the overflow policy when full."""
+        if len(self._events) >= self.maxsize and not self._make_room(event):
+            return
+        self._events.append(event)
+        self._ready.set()
+
+    def _make_room(self, event: StreamEvent) -> bool:
+        """Free a slot for event; False when event itself is dropped."""
+        if self.policy == OverflowPolicy.COALESCE and event.type in SNAPSHOT_EVENTS:
+            kept = deque(
+                queued for queued in self._events
+                if queued.type != event.type or queued.validation_id != event.validation_id
+            )
+            superseded = len(self._events) - len(kept)
+            if superseded:
+                self._events = kept
+                STREAM_DROPPED_EVENTS.labels(policy=self.policy.value).inc(superseded)
+                return True
+        
+        STREAM_DROPPED_EVENTS.labels(policy=self.policy.value).inc()
+        if self.policy == OverflowPolicy.DROP_NEWEST and event.type not in TERMINAL_EVENTS:
+            return False
+        self._events.popleft()
+        return True
+
+    async def get(self) -> StreamEvent:
+        """Wait for and return the next event."""
+        while not self._events:
+            self._ready.clear()
+            await self._ready.wait()
+        return self._events.popleft()
+
+
+@dataclass
+class _HubState:
+    """Pub/sub connection and subscriber queues bound to one event loop."""
+
+    pubsub: PubSub
+    lock: asyncio.Lock = field(default_factory=asyncio.Lock)
+    subscribers: Dict[str, Set[SubscriberQueue]] = field(default_factory=dict)
+    listener: Optional["asyncio.Task[None]"] = None
+
+
+class EventStreamHub:
+    """Fan Redis pub/sub channels out to any number of in-process subscribers."""
+
+    def __init__(self):
+        """Initialize the hub; connections are created per event loop."""
+        self._states: weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, _HubState] = (
+            weakref.WeakKeyDictionary()
+        )
+
+    def _state(self) -> _HubState:
+        loop = asyncio.get_running_loop()
+        state = self._states.get(loop)
+        if state is None:
+            state = _HubState(pubsub=get_redis().pubsub())
+            self._states[loop] = state
+        return state
+
+    @asynccontextmanager
+    async def subscribe(
+        self,
+        channel: str,
+        policy: Optional[OverflowPolicy] = None,
+    ) -> AsyncIterator[SubscriberQueue]:
+        """
+        Receive a channel's events on a bounded queue for the duration of the block.
+
+        Args:
+            channel: Pub/sub channel to follow
+            policy: Overflow policy for a slow subscriber; defaults to
+                settings.STREAM_OVERFLOW_POLICY
+        """
+        state = self._state()
+        queue = SubscriberQueue(
+            maxsize=settings.STREAM_SUBSCRIBER_QUEUE_SIZE,
+            policy=OverflowPolicy(policy or settings.STREAM_OVERFLOW_POLICY),
+        )
+        async with state.lock:
+            subscribers = state.subscribers.get(channel)
+            if subscribers is None:
+                # First local subscriber of this channel
+                await state.pubsub.subscribe(channel)
+                subscribers = state.subscribers[channel] = set()
+            subscribers.add(queue)
+            if state.listener is None:
+                state.listener = asyncio.create_task(self._listen(state))
+        STREAM_SUBSCRIBERS.inc()
+        try:
+            yield queue
+        finally:
+            STREAM_SUBSCRIBERS.dec()
+            async with state.lock:
+                subscribers = state.subscribers.get(channel)
+                if subscribers is not None:
+                    subscribers.discard(queue)
+                    if not subscribers:
+                        del state.subscribers[channel]
+                        await state.pubsub.unsubscribe(channel)
+
+    async def _listen(self, state: _HubState) -> None:
+        """Read the shared connection and dispatch while anyone is subscribed."""
+        while state.subscribers:
+            try:
+                message = await state.pubsub.get_message(
+                    ignore_subscribe_messages=True, timeout=1.0
+                )
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Event stream listener error: {e}")
+                await asyncio.sleep(1.0)
+                continue
+            if message is not None:
+                self._dispatch(state, message)
+        state.listener = None
+
+    @staticmethod
+    def _dispatch(state: _HubState, message: dict) -> None:
+        channel = message["channel"]
+        if isinstance(channel, bytes):
+            channel = channel.decode()
+        subscribers = state.subscribers.get(channel)
+        if not subscribers:
+            return
+        
+        data = message["data"]
+        if isinstance(data, bytes):
+            data = data.decode()
+        # Decode once per message, not once per subscriber
+        try:
+            decoded = json.loads(data)
+            event = StreamEvent(decoded.get("type", "message"), data, decoded.get("validation_id"))
+            published_at = decoded.get("ts")
+        except (ValueError, AttributeError):
+            event = StreamEvent("message", data)
+            published_at = None
+        
+        for queue in subscribers:
+            queue.put(event)
+        if published_at:
+            STREAM_FANOUT_LATENCY.observe(max(time.time() - published_at, 0))
+
+
+# Process-wide hub shared by every stream connection
+event_hub = EventStreamHub()
 
 
 class RealtimeService:
-    """Service for handling real-time updates using Supabase."""
+    """Service for handling real-time updates using Supabase or the Redis hub."""
     
     def __init__(self):
         """Initialize the realtime service."""
         self.supabase = None
-        self.channels = {}
+        # Subscription id -> Supabase channel, or hub relay task without Supabase
+        self.channels: Dict[str, Any] = {}
+        self._subscription_ids = itertools.count(1)
         
         if settings.USE_SUPABASE_AUTH and settings.SUPABASE_URL:
             self.supabase = get_supabase()
@@ -40,8 +273,7 @@ class RealtimeService:
             Channel ID if successful, None otherwise
         """
         if not self.supabase:
-            logger.warning("Supabase not configured, real-time updates disabled")
-            return None
+            return await self._subscribe_hub(user_channel(str(user_id)), callback)
         
         try:
             # Create channel name
@@ -87,8 +319,7 @@ class RealtimeService:
             Channel ID if successful, None otherwise
         """
         if not self.supabase:
-            logger.warning("Supabase not configured, real-time updates disabled")
-            return None
+            return await self._subscribe_hub(validation_channel(str(validation_id)), callback)
         
         try:
             # Create channel name
@@ -118,6 +349,38 @@ class RealtimeService:
             logger.error(f"Failed to subscribe to validation updates: {e}")
             return None
     
+    async def _subscribe_hub(
+        self,
+        channel: str,
+        callback: Callable[[dict], Any],
+    ) -> str:
+        """Relay a hub channel to callback from a background task; returns the subscription id."""
+        subscription_id = f"{channel}#{next(self._subscription_ids)}"
+        subscribed = asyncio.get_running_loop().create_future()
+        task = asyncio.create_task(self._relay(channel, callback, subscribed))
+        # Events published after this returns are guaranteed to be delivered
+        await subscribed
+        self.channels[subscription_id] = task
+        logger.info(f"Subscribed to {channel} via event hub")
+        return subscription_id
+    
+    @staticmethod
+    async def _relay(
+        channel: str,
+        callback: Callable[[dict], Any],
+        subscribed: "asyncio.Future[None]",
+    ) -> None:
+        async with event_hub.subscribe(channel, OverflowPolicy.COALESCE) as queue:
+            subscribed.set_result(None)
+            while True:
+                event = await queue.get()
+                try:
+                    result = callback(json.loads(event.data))
+                    if hasattr(result, "__await__"):
+                        await result
+                except Exception as e:
+                    logger.error(f"Realtime callback for {channel} failed: {e}")
+    
     async def unsubscribe(self, channel_name: str) -> bool:
         """
         Unsubscribe from a channel.
@@ -133,7 +396,11 @@ class RealtimeService:
         
         try:
             channel = self.channels[channel_name]
-            await channel.unsubscribe()
+            if isinstance(channel, asyncio.Task):
+                channel.cancel()
+                await asyncio.gather(channel, return_exceptions=True)
+            else:
+                await channel.unsubscribe()
             del self.channels[channel_name]
             
             logger.info(f"Unsubscribed from channel {channel_name}")
@@ -149,22 +416,98 @@ class RealtimeService:
         for channel_name in channel_names:
             await self.unsubscribe(channel_name)
     
-    def broadcast_validation_update(self, validation_id: UUID, update_data: dict):
+    async def stream_validation_events(
+        self,
+        validation_id: str,
+        policy: Optional[OverflowPolicy] = None,
+    ) -> AsyncIterator[Optional[StreamEvent]]:
+        """
+        Yield a validation's events as they are published.
+        
+        Starts with the validation's current state from its status record:
+        a "stage" event for the stage running, or the terminal event if the
+        validation has already finished, so late subscribers are not left
+        waiting for events that were published before they connected.
+        
+        Yields None after STREAM_HEARTBEAT_SECONDS without an event so the
+        caller can keep the connection alive, and stops after the terminal
+        event ("complete", "failed" or "cancelled").
+        
+        Args:
+            validation_id: The validation to stream
+            policy: Overflow policy if the consumer falls behind
+        """
+        # Subscribe before reading the status so nothing falls in between
+        async with event_hub.subscribe(validation_channel(validation_id), policy) as queue:
+            for event in await self._current_events(validation_id):
+                yield event
+                if event.type in TERMINAL_EVENTS:
+                    return
+            while True:
+                try:
+                    event = await asyncio.wait_for(
+                        queue.get(), timeout=settings.STREAM_HEARTBEAT_SECONDS
+                    )
+                except asyncio.TimeoutError:
+                    yield None
+                    continue
+                yield event
+                if event.type in TERMINAL_EVENTS:
+                    return
+    
+    @staticmethod
+    async def _current_events(validation_id: str) -> List[StreamEvent]:
+        """Events describing where a validation is now, from its status record."""
+        try:
+            status = await validation_status.get(validation_id)
+        except Exception as e:
+            logger.warning(f"Failed to read status of validation {validation_id}: {e}")
+            return []
+        if status is None:
+            return []
+        events = []
+        if status["current_stage"] is not None:
+            events.append(("stage", {"stage": status["current_stage"], "status": "started"}))
+        if status["status"] == "completed":
+            events.append(("complete", {}))
+        elif status["status"] == "failed":
+            events.append(("failed", {"error": status["current_step"]}))
+        elif status["status"] == "cancelled":
+            events.append(("cancelled", {"task_id": status["task_id"]}))
+        return [
+            StreamEvent(event_type, encode_event(validation_id, event_type, **payload), validation_id)
+            for event_type, payload in events
+        ]
+    
+    async def broadcast_validation_update(
+        self,
+        validation_id: UUID,
+        update_data: dict,
+        user_id: Optional[UUID] = None,
+    ):
         """
         Broadcast a validation update (for non-Supabase mode).
         
-        This is a placeholder for WebSocket implementation when not using Supabase.
+        Published as an "update" event to the validation's topic and to its
+        owner's topic, reaching subscribers on every API replica. Updates
+        are snapshots, so slow subscribers may coalesce them.
         
         Args:
             validation_id: The validation that was updated
             update_data: The update data to broadcast
+            user_id: The owning user; looked up when omitted
         """
         if self.supabase:
             # Updates are handled automatically by Supabase
             return
         
-        # TODO: Implement WebSocket broadcasting for non-Supabase mode
-        logger.info(f"Would broadcast update for validation {validation_id}: {update_data}")
+        await publish_event(
+            str(validation_id),
+            "update",
+            user_id=str(user_id) if user_id is not None else None,
+            notify_owner=True,
+            **update_data,
+        )
 
 
 # Global realtime service instance
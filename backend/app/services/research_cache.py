@@ -0,0 +1,239 @@
+"""
+Market research result cache for ValidateIO.
+
+Users often resubmit nearly the same idea (retries, small edits, demo
+accounts), and every submission pays for a full multi-iteration research run.
+This cache has two tiers:
+
+1. Exact match - Redis, keyed on the normalized business idea, target market
+   and industry.
+2. Semantic match - nearest-neighbour lookup over embeddings of the
+   normalized idea in the ChromaDB store configured by CHROMA_HOST /
+   CHROMA_PERSIST_DIRECTORY, restricted to the same market and industry.
+
+The Redis entry is the single copy of the cached result; ChromaDB only maps
+similar ideas to its key, so the Redis TTL governs expiry for both tiers.
+
+The semantic tier's embedding calls are not charged to the validation by the
+cost meter (app/services/cost_meter.py): embedding one normalized idea costs
+around a millionth of a dollar, well below the budget's resolution.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import re
+import time
+import weakref
+from dataclasses import dataclass
+from typing import Any, Dict, Optional, Tuple
+
+from app.core.config import settings
+from app.core.metrics import RESEARCH_CACHE_REQUESTS
+from app.core.redis import get_redis
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = "research_cache:"
+COLLECTION_NAME = "research_cache"
+
+
+def normalize_text(value: Optional[str]) -> str:
+    """Lowercase, collapse whitespace and drop surrounding punctuation."""
+    if not value:
+        return ""
+    value = re.sub(r"\s+", " ", value.lower()).strip()
+    return value.strip(".,;:!?\"' ")
+
+
+@dataclass
+class _LoopState:
+    """Vector store initialization lock and embeddings client bound to one event loop."""
+
+    init_lock: asyncio.Lock
+    embeddings: Any = None
+
+
+class ResearchCache:
+    """Two-tier (exact + semantic) cache for market research results."""
+
+    def __init__(self):
+        """Initialize the cache; the vector store is connected lazily."""
+        self._collection = None
+        self._vector_store_failed = False
+        self._states: weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, _LoopState] = (
+            weakref.WeakKeyDictionary()
+        )
+
+    def _state(self) -> _LoopState:
+        loop = asyncio.get_running_loop()
+        state = self._states.get(loop)
+        if state is None:
+            state = _LoopState(init_lock=asyncio.Lock())
+            self._states[loop] = state
+        return state
+
+    @staticmethod
+    def _normalize(
+        business_idea: str, target_market: Optional[str], industry: Optional[str]
+    ) -> Tuple[str, str, str]:
+        return (
+            normalize_text(business_idea),
+            normalize_text(target_market),
+            normalize_text(industry),
+        )
+
+    @staticmethod
+    def _digest(idea: str, market: str, industry: str) -> str:
+        return hashlib.sha256(f"{idea}|{market}|{industry}".encode()).hexdigest()
+
+    async def get(
+        self,
+        business_idea: str,
+        target_market: Optional[str] = None,
+        industry: Optional[str] = None,
+    ) -> Optional[Tuple[Dict[str, Any], str]]:
+        """
+        Look up cached research for an idea.
+
+        Returns:
+            Tuple of (results, tier) where tier is "exact" or "semantic",
+            or None on a miss
+        """
+        if not settings.RESEARCH_CACHE_ENABLED:
+            return None
+
+        idea, market, ind = self._normalize(business_idea, target_market, industry)
+        digest = self._digest(idea, market, ind)
+        try:
+            cached = await get_redis().get(KEY_PREFIX + digest)
+            if cached is not None:
+                RESEARCH_CACHE_REQUESTS.labels(result="exact_hit").inc()
+                return json.loads(cached), "exact"
+
+            match = await self._semantic_lookup(idea, market, ind)
+            if match is not None and match != digest:
+                cached = await get_redis().get(KEY_PREFIX + match)
+                if cached is not None:
+                    RESEARCH_CACHE_REQUESTS.labels(result="semantic_hit").inc()
+                    return json.loads(cached), "semantic"
+        except Exception as e:
+            # The cache must never fail a validation
+            logger.warning(f"Research cache lookup failed: {e}")
+
+        RESEARCH_CACHE_REQUESTS.labels(result="miss").inc()
+        return None
+
+    async def set(
+        self,
+        business_idea: str,
+        target_market: Optional[str],
+        industry: Optional[str],
+        results: Dict[str, Any],
+    ) -> None:
+        """Store research results in both tiers."""
+        if not settings.RESEARCH_CACHE_ENABLED:
+            return
+
+        idea, market, ind = self._normalize(business_idea, target_market, industry)
+        digest = self._digest(idea, market, ind)
+        try:
+            await get_redis().set(
+                KEY_PREFIX + digest,
+                json.dumps(results),
+                ex=settings.RESEARCH_CACHE_TTL_SECONDS,
+            )
+            await self._semantic_store(digest, idea, market, ind)
+        except Exception as e:
+            logger.warning(f"Research cache store failed: {e}")
+
+    async def _get_collection(self, state: _LoopState):
+        """Connect to ChromaDB on first use; disable tier two if unavailable."""
+        if self._vector_store_failed or (self._collection is not None and state.embeddings is not None):
+            return self._collection
+
+        async with state.init_lock:
+            if state.embeddings is None and not self._vector_store_failed:
+                try:
+                    if self._collection is None:
+                        self._collection = await asyncio.to_thread(self._connect_collection)
+                    from langchain_openai import OpenAIEmbeddings
+
+                    # Its async HTTP client is bound to this loop
+                    state.embeddings = OpenAIEmbeddings(
+                        model=settings.RESEARCH_CACHE_EMBEDDING_MODEL,
+                        openai_api_key=settings.OPENAI_API_KEY,
+                    )
+                except Exception as e:
+                    logger.warning(f"Semantic research cache disabled: {e}")
+                    self._vector_store_failed = True
+        return self._collection
+
+    @staticmethod
+    def _connect_collection():
+        """Open the cache collection on the Chroma server, or locally as a fallback."""
+        import chromadb
+
+        try:
+            client = chromadb.HttpClient(
+                host=settings.CHROMA_HOST, port=settings.CHROMA_PORT
+            )
+            client.heartbeat()
+        except Exception as e:
+            logger.info(f"Chroma server unavailable ({e}), using local store")
+            client = chromadb.PersistentClient(path=settings.CHROMA_PERSIST_DIRECTORY)
+        return client.get_or_create_collection(
+            COLLECTION_NAME, metadata={"hnsw:space": "cosine"}
+        )
+
+    async def _semantic_lookup(self, idea: str, market: str, industry: str) -> Optional[str]:
+        """Return the digest of the closest cached idea above the threshold."""
+        state = self._state()
+        collection = await self._get_collection(state)
+        if collection is None:
+            return None
+
+        embedding = await state.embeddings.aembed_query(idea)
+        response = await asyncio.to_thread(
+            collection.query,
+            query_embeddings=[embedding],
+            n_results=1,
+            where={"$and": [{"target_market": market}, {"industry": industry}]},
+        )
+        ids = response.get("ids", [[]])[0]
+        if not ids:
+            return None
+
+        similarity = 1 - response["distances"][0][0]
+        cached_at = response["metadatas"][0][0].get("cached_at", 0)
+        if time.time() - cached_at > settings.RESEARCH_CACHE_TTL_SECONDS:
+            await asyncio.to_thread(collection.delete, ids=[ids[0]])
+            return None
+        if similarity < settings.RESEARCH_CACHE_SIMILARITY_THRESHOLD:
+            return None
+        return ids[0]
+
+    async def _semantic_store(self, digest: str, idea: str, market: str, industry: str) -> None:
+        """Index the normalized idea so similar submissions can find it."""
+        state = self._state()
+        collection = await self._get_collection(state)
+        if collection is None:
+            return
+
+        embedding = await state.embeddings.aembed_query(idea)
+        await asyncio.to_thread(
+            collection.upsert,
+            ids=[digest],
+            embeddings=[embedding],
+            documents=[idea],
+            metadatas=[{
+                "target_market": market,
+                "industry": industry,
+                "cached_at": time.time(),
+            }],
+        )
+
+
+# Global research cache instance
+research_cache = ResearchCache()
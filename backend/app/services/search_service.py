@@ -0,0 +1,178 @@
+"""
+Web search layer for ValidateIO agents.
+
+Sits in front of the Serper API used by the market research agent's
+web_search tool:
+- normalized queries are cached in Redis with a TTL
+- concurrent identical queries in a process collapse into one upstream call
+  (single-flight)
+- upstream calls share a pooled async HTTP client, are capped by a
+  concurrency limit per process and by the fleet-wide requests per minute
+  limit (app/services/rate_limiter.py), keeping bursts under the provider's
+  rate limit
+- each upstream call is charged to the validation that made it
+"""
+
+import asyncio
+import hashlib
+import logging
+import re
+import time
+import weakref
+from dataclasses import dataclass, field
+from typing import Any, Dict, List
+
+import httpx
+
+from app.core.config import settings
+from app.core.metrics import SEARCH_LATENCY, SEARCH_REQUESTS
+from app.core.redis import get_redis
+from app.services.cost_meter import cost_meter
+from app.services.rate_limiter import provider_limiter
+
+logger = logging.getLogger(__name__)
+
+SERPER_SEARCH_URL = "https://google.serper.dev/search"
+CACHE_PREFIX = "search_cache:"
+NO_RESULTS = "No good Google Search Result was found"
+
+
+def normalize_query(query: str) -> str:
+    """Lowercase and collapse whitespace so trivial variants share a cache entry."""
+    return re.sub(r"\s+", " ", query.lower()).strip()
+
+
+@dataclass
+class _LoopState:
+    """HTTP client, limiter and in-flight calls bound to one event loop."""
+
+    client: httpx.AsyncClient
+    semaphore: asyncio.Semaphore
+    in_flight: Dict[str, "asyncio.Future[str]"] = field(default_factory=dict)
+
+
+class SearchService:
+    """Cached, coalesced and rate-bounded web search."""
+
+    def __init__(self):
+        """Initialize the service; clients are created per event loop."""
+        self._states: weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, _LoopState] = (
+            weakref.WeakKeyDictionary()
+        )
+
+    def _state(self) -> _LoopState:
+        loop = asyncio.get_running_loop()
+        state = self._states.get(loop)
+        if state is None:
+            state = _LoopState(
+                client=httpx.AsyncClient(
+                    timeout=settings.SEARCH_TIMEOUT_SECONDS,
+                    limits=httpx.Limits(
+                        max_connections=settings.SEARCH_MAX_CONCURRENCY,
+                        max_keepalive_connections=settings.SEARCH_MAX_CONCURRENCY,
+                    ),
+                ),
+                semaphore=asyncio.Semaphore(settings.SEARCH_MAX_CONCURRENCY),
+            )
+            self._states[loop] = state
+        return state
+
+    async def search(self, query: str) -> str:
+        """
+        Search the web and return result snippets as text.
+
+        Args:
+            query: The search query
+
+        Returns:
+            Concatenated result snippets
+        """
+        normalized = normalize_query(query)
+        cache_key = CACHE_PREFIX + hashlib.sha256(normalized.encode()).hexdigest()
+
+        try:
+            cached = await get_redis().get(cache_key)
+        except Exception as e:
+            logger.warning(f"Search cache lookup failed: {e}")
+            cached = None
+        if cached is not None:
+            SEARCH_REQUESTS.labels(result="cache_hit").inc()
+            return cached.decode()
+
+        state = self._state()
+        pending = state.in_flight.get(normalized)
+        if pending is not None:
+            SEARCH_REQUESTS.labels(result="coalesced").inc()
+            return await asyncio.shield(pending)
+
+        pending = asyncio.ensure_future(self._fetch_and_cache(state, query, cache_key))
+        state.in_flight[normalized] = pending
+        pending.add_done_callback(lambda _: state.in_flight.pop(normalized, None))
+        return await asyncio.shield(pending)
+
+    async def _fetch_and_cache(self, state: _LoopState, query: str, cache_key: str) -> str:
+        """Call the provider once and store the result for later callers."""
+        result = await self._fetch(state, query)
+        try:
+            await get_redis().set(cache_key, result, ex=settings.SEARCH_CACHE_TTL_SECONDS)
+        except Exception as e:
+            logger.warning(f"Search cache store failed: {e}")
+        return result
+
+    async def _fetch(self, state: _LoopState, query: str) -> str:
+        """Call the Serper API under the concurrency limit."""
+        # Fleet-wide requests per minute; the semaphore only caps this process
+        await provider_limiter.acquire("serper", "search")
+        async with state.semaphore:
+            start_time = time.time()
+            try:
+                response = await state.client.post(
+                    SERPER_SEARCH_URL,
+                    headers={"X-API-KEY": settings.SERPER_API_KEY or ""},
+                    json={"q": query},
+                )
+                response.raise_for_status()
+            except Exception:
+                SEARCH_REQUESTS.labels(result="error").inc()
+                raise
+            finally:
+                SEARCH_LATENCY.observe(time.time() - start_time)
+
+        SEARCH_REQUESTS.labels(result="upstream").inc()
+        # Only upstream calls cost money; cache hits and coalesced callers are free
+        await cost_meter.record_search()
+        return " ".join(self._parse_snippets(response.json()))
+
+    @staticmethod
+    def _parse_snippets(results: Dict[str, Any], k: int = 10) -> List[str]:
+        """Extract snippets the same way GoogleSerperAPIWrapper does."""
+        answer_box = results.get("answerBox") or {}
+        if answer_box.get("answer"):
+            return [answer_box["answer"]]
+        if answer_box.get("snippet"):
+            return [answer_box["snippet"].replace("\n", " ")]
+        if answer_box.get("snippetHighlighted"):
+            return answer_box["snippetHighlighted"]
+
+        snippets = []
+        knowledge_graph = results.get("knowledgeGraph") or {}
+        if knowledge_graph:
+            title = knowledge_graph.get("title")
+            if knowledge_graph.get("type"):
+                snippets.append(f"{title}: {knowledge_graph['type']}.")
+            if knowledge_graph.get("description"):
+                snippets.append(knowledge_graph["description"])
+            for attribute, value in knowledge_graph.get("attributes", {}).items():
+                snippets.append(f"{title} {attribute}: {value}.")
+
+        for result in results.get("organic", [])[:k]:
+            if "snippet" in result:
+                snippets.append(result["snippet"])
+            for attribute, value in result.get("attributes", {}).items():
+                snippets.append(f"{attribute}: {value}.")
+
+        return snippets or [NO_RESULTS]
+
+
+# Global search service instance
+search_service = SearchService()
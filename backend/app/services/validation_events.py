@@ -0,0 +1,158 @@
+"""
+Validation event stream for ValidateIO.
+
+Pipeline stages and agent callbacks publish what a validation is doing -
+stage transitions, streamed LLM tokens, tool calls - to a Redis pub/sub
+channel of its own. API instances relay the channel to clients over SSE or
+WebSocket (see app/services/realtime_service.py), so progress shows up as
+it happens instead of on the next status poll.
+
+Lifecycle events (stage transitions, updates, completion) are also
+published to the owning user's channel, which feeds per-user dashboards.
+Workers do not know who owns a validation, so the API records the owner in
+Redis when the validation is queued and publishers look it up once per
+process.
+
+Events are JSON objects: {"type", "validation_id", "ts", ...payload}.
+Publishing is best effort; a Redis hiccup never fails a stage.
+"""
+
+import json
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, Optional
+
+from app.core.redis import get_redis, get_sync_redis
+
+logger = logging.getLogger(__name__)
+
+CHANNEL_PREFIX = "validation_events:"
+USER_CHANNEL_PREFIX = "user_events:"
+OWNER_PREFIX = "validation_owner:"
+OWNER_TTL_SECONDS = 7 * 86400
+OWNER_CACHE_SIZE = 10000
+
+# Events after which a validation's stream has nothing more to say
+TERMINAL_EVENTS = frozenset({"complete", "failed", "cancelled"})
+
+# Events carrying a validation's full current state; a newer one supersedes
+# older ones of the same type, so slow subscribers may coalesce them
+SNAPSHOT_EVENTS = frozenset({"update", "progress"})
+
+# validation id -> owner user id, for this process
+_owners: "OrderedDict[str, str]" = OrderedDict()
+
+
+def validation_channel(validation_id: str) -> str:
+    """Pub/sub channel carrying one validation's events."""
+    return f"{CHANNEL_PREFIX}{validation_id}"
+
+
+def user_channel(user_id: str) -> str:
+    """Pub/sub channel carrying lifecycle events for all of a user's validations."""
+    return f"{USER_CHANNEL_PREFIX}{user_id}"
+
+
+def encode_event(validation_id: str, event_type: str, **payload: Any) -> str:
+    """Serialize one event; the type comes first so relays can peek at it."""
+    return json.dumps(
+        {"type": event_type, "validation_id": validation_id, "ts": time.time(), **payload},
+        default=str,
+    )
+
+
+def _remember_owner(validation_id: str, user_id: str) -> None:
+    _owners[validation_id] = user_id
+    _owners.move_to_end(validation_id)
+    while len(_owners) > OWNER_CACHE_SIZE:
+        _owners.popitem(last=False)
+
+
+async def set_validation_owner(validation_id: str, user_id: str) -> None:
+    """Record who owns a validation so its lifecycle events reach their channel."""
+    _remember_owner(validation_id, str(user_id))
+    try:
+        await get_redis().set(f"{OWNER_PREFIX}{validation_id}", str(user_id), ex=OWNER_TTL_SECONDS)
+    except Exception as e:
+        logger.warning(f"Failed to record owner of validation {validation_id}: {e}")
+
+
+async def get_validation_owner(validation_id: str) -> Optional[str]:
+    """Owner of a validation, from the process cache or Redis."""
+    user_id = _owners.get(validation_id)
+    if user_id is None:
+        value = await get_redis().get(f"{OWNER_PREFIX}{validation_id}")
+        if value is None:
+            return None
+        user_id = value.decode() if isinstance(value, bytes) else value
+        _remember_owner(validation_id, user_id)
+    return user_id
+
+
+def _get_validation_owner_sync(validation_id: str) -> Optional[str]:
+    user_id = _owners.get(validation_id)
+    if user_id is None:
+        value = get_sync_redis().get(f"{OWNER_PREFIX}{validation_id}")
+        if value is None:
+            return None
+        user_id = value.decode() if isinstance(value, bytes) else value
+        _remember_owner(validation_id, user_id)
+    return user_id
+
+
+async def publish_event(
+    validation_id: str,
+    event_type: str,
+    *,
+    user_id: Optional[str] = None,
+    notify_owner: bool = False,
+    **payload: Any,
+) -> None:
+    """
+    Publish an event from async code (stages, agent callbacks, the API).
+
+    Args:
+        validation_id: The validation the event belongs to
+        event_type: "stage", "progress", "token", "tool", "update", "complete",
+            "failed" or "cancelled"
+        user_id: Also publish to this user's channel
+        notify_owner: Also publish to the owning user's channel, looking the
+            owner up when user_id is not given
+        **payload: Event fields
+    """
+    try:
+        message = encode_event(validation_id, event_type, **payload)
+        redis = get_redis()
+        if user_id is None and notify_owner:
+            user_id = await get_validation_owner(validation_id)
+        if user_id is None:
+            await redis.publish(validation_channel(validation_id), message)
+            return
+        async with redis.pipeline(transaction=False) as pipe:
+            pipe.publish(validation_channel(validation_id), message)
+            pipe.publish(user_channel(user_id), message)
+            await pipe.execute()
+    except Exception as e:
+        logger.warning(f"Failed to publish {event_type} event for validation {validation_id}: {e}")
+
+
+def publish_event_sync(
+    validation_id: str,
+    event_type: str,
+    *,
+    notify_owner: bool = False,
+    **payload: Any,
+) -> None:
+    """Publish an event from sync code (Celery task hooks); see publish_event."""
+    try:
+        message = encode_event(validation_id, event_type, **payload)
+        redis = get_sync_redis()
+        user_id = _get_validation_owner_sync(validation_id) if notify_owner else None
+        with redis.pipeline(transaction=False) as pipe:
+            pipe.publish(validation_channel(validation_id), message)
+            if user_id is not None:
+                pipe.publish(user_channel(user_id), message)
+            pipe.execute()
+    except Exception as e:
+        logger.warning(f"Failed to publish {event_type} event for validation {validation_id}: {e}")
@@ -0,0 +1,364 @@
+"""
+Validation persistence for ValidateIO.
+
+ValidationRepository holds the API's queries against the validations table.
+Listing selects summary columns only - the JSONB results are read by get
+alone - and pages with a keyset on (created_at, id) rather than OFFSET, so
+every page is an index range scan on idx_validations_user_created_at no
+matter how deep. The cursor is opaque to clients.
+
+Workers persist stage results through validation_writer instead of opening
+a session per stage. submit() only queues the change and returns; changes
+to the same validation are merged, and each event loop flushes its queue
+every VALIDATION_WRITE_FLUSH_SECONDS (or sooner once
+VALIDATION_WRITE_BATCH_SIZE validations are waiting) in one transaction on
+a pooled connection: one bulk upsert of validation_results rows and one
+bulk UPDATE of validations. A failed flush is retried on the
+next one, up to VALIDATION_WRITE_MAX_ATTEMPTS times.
+"""
+
+import asyncio
+import base64
+import binascii
+import json
+import logging
+import uuid
+import weakref
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Sequence, Set, Tuple, Union
+
+from sqlalchemy import Row, select, tuple_, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+
+from app.core.config import settings
+from app.core.metrics import VALIDATION_WRITE_BATCH_SIZE, VALIDATION_WRITES
+from app.db.session import AsyncSessionLocal
+from app.models.validation import Validation, ValidationStatus
+from app.models.validation_result import RESULT_STAGES, ValidationResult, encode_result
+
+logger = logging.getLogger(__name__)
+
+
+# Columns served by listings, as in the validation_summaries view
+SUMMARY_COLUMNS = (
+    Validation.id,
+    Validation.user_id,
+    Validation.business_idea,
+    Validation.target_market,
+    Validation.industry,
+    Validation.status,
+    Validation.task_id,
+    Validation.total_cost,
+    Validation.execution_time_seconds,
+    Validation.created_at,
+    Validation.updated_at,
+    Validation.completed_at,
+)
+
+
+def _as_uuid(value: Union[str, uuid.UUID]) -> uuid.UUID:
+    return value if isinstance(value, uuid.UUID) else uuid.UUID(str(value))
+
+
+def encode_cursor(created_at: datetime, validation_id: uuid.UUID) -> str:
+    """Opaque cursor pointing just past a listed validation."""
+    raw = json.dumps([created_at.isoformat(), str(validation_id)]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, uuid.UUID]:
+    """Position encoded by encode_cursor; raises ValueError if malformed."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        created_at, validation_id = json.loads(raw)
+        return datetime.fromisoformat(created_at), uuid.UUID(validation_id)
+    except (binascii.Error, TypeError, ValueError) as e:
+        raise ValueError(f"Invalid cursor: {cursor!r}") from e
+
+
+class ValidationRepository:
+    """Queries on the validations table, run on the caller's session."""
+
+    @staticmethod
+    async def create(
+        db: AsyncSession,
+        validation_id: str,
+        user_id: str,
+        business_idea: str,
+        target_market: Optional[str] = None,
+        industry: Optional[str] = None,
+    ) -> Validation:
+        """Insert a pending validation and flush it, so workers can update it."""
+        validation = Validation(
+            id=_as_uuid(validation_id),
+            user_id=_as_uuid(user_id),
+            business_idea=business_idea,
+            target_market=target_market,
+            industry=industry,
+            status=ValidationStatus.PENDING,
+            results=[],
+        )
+        db.add(validation)
+        await db.flush()
+        return validation
+
+    @staticmethod
+    async def get_for_user(
+        db: AsyncSession,
+        validation_id: str,
+        user_id: str,
+    ) -> Optional[Validation]:
+        """One of the user's validations with its results, or None."""
+        try:
+            validation_uuid = _as_uuid(validation_id)
+        except ValueError:
+            return None
+        result = await db.execute(
+            select(Validation)
+            .where(
+                Validation.id == validation_uuid,
+                Validation.user_id == _as_uuid(user_id),
+            )
+            .options(selectinload(Validation.results))
+        )
+        return result.scalar_one_or_none()
+
+    @staticmethod
+    async def owned_ids(
+        db: AsyncSession,
+        user_id: str,
+        validation_ids: Sequence[str],
+    ) -> Set[str]:
+        """Those of the given validation IDs that belong to the user, in one query."""
+        candidates = {}
+        for validation_id in validation_ids:
+            try:
+                candidates[_as_uuid(validation_id)] = validation_id
+            except ValueError:
+                continue
+        if not candidates:
+            return set()
+        result = await db.execute(
+            select(Validation.id).where(
+                Validation.user_id == _as_uuid(user_id),
+                Validation.id.in_(list(candidates)),
+            )
+        )
+        return {candidates[validation_uuid] for validation_uuid in result.scalars()}
+
+    @staticmethod
+    async def list_summaries_for_user(
+        db: AsyncSession,
+        user_id: str,
+        limit: int = 20,
+        cursor: Optional[str] = None,
+    ) -> Tuple[Sequence[Row], Optional[str]]:
+        """
+        A page of the user's validations, newest first, without results.
+        
+        Args:
+            db: Database session
+            user_id: Owner of the validations
+            limit: Page size
+            cursor: next_cursor of the previous page, or None for the first
+            
+        Returns:
+            Summary rows and the cursor of the next page (None on the last)
+            
+        Raises:
+            ValueError: If the cursor is malformed
+        """
+        query = (
+            select(*SUMMARY_COLUMNS)
+            .where(Validation.user_id == _as_uuid(user_id))
+            .order_by(Validation.created_at.desc(), Validation.id.desc())
+            # One extra row tells whether there is a next page
+            .limit(limit + 1)
+        )
+        if cursor is not None:
+            query = query.where(
+                tuple_(Validation.created_at, Validation.id) < tuple_(*decode_cursor(cursor))
+            )
+        rows = (await db.execute(query)).all()
+        if len(rows) <= limit:
+            return rows, None
+        rows = rows[:limit]
+        return rows, encode_cursor(rows[-1].created_at, rows[-1].id)
+
+
+@dataclass
+class _WriterState:
+    """Queued updates and flusher bound to one event loop."""
+
+    pending: Dict[uuid.UUID, Dict[str, Any]] = field(default_factory=dict)
+    attempts: Dict[uuid.UUID, int] = field(default_factory=dict)
+    full: asyncio.Event = field(default_factory=asyncio.Event)
+    flusher: Optional["asyncio.Task[None]"] = None
+
+
+def _upsert_results():
+    statement = pg_insert(ValidationResult)
+    return statement.on_conflict_do_update(
+        index_elements=[ValidationResult.validation_id, ValidationResult.stage],
+        set_={
+            name: statement.excluded[name]
+            for name in ("encoding", "payload", "compressed", "size_bytes", "updated_at")
+        },
+    )
+
+
+class ValidationWriter:
+    """Batches validation row updates off the stages' critical path."""
+
+    def __init__(self):
+        """Initialize the writer; queues are created per event loop."""
+        self._states: weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, _WriterState] = (
+            weakref.WeakKeyDictionary()
+        )
+        # Loop that sync callers (Celery task hooks) hand their updates to
+        self._home_loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def bind(self, loop: asyncio.AbstractEventLoop) -> None:
+        """Set the loop the worker runs its stages on, for updates submitted from sync code."""
+        self._home_loop = loop
+
+    def submit(self, validation_id: str, **fields: Any) -> None:
+        """
+        Queue column updates for a validation; never blocks.
+
+        Safe to call from sync code in a worker process: the update is then
+        handed to the loop given to bind().
+
+        Args:
+            validation_id: The validation to update
+            **fields: Validation columns and their new values, and stage
+                results by RESULT_STAGES name (market_research=...)
+        """
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            loop = None
+        if loop is not None:
+            self._enqueue(validation_id, fields)
+            return
+        home = self._home_loop
+        if home is None or home.is_closed():
+            logger.warning(f"No event loop to persist validation {validation_id}; update dropped")
+            return
+        home.call_soon_threadsafe(self._enqueue, validation_id, fields)
+
+    async def flush(self) -> None:
+        """Write everything queued on the current loop now."""
+        state = self._states.get(asyncio.get_running_loop())
+        if state is not None and state.pending:
+            await self._flush(state)
+
+    async def close(self) -> None:
+        """Drain the current loop's queue before the loop stops (worker shutdown)."""
+        state = self._states.get(asyncio.get_running_loop())
+        if state is None:
+            return
+        if state.flusher is not None:
+            # Wake the flusher and let it drain, retries included
+            state.full.set()
+            await state.flusher
+        elif state.pending:
+            await self._flush(state)
+
+    def _state(self) -> _WriterState:
+        loop = asyncio.get_running_loop()
+        state = self._states.get(loop)
+        if state is None:
+            state = _WriterState()
+            self._states[loop] = state
+        return state
+
+    def _enqueue(self, validation_id: str, fields: Dict[str, Any]) -> None:
+        state = self._state()
+        key = _as_uuid(validation_id)
+        state.pending.setdefault(key, {}).update(fields, updated_at=datetime.utcnow())
+        if len(state.pending) >= settings.VALIDATION_WRITE_BATCH_SIZE:
+            state.full.set()
+        if state.flusher is None:
+            state.flusher = asyncio.ensure_future(self._run(state))
+
+    async def _run(self, state: _WriterState) -> None:
+        """Flush on the interval, or early when a batch fills, until the queue is empty."""
+        while state.pending:
+            try:
+                await asyncio.wait_for(
+                    state.full.wait(), timeout=settings.VALIDATION_WRITE_FLUSH_SECONDS
+                )
+            except asyncio.TimeoutError:
+                pass
+            await self._flush(state)
+        state.flusher = None
+
+    async def _flush(self, state: _WriterState) -> None:
+        batch, state.pending = state.pending, {}
+        state.full.clear()
+        rows, result_rows = self._rows(batch)
+        VALIDATION_WRITE_BATCH_SIZE.observe(len(rows))
+        try:
+            async with AsyncSessionLocal() as session:
+                async with session.begin():
+                    if result_rows:
+                        # Results of validations without a row would fail the whole batch
+                        existing = set((await session.execute(
+                            select(Validation.id).where(
+                                Validation.id.in_({row["validation_id"] for row in result_rows})
+                            )
+                        )).scalars())
+                        result_rows = [row for row in result_rows if row["validation_id"] in existing]
+                    if result_rows:
+                        await session.execute(_upsert_results(), result_rows)
+                    # Rows with different column sets are grouped into one executemany each
+                    await session.execute(update(Validation), rows)
+        except Exception as e:
+            VALIDATION_WRITES.labels(result="failed").inc(len(rows))
+            logger.warning(f"Failed to persist {len(rows)} validation updates: {e}")
+            self._requeue(state, batch)
+            return
+        VALIDATION_WRITES.labels(result="written").inc(len(rows))
+        for key in batch:
+            state.attempts.pop(key, None)
+
+    @staticmethod
+    def _rows(
+        batch: Dict[uuid.UUID, Dict[str, Any]],
+    ) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+        """Split queued fields into validation row updates and encoded result rows."""
+        rows = []
+        result_rows = []
+        for key, fields in batch.items():
+            columns = {name: value for name, value in fields.items() if name not in RESULT_STAGES}
+            rows.append({"id": key, **columns})
+            for stage in RESULT_STAGES:
+                if stage in fields:
+                    result_rows.append({
+                        "validation_id": key,
+                        "stage": stage,
+                        **encode_result(fields[stage]),
+                        "created_at": columns["updated_at"],
+                        "updated_at": columns["updated_at"],
+                    })
+        return rows, result_rows
+
+    def _requeue(self, state: _WriterState, batch: Dict[uuid.UUID, Dict[str, Any]]) -> None:
+        for key, fields in batch.items():
+            attempts = state.attempts.get(key, 0) + 1
+            if attempts >= settings.VALIDATION_WRITE_MAX_ATTEMPTS:
+                state.attempts.pop(key, None)
+                VALIDATION_WRITES.labels(result="dropped").inc()
+                logger.error(f"Giving up persisting validation {key} after {attempts} attempts")
+                continue
+            state.attempts[key] = attempts
+            # Updates queued during the flush are newer and win
+            state.pending[key] = {**fields, **state.pending.get(key, {})}
+
+
+# Global writer instance for this process
+validation_writer = ValidationWriter()
@@ -1,9 +1,21 @@
+import asyncio
 import logging
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List
 from celery.result import AsyncResult
+from celery.utils import uuid
 
-from app.tasks.validation import run_full_validation
+from app.tasks.validation import (
+    marketing_draft_task_id,
+    pipeline_task_ids,
+    start_validation_pipeline,
+)
 from app.core.config import settings
+from app.schemas.validation import PipelineMode
+from app.services.realtime_service import realtime_service
+from app.models.validation import ValidationStatus
+from app.services.validation_events import publish_event, set_validation_owner
+from app.services.validation_repository import validation_writer
+from app.services.validation_status import validation_status
 
 logger = logging.getLogger(__name__)
 
@@ -18,6 +30,9 @@ class ValidationService:
         business_idea: str,
         target_market: Optional[str] = None,
         industry: Optional[str] = None,
+        bypass_cache: bool = False,
+        research_mode: Optional[str] = None,
+        pipeline_mode: Optional[str] = None,
     ) -> str:
         """
         Process a validation request asynchronously using Celery.
@@ -33,70 +48,177 @@ class ValidationService:
             business_idea: The business idea to validate
             target_market: Optional target market specification
             industry: Optional industry specification
+            bypass_cache: Skip cached market research
+            research_mode: "sequential" or "parallel" market research
+            pipeline_mode: "chain" or "dag" stage ordering
             
         Returns:
-            Celery task ID for tracking
+            Workflow ID for tracking the whole pipeline
         """
         logger.info(f"Starting validation process for {validation_id}")
         
-        # Queue the validation workflow
-        task = run_full_validation.delay(
-            validation_id=validation_id,
-            business_idea=business_idea,
-            target_market=target_market,
-            industry=industry
+        # Lets workers route lifecycle events to the user's topic
+        await set_validation_owner(validation_id, user_id)
+        
+        # Status record the stages report into; readable by validation_id
+        # alone. Written before publishing so a fast stage's updates (state,
+        # cost) are never overwritten by the initial pending record.
+        workflow_id = uuid()
+        mode = PipelineMode(pipeline_mode or settings.PIPELINE_MODE)
+        task_ids = pipeline_task_ids(workflow_id)
+        stage_task_ids = {
+            "market_research": task_ids["research"],
+            "experiments": task_ids["experiments"],
+        }
+        if mode == PipelineMode.DAG:
+            stage_task_ids["marketing_draft"] = marketing_draft_task_id(workflow_id)
+            stage_task_ids["marketing_refinement"] = task_ids["marketing"]
+        else:
+            stage_task_ids["marketing"] = task_ids["marketing"]
+        await validation_status.create(
+            validation_id,
+            task_id=workflow_id,
+            task_ids=stage_task_ids,
+            pipeline_mode=mode.value,
         )
         
-        # TODO: Update validation record in database with task_id
-        # await update_validation_task_id(validation_id, task.id)
+        # Publish the validation chain directly - no kickoff task. Publishing
+        # is blocking broker I/O (and may store claim-checked payloads in
+        # Redis), so it runs off the event loop.
+        try:
+            await asyncio.to_thread(
+                start_validation_pipeline,
+                validation_id=validation_id,
+                business_idea=business_idea,
+                target_market=target_market,
+                industry=industry,
+                bypass_cache=bypass_cache,
+                research_mode=research_mode,
+                pipeline_mode=mode.value,
+                workflow_id=workflow_id,
+            )
+        except Exception as e:
+            await validation_status.set_status(validation_id, "failed", error=f"Failed to queue validation: {e}")
+            raise
         
-        logger.info(f"Validation {validation_id} queued with task ID: {task.id}")
+        logger.info(f"Validation {validation_id} queued with workflow ID: {workflow_id}")
+        await realtime_service.broadcast_validation_update(
+            validation_id,
+            {"status": "pending", "task_id": workflow_id},
+            user_id=user_id,
+        )
         
-        return task.id
+        return workflow_id
     
     @staticmethod
     async def get_validation_status(
         validation_id: str,
-        task_id: str
-    ) -> Dict[str, Any]:
+        task_id: Optional[str] = None
+    ) -> Optional[Dict[str, Any]]:
         """
-        Get the current status of a validation task.
+        Get the current status of a validation pipeline.
+        
+        Reads the validation's status record - a single Redis lookup. The
+        pipeline result is fetched only once the validation has completed.
+        Without a record (expired, or queued before records existed) the
+        status is rebuilt from the stage task results when task_id is given.
         
         Args:
             validation_id: The validation ID
-            task_id: The Celery task ID
+            task_id: Optional workflow ID returned by process_validation
             
         Returns:
-            Status information including progress and current step
+            Status information including progress and current step, or None
+            if the validation is unknown
         """
-        result = AsyncResult(task_id)
+        status_info = await validation_status.get(validation_id)
+        if status_info is None:
+            if task_id is None:
+                return None
+            return await ValidationService._status_from_task_results(validation_id, task_id)
         
+        final_task_id = status_info["task_id"]
+        status_info["result"] = (
+            await ValidationService._task_result(final_task_id)
+            if status_info["status"] == "completed" and final_task_id else None
+        )
+        return status_info
+    
+    @staticmethod
+    async def get_validation_statuses(validation_ids: List[str]) -> Dict[str, Optional[Dict[str, Any]]]:
+        """
+        Get the status of many validations in one Redis round trip.
+        
+        Results are not included; fetch a completed validation individually.
+        
+        Args:
+            validation_ids: The validation IDs
+            
+        Returns:
+            Status per validation ID, None for unknown validations
+        """
+        return await validation_status.get_many(validation_ids)
+    
+    @staticmethod
+    async def _status_from_task_results(
+        validation_id: str,
+        task_id: str
+    ) -> Dict[str, Any]:
+        """Rebuild a validation's status from its stage task results."""
         status_map = {
             "PENDING": "pending",
             "STARTED": "processing",
+            "PROGRESS": "processing",
             "SUCCESS": "completed",
             "FAILURE": "failed",
             "RETRY": "processing",
             "REVOKED": "cancelled"
         }
+        stage_names = {
+            "research": "Market research",
+            "experiments": "Experiment generation",
+            "marketing": "Marketing campaigns",
+        }
         
-        status = status_map.get(result.state, "unknown")
+        stages = {
+            stage: AsyncResult(stage_task_id)
+            for stage, stage_task_id in pipeline_task_ids(task_id).items()
+        }
+        final = stages["marketing"]
         
-        # Get progress information
-        info = result.info or {}
+        status = "pending"
         progress = 0
         current_step = "Initializing validation"
         
-        if status == "processing" and isinstance(info, dict):
-            # Extract progress from task info
-            if "current" in info and "total" in info:
-                progress = int((info["current"] / info["total"]) * 100)
-            current_step = info.get("description", "Processing validation")
-        elif status == "completed":
-            progress = 100
+        completed_stages = 0
+        for stage, result in stages.items():
+            stage_status = status_map.get(result.state, "unknown")
+            if stage_status == "completed":
+                completed_stages += 1
+                continue
+            
+            info = result.info
+            if stage_status in ("failed", "cancelled"):
+                status = stage_status
+                current_step = f"{stage_names[stage]} failed: {info}"
+            elif stage_status == "processing" or completed_stages:
+                status = "processing"
+                current_step = stage_names[stage]
+                # Fold in-stage progress into the pipeline's progress
+                if isinstance(info, dict) and "current" in info and info.get("total"):
+                    progress = int(
+                        ((completed_stages + info["current"] / info["total"]) / len(stages)) * 100
+                    )
+                    current_step = info.get("description", current_step)
+            break
+        
+        if completed_stages == len(stages):
+            status = "completed"
             current_step = "Validation complete"
-        elif status == "failed":
-            current_step = f"Validation failed: {info}"
+        if status == "completed":
+            progress = 100
+        elif not progress:
+            progress = int((completed_stages / len(stages)) * 100)
         
         return {
             "validation_id": validation_id,
@@ -104,25 +226,45 @@ class ValidationService:
             "status": status,
             "progress": progress,
             "current_step": current_step,
-            "result": result.result if status == "completed" else None
+            "stages": {stage: result.state for stage, result in stages.items()},
+            "result": await ValidationService._task_result(final.id) if status == "completed" else None
         }
     
     @staticmethod
-    async def cancel_validation(task_id: str) -> bool:
+    async def _task_result(task_id: str) -> Any:
+        """A task's result, read off the event loop: decoding may fetch claim-checked payloads."""
+        return await asyncio.to_thread(lambda: AsyncResult(task_id).result)
+    
+    @staticmethod
+    def _revoke(task_ids: List[str]) -> None:
+        """Revoke stage tasks, terminating running ones; blocking broker I/O."""
+        for task_id in task_ids:
+            AsyncResult(task_id).revoke(terminate=True)
+    
+    @staticmethod
+    async def cancel_validation(task_id: str, validation_id: Optional[str] = None) -> bool:
         """
-        Cancel a running validation task.
+        Cancel a running validation pipeline.
         
         Args:
-            task_id: The Celery task ID
+            task_id: The workflow ID
+            validation_id: The validation ID, to notify realtime subscribers
             
         Returns:
             True if cancelled successfully
         """
         try:
-            result = AsyncResult(task_id)
-            result.revoke(terminate=True)
+            # Revoke every stage so later stages never start
+            stage_task_ids = [*pipeline_task_ids(task_id).values(), marketing_draft_task_id(task_id)]
+            await asyncio.to_thread(ValidationService._revoke, stage_task_ids)
             logger.info(f"Cancelled validation task: {task_id}")
-            return True
         except Exception as e:
             logger.error(f"Failed to cancel validation task {task_id}: {e}")
-            return False
\ No newline at end of file
+            return False
+        
+        if validation_id:
+            await validation_status.set_status(validation_id, "cancelled")
+            validation_writer.submit(validation_id, status=ValidationStatus.CANCELLED)
+            # Ends open streams as well as updating dashboards
+            await publish_event(validation_id, "cancelled", notify_owner=True, task_id=task_id)
+        return True
\ No newline at end of file
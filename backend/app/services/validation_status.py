@@ -0,0 +1,250 @@
+"""
+Per-validation status records for ValidateIO.
+
+Each validation has one Redis hash, validation_status:<id>, so its status
+is a single HGETALL by validation id, and a page of statuses is one
+pipelined round trip - no chasing Celery task ids. The API creates the
+record before it publishes the pipeline; each stage then writes only its own
+fields ("<stage>.state", "<stage>.current", ...) with HSET, so stages
+running concurrently in DAG mode never overwrite each other and nothing is
+read-modify-written. Pipeline-level status and progress are derived from
+the stage fields when the record is read.
+
+Fields:
+    status            pending | failed | cancelled (running/completed are derived)
+    pipeline_mode     chain | dag
+    task_id           workflow id; AsyncResult(task_id) holds the final result
+    task_ids          JSON map of stage -> Celery task id
+    cost_usd          accumulated LLM and search spend
+    prompt_tokens, completion_tokens   accumulated LLM token usage
+    created_at, updated_at, error
+    <stage>.state     running | completed | failed
+    <stage>.current, <stage>.total, <stage>.description
+    <stage>.started_at, <stage>.finished_at, <stage>.task_id
+"""
+
+import json
+import logging
+import time
+from typing import Any, Dict, List, Mapping, Optional
+
+from app.core.config import settings
+from app.core.redis import get_redis, get_sync_redis
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = "validation_status:"
+
+# Stages that make up each pipeline mode, in order
+PIPELINE_STAGES = {
+    "chain": ["market_research", "experiments", "marketing"],
+    "dag": ["market_research", "experiments", "marketing_draft", "marketing_refinement"],
+}
+
+
+def status_key(validation_id: str) -> str:
+    """Redis key of a validation's status record."""
+    return f"{KEY_PREFIX}{validation_id}"
+
+
+def _decode(raw: Mapping[Any, Any]) -> Dict[str, str]:
+    return {
+        (key.decode() if isinstance(key, bytes) else key): (
+            value.decode() if isinstance(value, bytes) else value
+        )
+        for key, value in raw.items()
+    }
+
+
+def summarize_status(validation_id: str, raw: Mapping[Any, Any]) -> Dict[str, Any]:
+    """Turn a status record into the API's status payload."""
+    record = _decode(raw)
+    stage_names = PIPELINE_STAGES.get(record.get("pipeline_mode", "chain"), PIPELINE_STAGES["chain"])
+    task_ids = json.loads(record.get("task_ids", "{}"))
+
+    stages: Dict[str, Dict[str, Any]] = {}
+    fractions = []
+    current_stage = None
+    for stage in stage_names:
+        state = record.get(f"{stage}.state", "pending")
+        started_at = record.get(f"{stage}.started_at")
+        finished_at = record.get(f"{stage}.finished_at")
+        current = int(record.get(f"{stage}.current", 0))
+        total = int(record.get(f"{stage}.total", 0))
+        stages[stage] = {
+            "state": state,
+            "current": current,
+            "total": total,
+            "description": record.get(f"{stage}.description"),
+            "started_at": float(started_at) if started_at else None,
+            "finished_at": float(finished_at) if finished_at else None,
+            "duration_seconds": (
+                float(finished_at) - float(started_at) if started_at and finished_at else None
+            ),
+            "task_id": record.get(f"{stage}.task_id") or task_ids.get(stage),
+        }
+        if state == "completed":
+            fractions.append(1.0)
+        elif state == "running":
+            fractions.append(current / total if total else 0.0)
+            current_stage = stage
+        else:
+            fractions.append(0.0)
+
+    status = record.get("status", "pending")
+    if status not in ("failed", "cancelled"):
+        if all(stage["state"] == "completed" for stage in stages.values()):
+            status = "completed"
+        elif any(stage["state"] != "pending" for stage in stages.values()):
+            status = "processing"
+
+    if status == "completed":
+        progress = 100
+        current_step = "Validation complete"
+    else:
+        progress = int(sum(fractions) / len(fractions) * 100)
+        if status in ("failed", "cancelled"):
+            current_step = record.get("error") or f"Validation {status}"
+        elif current_stage is not None:
+            current_step = stages[current_stage]["description"] or current_stage
+        else:
+            current_step = "Initializing validation"
+
+    return {
+        "validation_id": validation_id,
+        "task_id": record.get("task_id"),
+        "status": status,
+        "progress": progress,
+        "current_step": current_step,
+        "current_stage": current_stage,
+        "pipeline_mode": record.get("pipeline_mode"),
+        "stages": stages,
+        "task_ids": task_ids,
+        "cost_usd": float(record.get("cost_usd", 0)),
+        "prompt_tokens": int(record.get("prompt_tokens", 0)),
+        "completion_tokens": int(record.get("completion_tokens", 0)),
+        "created_at": float(record["created_at"]) if "created_at" in record else None,
+        "updated_at": float(record["updated_at"]) if "updated_at" in record else None,
+    }
+
+
+class ValidationStatusStore:
+    """Reads and writes validation status records."""
+
+    async def create(
+        self,
+        validation_id: str,
+        task_id: str,
+        task_ids: Dict[str, str],
+        pipeline_mode: str,
+    ) -> None:
+        """Create the record for a newly queued pipeline."""
+        now = time.time()
+        await self._write(validation_id, {
+            "status": "pending",
+            "pipeline_mode": pipeline_mode,
+            "task_id": task_id,
+            "task_ids": json.dumps(task_ids),
+            "cost_usd": 0,
+            "created_at": now,
+            "updated_at": now,
+        })
+
+    async def update_stage(self, validation_id: str, stage: str, **fields: Any) -> None:
+        """Set fields of one stage, e.g. state="running", current=2, total=4."""
+        await self._write(
+            validation_id,
+            {f"{stage}.{name}": value for name, value in fields.items() if value is not None},
+        )
+
+    async def set_status(self, validation_id: str, status: str, error: Optional[str] = None) -> None:
+        """Record a terminal status the stages cannot derive (failed, cancelled)."""
+        await self._write(validation_id, {"status": status, "error": error})
+
+    def set_status_sync(self, validation_id: str, status: str, error: Optional[str] = None) -> None:
+        """set_status for sync code (Celery task hooks)."""
+        mapping = self._mapping({"status": status, "error": error})
+        try:
+            with get_sync_redis().pipeline(transaction=False) as pipe:
+                pipe.hset(status_key(validation_id), mapping=mapping)
+                pipe.expire(status_key(validation_id), settings.VALIDATION_STATUS_TTL_SECONDS)
+                pipe.execute()
+        except Exception as e:
+            logger.warning(f"Failed to update status record of validation {validation_id}: {e}")
+
+    async def add_cost(
+        self,
+        validation_id: str,
+        amount_usd: float,
+        prompt_tokens: int = 0,
+        completion_tokens: int = 0,
+    ) -> Optional[float]:
+        """Add spend (and tokens) to the validation's running cost; the new total, or None."""
+        key = status_key(validation_id)
+        try:
+            async with get_redis().pipeline(transaction=False) as pipe:
+                pipe.hincrbyfloat(key, "cost_usd", amount_usd)
+                if prompt_tokens:
+                    pipe.hincrby(key, "prompt_tokens", prompt_tokens)
+                if completion_tokens:
+                    pipe.hincrby(key, "completion_tokens", completion_tokens)
+                pipe.expire(key, settings.VALIDATION_STATUS_TTL_SECONDS)
+                results = await pipe.execute()
+            return float(results[0])
+        except Exception as e:
+            logger.warning(f"Failed to add cost to validation {validation_id}: {e}")
+            return None
+
+    async def get_cost(self, validation_id: str) -> float:
+        """The validation's running cost; 0 when unknown."""
+        try:
+            return float(await get_redis().hget(status_key(validation_id), "cost_usd") or 0)
+        except Exception as e:
+            logger.warning(f"Failed to read cost of validation {validation_id}: {e}")
+            return 0.0
+
+    def get_cost_sync(self, validation_id: str) -> float:
+        """get_cost for sync code (Celery task hooks)."""
+        try:
+            return float(get_sync_redis().hget(status_key(validation_id), "cost_usd") or 0)
+        except Exception as e:
+            logger.warning(f"Failed to read cost of validation {validation_id}: {e}")
+            return 0.0
+
+    async def get(self, validation_id: str) -> Optional[Dict[str, Any]]:
+        """Status of one validation, or None when there is no record."""
+        raw = await get_redis().hgetall(status_key(validation_id))
+        if not raw:
+            return None
+        return summarize_status(validation_id, raw)
+
+    async def get_many(self, validation_ids: List[str]) -> Dict[str, Optional[Dict[str, Any]]]:
+        """Status of many validations in one round trip; None for missing records."""
+        async with get_redis().pipeline(transaction=False) as pipe:
+            for validation_id in validation_ids:
+                pipe.hgetall(status_key(validation_id))
+            records = await pipe.execute()
+        return {
+            validation_id: summarize_status(validation_id, raw) if raw else None
+            for validation_id, raw in zip(validation_ids, records)
+        }
+
+    @staticmethod
+    def _mapping(fields: Dict[str, Any]) -> Dict[str, Any]:
+        mapping = {name: value for name, value in fields.items() if value is not None}
+        mapping["updated_at"] = time.time()
+        return mapping
+
+    async def _write(self, validation_id: str, fields: Dict[str, Any]) -> None:
+        # Status records are best effort; a Redis hiccup never fails a stage
+        try:
+            async with get_redis().pipeline(transaction=False) as pipe:
+                pipe.hset(status_key(validation_id), mapping=self._mapping(fields))
+                pipe.expire(status_key(validation_id), settings.VALIDATION_STATUS_TTL_SECONDS)
+                await pipe.execute()
+        except Exception as e:
+            logger.warning(f"Failed to update status record of validation {validation_id}: {e}")
+
+
+# Global status store instance
+validation_status = ValidationStatusStore()
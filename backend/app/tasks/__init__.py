@@ -4,12 +4,14 @@ from .validation import (
     run_market_research,
     run_experiment_generation,
     run_marketing_campaigns,
-    run_full_validation
+    run_full_validation,
+    start_validation_pipeline,
 )
 
 __all__ = [
     "run_market_research",
     "run_experiment_generation", 
     "run_marketing_campaigns",
-    "run_full_validation"
+    "run_full_validation",
+    "start_validation_pipeline",
 ]
\ No newline at end of file
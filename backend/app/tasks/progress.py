@@ -0,0 +1,145 @@
+"""
+In-stage progress reporting for validation tasks.
+
+A stage reports progress as its agent works - each LLM call and tool call
+is a step - through StageProgress. Every report is published to the
+validation's realtime channel as a "progress" event, and at most every
+PROGRESS_UPDATE_INTERVAL_SECONDS it is also stored as the task's custom
+PROGRESS state with {current, total, description}, which
+ValidationService.get_validation_status folds into the pipeline's progress.
+Reports and stage completion are also written to the validation's status
+record (app/services/validation_status.py).
+
+Stage coroutines do not receive the Celery request, since the same
+coroutines run on the asyncio worker. The executing task sets
+`stage_request` instead and the coroutine reads it from its context.
+"""
+
+import asyncio
+import contextvars
+import logging
+import time
+from typing import Any, Dict, Optional
+
+from app.core.config import settings
+from app.services.validation_events import publish_event
+from app.services.validation_status import validation_status
+from app.worker import celery_app
+
+logger = logging.getLogger(__name__)
+
+PROGRESS = "PROGRESS"
+
+# Celery request of the task running the current stage, if any
+stage_request: "contextvars.ContextVar[Optional[Any]]" = contextvars.ContextVar(
+    "stage_request", default=None
+)
+
+# Typical number of steps (LLM calls plus tool calls) per stage. Progress
+# stops just short of 100% until the stage actually finishes.
+EXPECTED_STEPS = {
+    "market_research": 10,
+    "experiments": 4,
+    "marketing": 4,
+    "marketing_draft": 4,
+    "marketing_refinement": 2,
+}
+
+STAGE_LABELS = {
+    "market_research": "Market research",
+    "experiments": "Experiment generation",
+    "marketing": "Marketing campaigns",
+    "marketing_draft": "Marketing draft",
+    "marketing_refinement": "Marketing refinement",
+}
+
+
+class StageProgress:
+    """Throttled progress reporter for one stage run."""
+
+    def __init__(self, validation_id: str, stage: str):
+        self.validation_id = validation_id
+        self.stage = stage
+        self.label = STAGE_LABELS.get(stage, stage)
+        self.request = stage_request.get()
+        self.total = EXPECTED_STEPS.get(stage, 1)
+        self.current = 0
+        self.started_at: Optional[float] = None
+        self._last_store = 0.0
+        self._pending: Optional[asyncio.Future[None]] = None
+
+    async def report(self, description: str, advance: int = 0) -> None:
+        """
+        Report what the stage is doing, optionally completing steps.
+
+        Args:
+            description: Human-readable current step
+            advance: Number of steps completed since the last report
+        """
+        self.current = min(self.current + advance, self.total - 1)
+        meta = {
+            "current": self.current,
+            "total": self.total,
+            "description": description,
+            "stage": self.stage,
+        }
+        if settings.VALIDATION_STREAMING_ENABLED:
+            await publish_event(self.validation_id, "progress", notify_owner=True, **meta)
+        
+        first_report = self.started_at is None
+        if first_report:
+            self.started_at = time.time()
+        await validation_status.update_stage(
+            self.validation_id,
+            self.stage,
+            state="running",
+            current=self.current,
+            total=self.total,
+            description=description,
+            started_at=self.started_at if first_report else None,
+            task_id=getattr(self.request, "id", None) if first_report else None,
+        )
+        self._store(meta)
+
+    def _store(self, meta: Dict[str, Any]) -> None:
+        """Write the PROGRESS state off the event loop, throttled."""
+        if self.request is None or not getattr(self.request, "id", None):
+            return
+        now = time.monotonic()
+        if now - self._last_store < settings.PROGRESS_UPDATE_INTERVAL_SECONDS:
+            return
+        if self._pending is not None and not self._pending.done():
+            return
+        self._last_store = now
+        self._pending = asyncio.get_running_loop().run_in_executor(
+            None, self._store_sync, meta
+        )
+
+    def _store_sync(self, meta: Dict[str, Any]) -> None:
+        try:
+            celery_app.backend.store_result(
+                self.request.id, meta, PROGRESS, request=self.request
+            )
+        except Exception as e:
+            logger.warning(f"Failed to store progress for task {self.request.id}: {e}")
+
+    async def complete(self) -> None:
+        """
+        Mark the stage completed in the status record.
+
+        Called before the stage returns. Waits for an in-flight PROGRESS
+        write first, so a late write cannot overwrite the SUCCESS state the
+        worker stores next.
+        """
+        if self._pending is not None:
+            await self._pending
+            self._pending = None
+        self.current = self.total
+        await validation_status.update_stage(
+            self.validation_id,
+            self.stage,
+            state="completed",
+            current=self.total,
+            total=self.total,
+            finished_at=time.time(),
+        )
@@ -0,0 +1,100 @@
+"""
+Worker-scoped event loop for running agent coroutines from Celery tasks.
+
+Celery tasks are synchronous, while the agents are async. Creating and
+closing a loop per task throws away every async HTTP connection pool the
+agents hold, so each task reconnects to the LLM and search providers. The
+runner keeps one loop alive in a background thread for the lifetime of the
+worker process and tasks submit their coroutines to it.
+"""
+
+import asyncio
+import logging
+import threading
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from typing import Any, Coroutine, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class EventLoopRunner:
+    """Long-lived event loop running in a daemon thread."""
+
+    def __init__(self):
+        """Initialize the runner without starting the loop."""
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    @property
+    def loop(self) -> asyncio.AbstractEventLoop:
+        """The running loop, started on first access."""
+        self.start()
+        return self._loop
+
+    @property
+    def is_running(self) -> bool:
+        """Whether the background loop is alive."""
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> None:
+        """Start the background loop if it is not already running."""
+        with self._lock:
+            if self.is_running:
+                return
+            self._loop = asyncio.new_event_loop()
+            ready = threading.Event()
+            self._thread = threading.Thread(
+                target=self._run_forever,
+                args=(ready,),
+                name="validateio-event-loop",
+                daemon=True,
+            )
+            self._thread.start()
+            ready.wait()
+            logger.info("Worker event loop started")
+
+    def _run_forever(self, ready: threading.Event) -> None:
+        """Thread target that owns the loop."""
+        asyncio.set_event_loop(self._loop)
+        self._loop.call_soon(ready.set)
+        self._loop.run_forever()
+
+    def run(self, coro: Coroutine[Any, Any, Any], timeout: Optional[float] = None) -> Any:
+        """
+        Run a coroutine on the worker loop and block until it finishes.
+
+        Args:
+            coro: The coroutine to run
+            timeout: Optional timeout in seconds
+
+        Returns:
+            The coroutine's result
+        """
+        future = asyncio.run_coroutine_threadsafe(coro, self.loop)
+        try:
+            return future.result(timeout=timeout)
+        except FutureTimeoutError:
+            future.cancel()
+            raise
+        except BaseException:
+            # Celery's soft time limit is raised in this thread; make sure the
+            # coroutine does not keep running on the shared loop.
+            future.cancel()
+            raise
+
+    def stop(self, timeout: float = 5.0) -> None:
+        """Stop the loop and join the background thread."""
+        with self._lock:
+            if not self.is_running:
+                return
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join(timeout=timeout)
+            self._loop.close()
+            self._loop = None
+            self._thread = None
+            logger.info("Worker event loop stopped")
+
+
+# Global event loop runner for this worker process
+loop_runner = EventLoopRunner()
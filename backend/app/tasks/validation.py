@@ -5,30 +5,465 @@ These tasks handle the async execution of:
 - Market research
 - Experiment generation  
 - Marketing campaign creation
+
+Each stage is implemented as a coroutine so it can run either inside a
+Celery task (on the worker's long-lived event loop) or directly on the
+asyncio worker in app/async_worker.py.
+
+Stages publish their progress and their agents' streamed output to the
+validation's event channel (app/services/validation_events.py).
+
+Each stage charges its LLM calls and searches to the validation
+(app/services/cost_meter.py): a stage does not start once the budget is
+spent, and skips optional work when it is nearly spent.
 """
 
 import asyncio
+import inspect
 import logging
+import random
 import time
-from typing import Any, Dict
-from celery import Task
+from datetime import datetime
+from typing import Any, Coroutine, Dict, List, Optional
+from celery import Task, chain, group
+from celery.utils import uuid
 from app.worker import celery_app
-from app.agents import MarketResearchAgent, ExperimentGeneratorAgent, MarketingAutopilotAgent
+from app.agents.experiment_generator_agent import insight_similarity
+from app.agents.pool import agent_pool
+from app.agents.streaming import StageProgressHandler, ValidationEventHandler
 from app.core.config import settings
+from app.core.metrics import (
+    MARKETING_REFINEMENTS,
+    RESEARCH_CACHE_REQUESTS,
+    SPECULATIVE_EXPERIMENTS,
+    STAGE_DURATION,
+    VALIDATION_COST,
+)
+from app.models.validation import ValidationStatus
+from app.schemas.validation import PipelineMode
+from app.services.cost_meter import BudgetExceeded, cost_meter, meter_validation
+from app.services.research_cache import research_cache
+from app.services.validation_events import publish_event, publish_event_sync
+from app.services.validation_repository import validation_writer
+from app.services.validation_status import validation_status
+from app.tasks.progress import StageProgress, stage_request
+from app.tasks.runner import loop_runner
 
 logger = logging.getLogger(__name__)
 
 
 class ValidationTask(Task):
-    """Base task with error handling and cost tracking."""
+    """Base task with error handling and cost tracking; BudgetExceeded is never retried."""
     
     def on_failure(self, exc, task_id, args, kwargs, einfo):
         """Handle task failure."""
         logger.error(f"Task {task_id} failed: {exc}")
+        
+        # Retries are exhausted; the validation is over
+        validation_id = inspect.signature(self.run).bind_partial(*args, **kwargs).arguments.get(
+            "validation_id"
+        )
+        if not validation_id:
+            return
+        validation_status.set_status_sync(validation_id, "failed", error=f"{self.name}: {exc}")
+        validation_writer.submit(
+            validation_id,
+            status=ValidationStatus.FAILED,
+            total_cost=validation_status.get_cost_sync(validation_id),
+        )
+        if settings.VALIDATION_STREAMING_ENABLED:
+            publish_event_sync(
+                validation_id, "failed", notify_owner=True, task=self.name, error=str(exc)
+            )
     
     def on_retry(self, exc, task_id, args, kwargs, einfo):
         """Handle task retry."""
         logger.warning(f"Task {task_id} retrying: {exc}")
+    
+    def run_stage(self, coro: Coroutine[Any, Any, Dict[str, Any]]) -> Dict[str, Any]:
+        """Run a stage coroutine on the worker's long-lived event loop, reporting progress on this task."""
+        # The coroutine runs in a copy of this thread's context
+        token = stage_request.set(self.request)
+        try:
+            return loop_runner.run(coro)
+        finally:
+            stage_request.reset(token)
+
+
+def retry_countdown(retries: int) -> float:
+    """
+    Seconds before retrying a stage: exponential backoff with full jitter.
+    
+    Providers fail over within a call (app/agents/providers.py), so a stage
+    that still fails is retried soon rather than after a fixed minute.
+    """
+    ceiling = min(settings.TASK_RETRY_BASE_SECONDS * 2 ** retries, settings.TASK_RETRY_MAX_SECONDS)
+    return random.uniform(ceiling / 2, ceiling)
+
+
+def stage_callbacks(
+    validation_id: str,
+    stage: str,
+    progress: Optional[StageProgress] = None,
+) -> List[Any]:
+    """Callback handlers streaming a stage's agent output and reporting its progress."""
+    callbacks: List[Any] = []
+    if settings.VALIDATION_STREAMING_ENABLED:
+        callbacks.append(ValidationEventHandler(validation_id, stage))
+    if progress is not None:
+        callbacks.append(StageProgressHandler(progress.report, progress.label))
+    return callbacks
+
+
+async def publish_stage_event(validation_id: str, event_type: str, **payload: Any) -> None:
+    """Publish a stage lifecycle event, also to the owner's channel, when streaming is enabled."""
+    if settings.VALIDATION_STREAMING_ENABLED:
+        await publish_event(validation_id, event_type, notify_owner=True, **payload)
+
+
+async def start_metered_stage(validation_id: str, stage: str) -> None:
+    """Charge the stage's calls to the validation; raise BudgetExceeded if its budget is spent."""
+    meter_validation(validation_id, stage)
+    await cost_meter.check(validation_id)
+
+
+async def persist_final_results(
+    validation_id: str,
+    pipeline_results: Dict[str, Any],
+    marketing: Dict[str, Any],
+) -> None:
+    """
+    Store the final stage's results and mark the validation completed.
+    
+    The queue is flushed right away rather than on the interval, so a
+    client fetching the validation on the "complete" event sees its results.
+    """
+    stage_times = [
+        pipeline_results.get("market_research", {}).get("execution_time_seconds", 0),
+        pipeline_results.get("experiments", {}).get("execution_time_seconds", 0),
+        marketing.get("execution_time_seconds", 0),
+    ]
+    total_cost = await cost_meter.spent(validation_id)
+    VALIDATION_COST.observe(total_cost)
+    validation_writer.submit(
+        validation_id,
+        marketing_campaigns=marketing,
+        status=ValidationStatus.COMPLETED,
+        completed_at=datetime.utcnow(),
+        execution_time_seconds=sum(stage_times),
+        total_cost=total_cost,
+    )
+    await validation_writer.flush()
+
+
+async def market_research_stage(
+    validation_id: str,
+    business_idea: str,
+    target_market: str = None,
+    industry: str = None,
+    bypass_cache: bool = False,
+    research_mode: str = None,
+) -> Dict[str, Any]:
+    """Run the market research agent (or serve it from cache) and attach stage metadata."""
+    logger.info(f"Starting market research for validation {validation_id}")
+    await start_metered_stage(validation_id, "market_research")
+    start_time = time.time()
+    await publish_stage_event(validation_id, "stage", stage="market_research", status="started")
+    progress = StageProgress(validation_id, "market_research")
+    await progress.report("Starting market research")
+    validation_writer.submit(validation_id, status=ValidationStatus.PROCESSING)
+    
+    cached = None
+    if bypass_cache:
+        RESEARCH_CACHE_REQUESTS.labels(result="bypass").inc()
+    else:
+        cached = await research_cache.get(business_idea, target_market, industry)
+    
+    speculation = None
+    # Speculative experiments may be thrown away; skip them when the budget is tight
+    speculate = settings.SPECULATIVE_EXPERIMENTS and not await cost_meter.should_downgrade(validation_id)
+    
+    def start_speculation(partial_research: Dict[str, Any]) -> None:
+        # Overlap experiment generation with the rest of the research
+        nonlocal speculation
+        logger.info(f"Starting speculative experiments for validation {validation_id}")
+        speculation = asyncio.ensure_future(
+            _speculative_experiments(validation_id, business_idea, partial_research)
+        )
+    
+    if cached is not None:
+        results, cache_tier = cached
+        logger.info(f"Serving market research for {validation_id} from {cache_tier} cache")
+        await progress.report(f"Market research served from {cache_tier} cache")
+    else:
+        cache_tier = None
+        try:
+            # Lease a warm market research agent from the process pool
+            with agent_pool.lease("market_research") as agent:
+                results = await agent.research(
+                    business_idea=business_idea,
+                    target_market=target_market,
+                    industry=industry,
+                    research_mode=research_mode,
+                    on_partial=start_speculation if speculate else None,
+                    callbacks=stage_callbacks(validation_id, "market_research", progress)
+                )
+        except BaseException:
+            if speculation is not None:
+                speculation.cancel()
+            raise
+        await research_cache.set(business_idea, target_market, industry, results)
+    
+    execution_time = time.time() - start_time
+    logger.info(f"Market research completed in {execution_time:.2f} seconds")
+    STAGE_DURATION.labels(stage="market_research").observe(execution_time)
+    await progress.complete()
+    await publish_stage_event(
+        validation_id, "stage", stage="market_research", status="completed",
+        execution_time_seconds=execution_time, cache=cache_tier,
+    )
+    
+    # Add metadata
+    results["execution_time_seconds"] = execution_time
+    results["validation_id"] = validation_id
+    results["cache"] = cache_tier
+    
+    # Persist a copy; the speculative experiments are not part of the research
+    validation_writer.submit(
+        validation_id,
+        market_research=dict(results),
+        total_cost=await cost_meter.spent(validation_id),
+    )
+    
+    # Hand speculative experiments to the experiments stage for reconciliation
+    if speculation is not None:
+        try:
+            results["speculative_experiments"] = await speculation
+        except Exception as e:
+            SPECULATIVE_EXPERIMENTS.labels(result="failed").inc()
+            logger.warning(f"Speculative experiments failed for validation {validation_id}: {e}")
+    
+    return results
+
+
+async def _speculative_experiments(
+    validation_id: str,
+    business_idea: str,
+    partial_research: Dict[str, Any],
+) -> Dict[str, Any]:
+    """Generate experiments from partial research while the research finishes."""
+    with agent_pool.lease("experiment_generator") as agent:
+        results = await agent.generate_experiments(
+            business_idea=business_idea,
+            market_research=partial_research,
+            callbacks=stage_callbacks(validation_id, "experiments")
+        )
+    return {"market_research": partial_research, "experiments": results}
+
+
+async def experiment_generation_stage(
+    market_research: Dict[str, Any],
+    validation_id: str,
+    business_idea: str,
+) -> Dict[str, Any]:
+    """
+    Run the experiment generator agent on the research stage's result.
+    
+    If the research stage already generated experiments from partial
+    research, they are kept unless the final research diverged too far.
+    """
+    logger.info(f"Starting experiment generation for validation {validation_id}")
+    await start_metered_stage(validation_id, "experiments")
+    start_time = time.time()
+    await publish_stage_event(validation_id, "stage", stage="experiments", status="started")
+    progress = StageProgress(validation_id, "experiments")
+    await progress.report("Starting experiment generation")
+    
+    results = None
+    speculative = market_research.pop("speculative_experiments", None)
+    if speculative is not None:
+        similarity = insight_similarity(speculative["market_research"], market_research)
+        if similarity >= settings.SPECULATIVE_EXPERIMENTS_MIN_SIMILARITY:
+            SPECULATIVE_EXPERIMENTS.labels(result="reused").inc()
+            results = speculative["experiments"]
+        else:
+            SPECULATIVE_EXPERIMENTS.labels(result="rerun").inc()
+            logger.info(
+                f"Final research diverged from partial (similarity {similarity:.2f}), "
+                f"regenerating experiments for validation {validation_id}"
+            )
+    
+    if results is None:
+        # Lease a warm experiment generator agent from the process pool
+        with agent_pool.lease("experiment_generator") as agent:
+            results = await agent.generate_experiments(
+                business_idea=business_idea,
+                market_research=market_research,
+                callbacks=stage_callbacks(validation_id, "experiments", progress)
+            )
+    
+    execution_time = time.time() - start_time
+    logger.info(f"Experiment generation completed in {execution_time:.2f} seconds")
+    STAGE_DURATION.labels(stage="experiments").observe(execution_time)
+    await progress.complete()
+    await publish_stage_event(
+        validation_id, "stage", stage="experiments", status="completed",
+        execution_time_seconds=execution_time,
+    )
+    
+    # Add metadata
+    results["execution_time_seconds"] = execution_time
+    results["validation_id"] = validation_id
+    
+    validation_writer.submit(
+        validation_id,
+        experiments=results,
+        total_cost=await cost_meter.spent(validation_id),
+    )
+    
+    return {
+        "validation_id": validation_id,
+        "market_research": market_research,
+        "experiments": results,
+    }
+
+
+async def marketing_campaigns_stage(
+    pipeline_results: Dict[str, Any],
+    validation_id: str,
+    business_idea: str,
+) -> Dict[str, Any]:
+    """Run the marketing autopilot agent on the research and experiment results."""
+    market_research = pipeline_results.get("market_research", {})
+    experiments = pipeline_results.get("experiments", {})
+    
+    logger.info(f"Starting marketing campaign creation for validation {validation_id}")
+    await start_metered_stage(validation_id, "marketing")
+    start_time = time.time()
+    await publish_stage_event(validation_id, "stage", stage="marketing", status="started")
+    progress = StageProgress(validation_id, "marketing")
+    await progress.report("Starting marketing campaign creation")
+    
+    # Lease a warm marketing autopilot agent from the process pool
+    with agent_pool.lease("marketing_autopilot") as agent:
+        results = await agent.generate_campaigns(
+            business_idea=business_idea,
+            market_research=market_research,
+            experiment_results=experiments,
+            callbacks=stage_callbacks(validation_id, "marketing", progress)
+        )
+    
+    execution_time = time.time() - start_time
+    logger.info(f"Marketing campaign creation completed in {execution_time:.2f} seconds")
+    STAGE_DURATION.labels(stage="marketing").observe(execution_time)
+    await progress.complete()
+    await publish_stage_event(
+        validation_id, "stage", stage="marketing", status="completed",
+        execution_time_seconds=execution_time,
+    )
+    
+    # Add metadata
+    results["execution_time_seconds"] = execution_time
+    results["validation_id"] = validation_id
+    
+    await persist_final_results(validation_id, pipeline_results, results)
+    await publish_stage_event(validation_id, "complete")
+    
+    return {
+        **pipeline_results,
+        "marketing_campaigns": results,
+        "pipeline_complete": True,
+    }
+
+
+async def marketing_draft_stage(
+    market_research: Dict[str, Any],
+    validation_id: str,
+    business_idea: str,
+) -> Dict[str, Any]:
+    """Draft marketing campaigns from research alone, alongside experiment generation."""
+    logger.info(f"Starting marketing campaign draft for validation {validation_id}")
+    await start_metered_stage(validation_id, "marketing_draft")
+    start_time = time.time()
+    await publish_stage_event(validation_id, "stage", stage="marketing_draft", status="started")
+    progress = StageProgress(validation_id, "marketing_draft")
+    await progress.report("Drafting marketing campaigns from research")
+    
+    # Lease a warm marketing autopilot agent from the process pool
+    with agent_pool.lease("marketing_autopilot") as agent:
+        results = await agent.generate_campaigns(
+            business_idea=business_idea,
+            market_research=market_research,
+            callbacks=stage_callbacks(validation_id, "marketing_draft", progress)
+        )
+    
+    execution_time = time.time() - start_time
+    logger.info(f"Marketing campaign draft completed in {execution_time:.2f} seconds")
+    STAGE_DURATION.labels(stage="marketing_draft").observe(execution_time)
+    await progress.complete()
+    await publish_stage_event(
+        validation_id, "stage", stage="marketing_draft", status="completed",
+        execution_time_seconds=execution_time,
+    )
+    
+    # Add metadata
+    results["execution_time_seconds"] = execution_time
+    results["validation_id"] = validation_id
+    
+    return results
+
+
+async def marketing_refinement_stage(
+    stage_results: List[Dict[str, Any]],
+    validation_id: str,
+    business_idea: str,
+) -> Dict[str, Any]:
+    """Fold experiment headlines and audiences into the marketing draft."""
+    pipeline_results, draft = stage_results
+    
+    logger.info(f"Starting marketing campaign refinement for validation {validation_id}")
+    await start_metered_stage(validation_id, "marketing_refinement")
+    start_time = time.time()
+    await publish_stage_event(validation_id, "stage", stage="marketing_refinement", status="started")
+    progress = StageProgress(validation_id, "marketing_refinement")
+    await progress.report("Refining marketing campaigns with experiment results")
+    
+    if await cost_meter.should_downgrade(validation_id):
+        # The draft is already a complete set of campaigns
+        logger.info(f"Budget nearly spent, keeping marketing draft for validation {validation_id}")
+        MARKETING_REFINEMENTS.labels(result="kept_draft").inc()
+        results = dict(draft)
+    else:
+        # Lease a warm marketing autopilot agent from the process pool
+        with agent_pool.lease("marketing_autopilot") as agent:
+            results = await agent.refine_campaigns(
+                business_idea=business_idea,
+                draft=draft,
+                experiment_results=pipeline_results.get("experiments", {}),
+                callbacks=stage_callbacks(validation_id, "marketing_refinement", progress)
+            )
+    
+    execution_time = time.time() - start_time
+    logger.info(f"Marketing campaign refinement completed in {execution_time:.2f} seconds")
+    STAGE_DURATION.labels(stage="marketing_refinement").observe(execution_time)
+    await progress.complete()
+    await publish_stage_event(
+        validation_id, "stage", stage="marketing_refinement", status="completed",
+        execution_time_seconds=execution_time,
+    )
+    
+    # Add metadata
+    results["execution_time_seconds"] = draft.get("execution_time_seconds", 0) + execution_time
+    results["validation_id"] = validation_id
+    
+    await persist_final_results(validation_id, pipeline_results, results)
+    await publish_stage_event(validation_id, "complete")
+    
+    return {
+        **pipeline_results,
+        "marketing_campaigns": results,
+        "pipeline_complete": True,
+    }
 
 
 @celery_app.task(
@@ -44,6 +479,8 @@ def run_market_research(
     business_idea: str,
     target_market: str = None,
     industry: str = None,
+    bypass_cache: bool = False,
+    research_mode: str = None,
 ) -> Dict[str, Any]:
     """
     Run market research for a business idea.
@@ -53,45 +490,31 @@ def run_market_research(
         business_idea: The business idea to research
         target_market: Optional target market
         industry: Optional industry
+        bypass_cache: Skip the research cache and run the agent
+        research_mode: "sequential" or "parallel" research
         
     Returns:
         Market research results
     """
     try:
-        logger.info(f"Starting market research for validation {validation_id}")
-        start_time = time.time()
-        
-        # Initialize and run the market research agent
-        agent = MarketResearchAgent()
-        
-        # Run async method in sync context
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-        try:
-            results = loop.run_until_complete(
-                agent.research(
-                    business_idea=business_idea,
-                    target_market=target_market,
-                    industry=industry
-                )
+        # Run on the worker's long-lived event loop
+        return self.run_stage(
+            market_research_stage(
+                validation_id=validation_id,
+                business_idea=business_idea,
+                target_market=target_market,
+                industry=industry,
+                bypass_cache=bypass_cache,
+                research_mode=research_mode
             )
-        finally:
-            loop.close()
-        
-        execution_time = time.time() - start_time
-        logger.info(f"Market research completed in {execution_time:.2f} seconds")
-        
-        # Add metadata
-        results["execution_time_seconds"] = execution_time
-        results["validation_id"] = validation_id
-        
-        # TODO: Update validation record in database with results
-        
-        return results
+        )
         
+    except BudgetExceeded:
+        # Retrying cannot bring the validation back under budget
+        raise
     except Exception as e:
         logger.error(f"Market research failed for validation {validation_id}: {str(e)}")
-        self.retry(exc=e, countdown=60)
+        self.retry(exc=e, countdown=retry_countdown(self.request.retries))
 
 
 @celery_app.task(
@@ -103,55 +526,40 @@ def run_market_research(
 )
 def run_experiment_generation(
     self,
+    market_research: Dict[str, Any],
     validation_id: str,
     business_idea: str,
-    market_research: Dict[str, Any],
 ) -> Dict[str, Any]:
     """
     Generate experiments based on market research.
     
+    The research result comes first so the task can follow
+    run_market_research directly in a chain.
+    
     Args:
+        market_research: Results from market research
         validation_id: The validation request ID
         business_idea: The business idea
-        market_research: Results from market research
         
     Returns:
-        Experiment generation results
+        Pipeline results with market research and experiments
     """
     try:
-        logger.info(f"Starting experiment generation for validation {validation_id}")
-        start_time = time.time()
-        
-        # Initialize and run the experiment generator agent
-        agent = ExperimentGeneratorAgent()
-        
-        # Run async method in sync context
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-        try:
-            results = loop.run_until_complete(
-                agent.generate_experiments(
-                    business_idea=business_idea,
-                    market_research=market_research
-                )
+        # Run on the worker's long-lived event loop
+        return self.run_stage(
+            experiment_generation_stage(
+                market_research=market_research,
+                validation_id=validation_id,
+                business_idea=business_idea
             )
-        finally:
-            loop.close()
-        
-        execution_time = time.time() - start_time
-        logger.info(f"Experiment generation completed in {execution_time:.2f} seconds")
-        
-        # Add metadata
-        results["execution_time_seconds"] = execution_time
-        results["validation_id"] = validation_id
-        
-        # TODO: Update validation record in database with results
-        
-        return results
+        )
         
+    except BudgetExceeded:
+        # Retrying cannot bring the validation back under budget
+        raise
     except Exception as e:
         logger.error(f"Experiment generation failed for validation {validation_id}: {str(e)}")
-        self.retry(exc=e, countdown=60)
+        self.retry(exc=e, countdown=retry_countdown(self.request.retries))
 
 
 @celery_app.task(
@@ -163,119 +571,235 @@ def run_experiment_generation(
 )
 def run_marketing_campaigns(
     self,
+    pipeline_results: Dict[str, Any],
     validation_id: str,
     business_idea: str,
-    market_research: Dict[str, Any],
-    experiments: Dict[str, Any],
 ) -> Dict[str, Any]:
     """
     Create marketing campaigns based on research and experiments.
     
     Args:
+        pipeline_results: Output of run_experiment_generation
         validation_id: The validation request ID
         business_idea: The business idea
-        market_research: Results from market research
-        experiments: Results from experiment generation
         
     Returns:
-        Marketing campaign results
+        Complete pipeline results
     """
     try:
-        logger.info(f"Starting marketing campaign creation for validation {validation_id}")
-        start_time = time.time()
-        
-        # Initialize and run the marketing autopilot agent
-        agent = MarketingAutopilotAgent()
-        
-        # Run async method in sync context
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-        try:
-            results = loop.run_until_complete(
-                agent.generate_campaigns(
-                    business_idea=business_idea,
-                    market_research=market_research,
-                    experiment_results=experiments
-                )
+        # Run on the worker's long-lived event loop
+        return self.run_stage(
+            marketing_campaigns_stage(
+                pipeline_results=pipeline_results,
+                validation_id=validation_id,
+                business_idea=business_idea
             )
-        finally:
-            loop.close()
-        
-        execution_time = time.time() - start_time
-        logger.info(f"Marketing campaign creation completed in {execution_time:.2f} seconds")
-        
-        # Add metadata
-        results["execution_time_seconds"] = execution_time
-        results["validation_id"] = validation_id
-        
-        # TODO: Update validation record in database with results
-        
-        return results
+        )
         
+    except BudgetExceeded:
+        # Retrying cannot bring the validation back under budget
+        raise
     except Exception as e:
         logger.error(f"Marketing campaign creation failed for validation {validation_id}: {str(e)}")
-        self.retry(exc=e, countdown=60)
+        self.retry(exc=e, countdown=retry_countdown(self.request.retries))
 
 
 @celery_app.task(
     base=ValidationTask,
     bind=True,
-    name="app.tasks.validation.run_experiment_generation_after_research",
+    name="app.tasks.validation.run_marketing_draft",
+    max_retries=settings.AGENT_MAX_RETRIES,
+    default_retry_delay=60,
 )
-def run_experiment_generation_after_research(
+def run_marketing_draft(
     self,
+    market_research: Dict[str, Any],
     validation_id: str,
     business_idea: str,
-    market_research_results: Dict[str, Any],
 ) -> Dict[str, Any]:
     """
-    Run experiment generation after market research completes.
+    Draft marketing campaigns from market research only.
     
-    This is a helper task for the pipeline.
-    """
-    # Run experiment generation with market research results
-    experiment_result = run_experiment_generation.apply_async(
-        args=[validation_id, business_idea, market_research_results]
-    )
+    Runs in parallel with run_experiment_generation in the DAG pipeline.
     
-    return {
-        "validation_id": validation_id,
-        "experiment_task_id": experiment_result.id,
-        "market_research": market_research_results
-    }
+    Args:
+        market_research: Results from market research
+        validation_id: The validation request ID
+        business_idea: The business idea
+        
+    Returns:
+        Draft marketing campaigns
+    """
+    try:
+        # Run on the worker's long-lived event loop
+        return self.run_stage(
+            marketing_draft_stage(
+                market_research=market_research,
+                validation_id=validation_id,
+                business_idea=business_idea
+            )
+        )
+        
+    except BudgetExceeded:
+        # Retrying cannot bring the validation back under budget
+        raise
+    except Exception as e:
+        logger.error(f"Marketing campaign draft failed for validation {validation_id}: {str(e)}")
+        self.retry(exc=e, countdown=retry_countdown(self.request.retries))
 
 
 @celery_app.task(
     base=ValidationTask,
     bind=True,
-    name="app.tasks.validation.run_marketing_after_experiments",
+    name="app.tasks.validation.run_marketing_refinement",
+    max_retries=settings.AGENT_MAX_RETRIES,
+    default_retry_delay=60,
 )
-def run_marketing_after_experiments(
+def run_marketing_refinement(
     self,
+    stage_results: List[Dict[str, Any]],
     validation_id: str,
     business_idea: str,
-    pipeline_results: Dict[str, Any],
 ) -> Dict[str, Any]:
     """
-    Run marketing campaigns after experiments complete.
+    Refine the marketing draft with experiment results.
     
-    This is a helper task for the pipeline.
-    """
-    market_research = pipeline_results.get("market_research", {})
-    experiments = pipeline_results.get("experiments", {})
+    Chord callback of the DAG pipeline.
     
-    # Run marketing campaigns with all results
-    marketing_result = run_marketing_campaigns.apply_async(
-        args=[validation_id, business_idea, market_research, experiments]
-    )
+    Args:
+        stage_results: [run_experiment_generation result, run_marketing_draft result]
+        validation_id: The validation request ID
+        business_idea: The business idea
+        
+    Returns:
+        Complete pipeline results
+    """
+    try:
+        # Run on the worker's long-lived event loop
+        return self.run_stage(
+            marketing_refinement_stage(
+                stage_results=stage_results,
+                validation_id=validation_id,
+                business_idea=business_idea
+            )
+        )
+        
+    except BudgetExceeded:
+        # Retrying cannot bring the validation back under budget
+        raise
+    except Exception as e:
+        logger.error(f"Marketing campaign refinement failed for validation {validation_id}: {str(e)}")
+        self.retry(exc=e, countdown=retry_countdown(self.request.retries))
+
+
+def pipeline_task_ids(workflow_id: str) -> Dict[str, str]:
+    """
+    Task ids of each stage in a validation pipeline.
     
+    The final stage reuses the workflow id, so AsyncResult(workflow_id) holds
+    the complete pipeline result once the chain finishes.
+    """
     return {
-        "validation_id": validation_id,
-        "marketing_task_id": marketing_result.id,
-        "pipeline_complete": False
+        "research": f"{workflow_id}-research",
+        "experiments": f"{workflow_id}-experiments",
+        "marketing": workflow_id,
     }
 
 
+def marketing_draft_task_id(workflow_id: str) -> str:
+    """Task id of the marketing draft, which only DAG pipelines have."""
+    return f"{workflow_id}-marketing-draft"
+
+
+def build_validation_pipeline(
+    workflow_id: str,
+    validation_id: str,
+    business_idea: str,
+    target_market: str = None,
+    industry: str = None,
+    bypass_cache: bool = False,
+    research_mode: str = None,
+    pipeline_mode: str = None,
+) -> chain:
+    """
+    Build the validation pipeline as a Celery canvas.
+    
+    Each stage receives the previous stage's result as its first argument,
+    so no intermediate tasks are needed to hand results along.
+    
+    In "chain" mode the stages run strictly in order. In "dag" mode a
+    marketing draft runs from research alone in parallel with experiment
+    generation, and a chord callback refines it with the experiment results.
+    """
+    task_ids = pipeline_task_ids(workflow_id)
+    research = run_market_research.si(
+        validation_id, business_idea, target_market, industry,
+        bypass_cache=bypass_cache, research_mode=research_mode,
+    ).set(task_id=task_ids["research"])
+    experiments = run_experiment_generation.s(
+        validation_id, business_idea
+    ).set(task_id=task_ids["experiments"])
+    
+    if PipelineMode(pipeline_mode or settings.PIPELINE_MODE) == PipelineMode.DAG:
+        return chain(
+            research,
+            group(
+                experiments,
+                run_marketing_draft.s(
+                    validation_id, business_idea
+                ).set(task_id=marketing_draft_task_id(workflow_id)),
+            ),
+            run_marketing_refinement.s(
+                validation_id, business_idea
+            ).set(task_id=task_ids["marketing"]),
+        )
+    
+    return chain(
+        research,
+        experiments,
+        run_marketing_campaigns.s(
+            validation_id, business_idea
+        ).set(task_id=task_ids["marketing"]),
+    )
+
+
+def start_validation_pipeline(
+    validation_id: str,
+    business_idea: str,
+    target_market: str = None,
+    industry: str = None,
+    bypass_cache: bool = False,
+    research_mode: str = None,
+    pipeline_mode: str = None,
+    workflow_id: Optional[str] = None,
+) -> str:
+    """
+    Publish the validation pipeline and return its workflow id.
+    
+    Args:
+        validation_id: The validation request ID
+        business_idea: The business idea to validate
+        target_market: Optional target market
+        industry: Optional industry
+        bypass_cache: Skip the market research cache
+        research_mode: "sequential" or "parallel" market research
+        pipeline_mode: "chain" or "dag" stage ordering
+        workflow_id: Id to publish under, for callers that record it first;
+            generated if not given
+        
+    Returns:
+        Workflow id identifying the whole pipeline
+    """
+    workflow_id = workflow_id or uuid()
+    build_validation_pipeline(
+        workflow_id, validation_id, business_idea, target_market, industry,
+        bypass_cache=bypass_cache, research_mode=research_mode,
+        pipeline_mode=pipeline_mode,
+    ).apply_async()
+    logger.info(f"Started validation pipeline {workflow_id} for {validation_id}")
+    return workflow_id
+
+
 @celery_app.task(
     base=ValidationTask,
     bind=True,
@@ -287,6 +811,9 @@ def run_full_validation(
     business_idea: str,
     target_market: str = None,
     industry: str = None,
+    bypass_cache: bool = False,
+    research_mode: str = None,
+    pipeline_mode: str = None,
 ) -> Dict[str, Any]:
     """
     Run the complete validation pipeline.
@@ -294,53 +821,33 @@ def run_full_validation(
     This orchestrates:
     1. Market research
     2. Experiment generation (depends on market research)
-    3. Marketing campaign creation (depends on both above)
+    3. Marketing campaign creation (depends on both above; in "dag" mode
+       drafted alongside experiments and refined once they finish)
+    
+    Producers should call start_validation_pipeline directly; this task is
+    kept for callers that can only enqueue by task name.
     
     Args:
         validation_id: The validation request ID
         business_idea: The business idea to validate
         target_market: Optional target market
         industry: Optional industry
+        bypass_cache: Skip the market research cache
+        research_mode: "sequential" or "parallel" market research
+        pipeline_mode: "chain" or "dag" stage ordering
         
     Returns:
-        Complete validation results
+        Workflow id of the started pipeline
     """
-    from celery import chain
-    
-    # Create a proper chain where each task receives the previous result
-    # We'll need to modify tasks to handle chained inputs or use callbacks
-    
-    # For now, let's use a simpler approach with callbacks
-    logger.info(f"Starting full validation pipeline for {validation_id}")
-    
-    # Step 1: Run market research
-    market_research_task = run_market_research.apply_async(
-        args=[validation_id, business_idea, target_market, industry],
-        link=run_experiment_generation_chain.s(validation_id, business_idea)
+    workflow_id = start_validation_pipeline(
+        validation_id, business_idea, target_market, industry,
+        bypass_cache=bypass_cache, research_mode=research_mode,
+        pipeline_mode=pipeline_mode,
     )
     
     return {
         "validation_id": validation_id,
-        "workflow_id": market_research_task.id,
+        "workflow_id": workflow_id,
         "status": "processing",
         "message": "Validation pipeline started. Market research in progress."
     }
-
-
-@celery_app.task(name="app.tasks.validation.run_experiment_generation_chain")
-def run_experiment_generation_chain(market_research_results, validation_id, business_idea):
-    """Chain task to run experiments after market research."""
-    experiment_task = run_experiment_generation.apply_async(
-        args=[validation_id, business_idea, market_research_results],
-        link=run_marketing_campaigns_chain.s(validation_id, business_idea, market_research_results)
-    )
-    return experiment_task.id
-
-
-@celery_app.task(name="app.tasks.validation.run_marketing_campaigns_chain")
-def run_marketing_campaigns_chain(experiment_results, validation_id, business_idea, market_research_results):
-    """Chain task to run marketing after experiments."""
-    marketing_task = run_marketing_campaigns.apply_async(
-        args=[validation_id, business_idea, market_research_results, experiment_results]
-    )
-    return marketing_task.id
\ No newline at end of file
@@ -9,7 +9,9 @@ Handles async task processing for:
 
 import logging
 from celery import Celery
+from celery.signals import worker_process_init, worker_process_shutdown
 from app.core.config import settings
+from app.core.serialization import SERIALIZER_NAME, register_serializer
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -23,11 +25,23 @@ celery_app = Celery(
     include=["app.tasks"]  # Include task modules
 )
 
+# Stage results travel as msgpack + zstd with large values claim-checked
+# (app/core/serialization.py); JSON stays accepted so messages queued before
+# a switch are still consumed.
+serializer = settings.CELERY_SERIALIZER
+accept_content = ["json"]
+if serializer == SERIALIZER_NAME:
+    if register_serializer():
+        accept_content.append(SERIALIZER_NAME)
+    else:
+        serializer = "json"
+
 # Configure Celery
 celery_app.conf.update(
-    task_serializer="json",
-    accept_content=["json"],
-    result_serializer="json",
+    task_serializer=serializer,
+    accept_content=accept_content,
+    result_serializer=serializer,
+    result_accept_content=accept_content,
     timezone="UTC",
     enable_utc=True,
     task_track_started=True,
@@ -42,6 +56,41 @@ celery_app.conf.task_routes = {
     "app.tasks.validation.run_market_research": {"queue": "research"},
     "app.tasks.validation.run_experiment_generation": {"queue": "experiments"},
     "app.tasks.validation.run_marketing_campaigns": {"queue": "marketing"},
+    "app.tasks.validation.run_marketing_draft": {"queue": "marketing"},
+    "app.tasks.validation.run_marketing_refinement": {"queue": "marketing"},
 }
 
+
+
+@worker_process_init.connect
+def init_worker_process(**kwargs):
+    """Start the worker event loop and warm the agent pool in each child."""
+    from app.agents.pool import agent_pool
+    from app.services.validation_repository import validation_writer
+    from app.tasks.runner import loop_runner
+
+    loop_runner.start()
+    validation_writer.bind(loop_runner.loop)
+    agent_pool.warm()
+
+
+@worker_process_shutdown.connect
+def shutdown_worker_process(**kwargs):
+    """Log agent pool reuse, flush queued writes and stop the event loop before the child exits."""
+    from app.agents.llm_cache import llm_cache_stats
+    from app.agents.pool import agent_pool
+    from app.services.validation_repository import validation_writer
+    from app.tasks.runner import loop_runner
+
+    logger.info(f"Agent pool stats: {agent_pool.stats()}")
+    logger.info(f"LLM cache hit rates: {llm_cache_stats()}")
+    agent_pool.clear()
+    if loop_runner.is_running:
+        try:
+            loop_runner.run(validation_writer.close(), timeout=10)
+        except Exception as e:
+            logger.error(f"Failed to flush validation writes on shutdown: {e}")
+    loop_runner.stop()
+
+
 logger.info("Celery worker configured successfully")
\ No newline at end of file
@@ -9,6 +9,7 @@ from fastapi.responses import JSONResponse
 from app.api.v1.api import api_router
 from app.core.config import settings
 from app.core.logging import setup_logging
+from app.core.rate_limit import RateLimitMiddleware
 
 # Set up logging
 setup_logging()
@@ -23,6 +24,8 @@ async def lifespan(app: FastAPI):
     yield
     # Shutdown
     logger.info("Shutting down ValidateIO API...")
+    from app.services.validation_repository import validation_writer
+    await validation_writer.close()
 
 
 app = FastAPI(
@@ -33,6 +36,9 @@ app = FastAPI(
     lifespan=lifespan,
 )
 
+# Rate limiting; added before CORS so 429 responses still carry CORS headers
+app.add_middleware(RateLimitMiddleware)
+
 # Set up CORS
 app.add_middleware(
     CORSMiddleware,
@@ -0,0 +1,231 @@
+#!/usr/bin/env python3
+"""
+Benchmark validation listing: OFFSET paging of full rows vs keyset paging of
+summary columns (ValidationRepository.list_summaries_for_user).
+
+Seeds a scratch schema with --rows validations (1M by default) spread over
+--users users, plus one heavy user owning --heavy-user-rows of them, each
+row carrying --payload-bytes of inline JSONB per result column, as rows did
+before results moved to validation_results. Then walks the
+heavy user's validations page by page both ways and reports per-page
+latency at increasing depths, each on the indexes it was deployed with.
+The heavy user's validations are the oldest in the table, the case where
+a global created_at index tempts the planner into scanning everyone's rows;
+--spread interleaves them with everyone else's instead.
+
+Needs a disposable PostgreSQL database; everything is created in the
+"bench_listing" schema, which is dropped first.
+
+Usage:
+    python scripts/benchmark_validation_listing.py --database-url postgresql://... \\
+        [--rows 1000000] [--users 1000] [--heavy-user-rows 100000] [--payload-bytes 1024] [--spread]
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+import uuid
+from typing import List, Optional
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+from app.services.validation_repository import ValidationRepository
+
+SCHEMA = "bench_listing"
+PAGE_SIZE = 20
+DEPTHS = (1, 10, 100, 1000, 4000)
+SAMPLES = 5
+
+SETUP = f"""
+DROP SCHEMA IF EXISTS {SCHEMA} CASCADE;
+CREATE SCHEMA {SCHEMA};
+CREATE TYPE {SCHEMA}.validationstatus AS ENUM ('PENDING', 'PROCESSING', 'COMPLETED', 'FAILED', 'CANCELLED');
+CREATE TABLE {SCHEMA}.validations (
+    id uuid PRIMARY KEY,
+    user_id uuid NOT NULL,
+    business_idea text NOT NULL,
+    target_market varchar,
+    industry varchar,
+    status {SCHEMA}.validationstatus NOT NULL,
+    task_id varchar,
+    market_research jsonb,
+    experiments jsonb,
+    marketing_campaigns jsonb,
+    total_cost double precision,
+    execution_time_seconds double precision,
+    completed_at timestamp,
+    created_at timestamp NOT NULL,
+    updated_at timestamp NOT NULL
+);
+"""
+
+SEED = f"""
+INSERT INTO {SCHEMA}.validations
+SELECT
+    gen_random_uuid(),
+    CASE WHEN (:spread AND n % :stride = 0) OR (NOT :spread AND n <= :heavy_rows)
+         THEN CAST(:heavy_user AS uuid)
+         ELSE (lpad(to_hex(n % :users), 8, '0') || '-0000-4000-8000-000000000000')::uuid END,
+    'Business idea ' || n,
+    'Target market',
+    'Industry',
+    'COMPLETED'::{SCHEMA}.validationstatus,
+    md5(n::text),
+    jsonb_build_object('raw_output', repeat('r', :payload)),
+    jsonb_build_object('raw_output', repeat('e', :payload)),
+    jsonb_build_object('raw_output', repeat('m', :payload)),
+    random(),
+    random() * 120,
+    ts, ts, ts
+FROM (
+    SELECT n, timestamp '2025-01-01' + n * interval '1 second' AS ts
+    FROM generate_series(1, :rows) AS n
+) seeded
+"""
+
+# Indexes before the keyset listing (Supabase initial schema)
+OFFSET_INDEXES = f"""
+CREATE INDEX IF NOT EXISTS idx_validations_user_id ON {SCHEMA}.validations (user_id);
+CREATE INDEX IF NOT EXISTS idx_validations_created_at ON {SCHEMA}.validations (created_at DESC);
+DROP INDEX IF EXISTS {SCHEMA}.idx_validations_user_created_at;
+ANALYZE {SCHEMA}.validations;
+"""
+
+# Indexes after it (migration 003; Supabase drops the created_at index too)
+KEYSET_INDEXES = f"""
+CREATE INDEX IF NOT EXISTS idx_validations_user_created_at ON {SCHEMA}.validations (user_id, created_at DESC, id DESC);
+DROP INDEX IF EXISTS {SCHEMA}.idx_validations_created_at;
+ANALYZE {SCHEMA}.validations;
+"""
+
+
+def database_url(url: str) -> str:
+    if url.startswith("postgresql://"):
+        return url.replace("postgresql://", "postgresql+asyncpg://", 1)
+    return url
+
+
+async def seed(engine, args: argparse.Namespace, heavy_user: uuid.UUID) -> None:
+    async with engine.begin() as conn:
+        for statement in SETUP.split(";\n"):
+            if statement.strip():
+                await conn.execute(text(statement))
+        started = time.perf_counter()
+        await conn.execute(
+            text(SEED),
+            {
+                "rows": args.rows,
+                "users": args.users,
+                "heavy_rows": args.heavy_user_rows,
+                "heavy_user": str(heavy_user),
+                "payload": args.payload_bytes,
+                "spread": args.spread,
+                "stride": max(1, args.rows // args.heavy_user_rows),
+            },
+        )
+        print(f"Seeded {args.rows:,} rows in {time.perf_counter() - started:.1f}s")
+
+
+async def apply_indexes(engine, statements: str) -> None:
+    async with engine.begin() as conn:
+        for statement in statements.split(";\n"):
+            if statement.strip():
+                await conn.execute(text(statement))
+
+
+async def offset_page(session: AsyncSession, user_id: uuid.UUID, page: int) -> int:
+    """The old listing: full rows including the inline JSONB results, OFFSET paging."""
+    result = await session.execute(
+        text(
+            f"SELECT * FROM {SCHEMA}.validations WHERE user_id = :user_id "
+            "ORDER BY created_at DESC OFFSET :offset LIMIT :limit"
+        ),
+        {"user_id": user_id, "offset": (page - 1) * PAGE_SIZE, "limit": PAGE_SIZE},
+    )
+    return len(result.all())
+
+
+async def keyset_cursors(session: AsyncSession, user_id: uuid.UUID, depth: int) -> List[Optional[str]]:
+    """Cursor of every page up to depth (None for the first)."""
+    cursors: List[Optional[str]] = [None]
+    while len(cursors) < depth:
+        _, next_cursor = await ValidationRepository.list_summaries_for_user(
+            session, user_id=str(user_id), limit=PAGE_SIZE, cursor=cursors[-1]
+        )
+        if next_cursor is None:
+            break
+        cursors.append(next_cursor)
+    return cursors
+
+
+async def timed(coro_factory) -> float:
+    samples = []
+    for _ in range(SAMPLES):
+        started = time.perf_counter()
+        await coro_factory()
+        samples.append((time.perf_counter() - started) * 1000)
+    return statistics.median(samples)
+
+
+async def run(args: argparse.Namespace) -> None:
+    engine = create_async_engine(database_url(args.database_url))
+    heavy_user = uuid.uuid4()
+    if not args.skip_seed:
+        await seed(engine, args, heavy_user)
+    else:
+        async with engine.connect() as conn:
+            heavy_user = (await conn.execute(text(
+                f"SELECT user_id FROM {SCHEMA}.validations GROUP BY user_id ORDER BY count(*) DESC LIMIT 1"
+            ))).scalar_one()
+
+    bench_engine = engine.execution_options(schema_translate_map={None: SCHEMA})
+    max_page = args.heavy_user_rows // PAGE_SIZE
+    depths = [depth for depth in DEPTHS if depth <= max_page]
+    # A session per phase; an open transaction would block the index changes
+    await apply_indexes(engine, OFFSET_INDEXES)
+    async with AsyncSession(bench_engine) as session:
+        offset_ms = {
+            depth: await timed(lambda depth=depth: offset_page(session, heavy_user, depth))
+            for depth in depths
+        }
+    await apply_indexes(engine, KEYSET_INDEXES)
+    async with AsyncSession(bench_engine) as session:
+        cursors = await keyset_cursors(session, heavy_user, max(depths))
+        keyset_ms = {
+            depth: await timed(lambda depth=depth: ValidationRepository.list_summaries_for_user(
+                session, user_id=str(heavy_user), limit=PAGE_SIZE, cursor=cursors[depth - 1]
+            ))
+            for depth in depths
+        }
+    print(f"\n{'page':>6} | {'offset, full rows (ms)':>22} | {'keyset, summary (ms)':>20}")
+    print("-" * 56)
+    for depth in depths:
+        print(f"{depth:>6} | {offset_ms[depth]:>22.2f} | {keyset_ms[depth]:>20.2f}")
+    await engine.dispose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark validation listing queries")
+    parser.add_argument("--database-url", default=os.environ.get("DATABASE_URL"))
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--heavy-user-rows", type=int, default=100_000)
+    parser.add_argument("--payload-bytes", type=int, default=1024)
+    parser.add_argument(
+        "--spread", action="store_true", help="Interleave the heavy user's validations with everyone's"
+    )
+    parser.add_argument("--skip-seed", action="store_true", help="Reuse the existing bench_listing schema")
+    args = parser.parse_args()
+    if not args.database_url:
+        parser.error("--database-url or DATABASE_URL is required")
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
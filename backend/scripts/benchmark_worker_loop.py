@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+"""
+Benchmark task latency with a per-task event loop vs the worker's
+long-lived loop (app/tasks/runner.py).
+
+Each simulated stage makes --requests HTTPS calls through an
+httpx.AsyncClient, as the agents' LLM and search clients do, and --redis-ops
+Redis commands through get_redis(), as the status, cache and event code
+does. The stage does no work of its own, so the numbers are the per-task
+overhead the loop choice adds on top of the agents' LLM time.
+
+- per-task loop: every task runs on a new event loop, as tasks did before,
+  so its HTTP client, Redis client and their connections (TLS handshakes
+  included) are created and thrown away with it
+- worker loop: tasks run on loop_runner; clients and keep-alive
+  connections outlive the task
+
+A local TLS server stands in for the providers and adds --rtt-ms per
+network round trip: two to set up a connection (TCP and TLS), one per
+request. Needs Redis at REDIS_URL.
+
+Usage:
+    python scripts/benchmark_worker_loop.py [--tasks 50] [--requests 4] [--redis-ops 10] [--rtt-ms 20]
+"""
+
+import argparse
+import asyncio
+import datetime
+import os
+import ssl
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from typing import List, Tuple
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import httpx
+from cryptography import x509
+from cryptography.hazmat.primitives import hashes, serialization
+from cryptography.hazmat.primitives.asymmetric import ec
+from cryptography.x509.oid import NameOID
+
+from app.core.redis import get_redis
+from app.tasks.runner import loop_runner
+
+RESPONSE = (
+    b"HTTP/1.1 200 OK\r\nContent-Type: application/json\r\n"
+    b"Content-Length: 2\r\nConnection: keep-alive\r\n\r\n{}"
+)
+
+
+def self_signed_cert(directory: str) -> Tuple[str, str]:
+    key = ec.generate_private_key(ec.SECP256R1())
+    name = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, "localhost")])
+    now = datetime.datetime.now(datetime.timezone.utc)
+    cert = (
+        x509.CertificateBuilder()
+        .subject_name(name)
+        .issuer_name(name)
+        .public_key(key.public_key())
+        .serial_number(x509.random_serial_number())
+        .not_valid_before(now)
+        .not_valid_after(now + datetime.timedelta(days=1))
+        .sign(key, hashes.SHA256())
+    )
+    certfile = os.path.join(directory, "cert.pem")
+    keyfile = os.path.join(directory, "key.pem")
+    with open(certfile, "wb") as f:
+        f.write(cert.public_bytes(serialization.Encoding.PEM))
+    with open(keyfile, "wb") as f:
+        f.write(key.private_bytes(
+            serialization.Encoding.PEM,
+            serialization.PrivateFormat.PKCS8,
+            serialization.NoEncryption(),
+        ))
+    return certfile, keyfile
+
+
+class ProviderStub:
+    """Keep-alive HTTPS server answering every request with {} after one RTT."""
+
+    def __init__(self, rtt: float, certfile: str, keyfile: str):
+        self.rtt = rtt
+        self.context = ssl.create_default_context(ssl.Purpose.CLIENT_AUTH)
+        self.context.load_cert_chain(certfile, keyfile)
+        self.connections = 0
+        self.port = None
+
+    def start(self) -> None:
+        ready = threading.Event()
+        threading.Thread(target=self._serve, args=(ready,), daemon=True).start()
+        ready.wait()
+
+    def _serve(self, ready: threading.Event) -> None:
+        loop = asyncio.new_event_loop()
+        server = loop.run_until_complete(
+            asyncio.start_server(self._handle, "127.0.0.1", 0, ssl=self.context)
+        )
+        self.port = server.sockets[0].getsockname()[1]
+        loop.call_soon(ready.set)
+        loop.run_forever()
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self.connections += 1
+        # The TCP and TLS handshakes' round trips, charged to the first request
+        delay = 3 * self.rtt
+        try:
+            while True:
+                await reader.readuntil(b"\r\n\r\n")
+                await asyncio.sleep(delay)
+                delay = self.rtt
+                writer.write(RESPONSE)
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError, ssl.SSLError):
+            pass
+        finally:
+            writer.close()
+
+
+async def stage(client: httpx.AsyncClient, url: str, requests: int, redis_ops: int) -> None:
+    for _ in range(requests):
+        response = await client.get(url)
+        response.raise_for_status()
+    redis = get_redis()
+    for i in range(redis_ops):
+        await redis.set(f"benchmark_worker_loop:{i}", i, ex=60)
+
+
+def per_task_loop(args: argparse.Namespace, url: str) -> float:
+    """One task the old way: a new loop, and new clients, per task."""
+    started = time.perf_counter()
+    loop = asyncio.new_event_loop()
+    try:
+        async def task() -> None:
+            async with httpx.AsyncClient(verify=False) as client:
+                await stage(client, url, args.requests, args.redis_ops)
+        loop.run_until_complete(task())
+    finally:
+        loop.close()
+    return time.perf_counter() - started
+
+
+def worker_loop(args: argparse.Namespace, url: str, client: httpx.AsyncClient) -> float:
+    """One task on the long-lived worker loop, reusing its clients."""
+    started = time.perf_counter()
+    loop_runner.run(stage(client, url, args.requests, args.redis_ops))
+    return time.perf_counter() - started
+
+
+def report(label: str, samples: List[float], connections: int) -> None:
+    ms = sorted(sample * 1000 for sample in samples)
+    p90 = ms[int(0.9 * (len(ms) - 1))]
+    print(
+        f"{label:<16} {statistics.mean(ms):>10.1f} {statistics.median(ms):>10.1f} "
+        f"{p90:>10.1f} {connections:>12}"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark per-task vs long-lived worker event loops")
+    parser.add_argument("--tasks", type=int, default=50)
+    parser.add_argument("--requests", type=int, default=4, help="HTTPS calls per stage")
+    parser.add_argument("--redis-ops", type=int, default=10, help="Redis commands per stage")
+    parser.add_argument("--rtt-ms", type=float, default=20.0, help="Simulated provider round trip")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        stub = ProviderStub(args.rtt_ms / 1000, *self_signed_cert(directory))
+        stub.start()
+    url = f"https://127.0.0.1:{stub.port}/v1/chat/completions"
+
+    print(f"{'loop':<16} {'mean (ms)':>10} {'p50 (ms)':>10} {'p90 (ms)':>10} {'connections':>12}")
+    print("-" * 62)
+
+    samples = [per_task_loop(args, url) for _ in range(args.tasks)]
+    report("per-task loop", samples, stub.connections)
+
+    stub.connections = 0
+
+    async def make_client() -> httpx.AsyncClient:
+        return httpx.AsyncClient(verify=False)
+
+    client = loop_runner.run(make_client())
+    samples = [worker_loop(args, url, client) for _ in range(args.tasks)]
+    report("worker loop", samples, stub.connections)
+    loop_runner.run(client.aclose())
+    loop_runner.stop()
+
+
+if __name__ == "__main__":
+    main()
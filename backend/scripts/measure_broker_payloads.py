@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""
+Measure Celery payload bytes per validation: JSON vs the "validateio"
+serializer (msgpack + zstd), with and without claim check.
+
+Builds representative stage results (market research with a --raw-output-kb
+agent transcript, experiments, marketing campaigns) and serializes the
+messages a chain-mode validation sends: the stage-to-stage task bodies on
+the broker and the stage results in the result backend. Binary bodies are
+counted base64-encoded, as the Redis transport sends them. Claim-checked
+values are counted once, when first stored.
+
+Claim check needs Redis at REDIS_URL; pass --no-claim-check without it.
+
+Usage:
+    python scripts/measure_broker_payloads.py [--raw-output-kb 24] [--no-claim-check]
+"""
+
+import argparse
+import base64
+import os
+import random
+import sys
+import uuid
+from typing import Any, Dict, List, Tuple
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from kombu.serialization import dumps
+
+from app.core import serialization
+from app.core.config import settings
+
+EMBED = {"callbacks": None, "errbacks": None, "chain": None, "chord": None}
+
+
+WORDS = (
+    "market customers growth pricing competitors revenue segment budget savings app users "
+    "retention acquisition channel survey interviews trend adoption risk fintech regulation "
+    "subscription churn onboarding feature demand millennials automation premium free tier"
+).split()
+
+
+def transcript(kb: int, seed: int) -> str:
+    """Seeded word salad; compresses about as well as agent output, unlike repeated text."""
+    rng = random.Random(seed)
+    words = []
+    size = 0
+    while size < kb * 1024:
+        words.append(f"{rng.choice(WORDS)}{rng.randint(0, 99)}")
+        size += len(words[-1]) + 1
+    return " ".join(words)[:kb * 1024]
+
+
+def sample_results(raw_output_kb: int) -> Tuple[Dict[str, Any], Dict[str, Any], Dict[str, Any]]:
+    validation_id = str(uuid.uuid4())
+    research = {
+        "market_size": {"tam": "$12B", "sam": "$2.1B", "som": "$120M", "growth_rate": "18% CAGR"},
+        "competitors": [
+            {"name": f"Competitor {i}", "strengths": ["brand", "pricing"], "weaknesses": ["ux"], "market_share": "5%"}
+            for i in range(8)
+        ],
+        "customer_segments": [{"name": f"Segment {i}", "pain_points": ["budgeting", "saving"]} for i in range(4)],
+        "trends": [f"Trend {i}: more consumers automate their savings" for i in range(10)],
+        "raw_output": transcript(raw_output_kb, seed=1),
+        "execution_time_seconds": 41.2,
+        "validation_id": validation_id,
+        "cache": "miss",
+    }
+    experiments = {
+        "experiments": [
+            {
+                "name": f"Experiment {i}",
+                "hypothesis": "Millennials will sign up for automated savings goals",
+                "landing_page": {"headline": "Save without thinking", "sections": ["hero", "features", "pricing"] * 3},
+                "metrics": ["signup_rate", "cost_per_signup"],
+            }
+            for i in range(3)
+        ],
+        "raw_output": transcript(raw_output_kb // 2, seed=2),
+        "execution_time_seconds": 18.5,
+        "validation_id": validation_id,
+    }
+    marketing = {
+        "campaigns": [
+            {"channel": channel, "ad_copy": ["Save more, stress less"] * 5, "budget": 500}
+            for channel in ("google", "meta", "linkedin", "tiktok")
+        ],
+        "raw_output": transcript(raw_output_kb // 2, seed=3),
+        "execution_time_seconds": 22.9,
+        "validation_id": validation_id,
+    }
+    return research, experiments, marketing
+
+
+def chain_payloads(raw_output_kb: int) -> Tuple[List[Any], List[Any]]:
+    """(broker bodies, result backend values) of one chain-mode validation."""
+    research, experiments, marketing = sample_results(raw_output_kb)
+    validation_id = research["validation_id"]
+    stage_kwargs = {"validation_id": validation_id, "business_idea": "An AI-powered personal finance app"}
+    pipeline_results = {"validation_id": validation_id, "market_research": research, "experiments": experiments}
+    final = {**pipeline_results, "marketing_campaigns": marketing, "pipeline_complete": True}
+    broker = [
+        ([], stage_kwargs, EMBED),
+        ([research], stage_kwargs, EMBED),
+        ([pipeline_results], stage_kwargs, EMBED),
+    ]
+    results = [
+        {"status": "SUCCESS", "result": value, "traceback": None, "children": []}
+        for value in (research, pipeline_results, final)
+    ]
+    return broker, results
+
+
+def wire_size(value: Any, serializer: str) -> int:
+    _, content_encoding, data = dumps(value, serializer=serializer)
+    if content_encoding == "binary":
+        return len(base64.b64encode(data))
+    return len(data.encode() if isinstance(data, str) else data)
+
+
+def measure(label: str, serializer: str, raw_output_kb: int) -> None:
+    stored: Dict[bytes, int] = {}
+    store_claim = serialization._store_claim
+
+    def counting_store(packed: bytes) -> bytes:
+        key = store_claim(packed)
+        stored.setdefault(key, len(serialization._frame(packed)))
+        return key
+
+    serialization._store_claim = counting_store
+    try:
+        broker, results = chain_payloads(raw_output_kb)
+        broker_bytes = sum(wire_size(body, serializer) for body in broker)
+        backend_bytes = sum(wire_size(meta, serializer) for meta in results)
+    finally:
+        serialization._store_claim = store_claim
+    claim_bytes = sum(stored.values())
+    total = broker_bytes + backend_bytes + claim_bytes
+    print(f"{label:<34} {broker_bytes:>12,} {backend_bytes:>14,} {claim_bytes:>12,} {total:>12,}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Measure Celery payload bytes per validation")
+    parser.add_argument("--raw-output-kb", type=int, default=24, help="Size of the research agent transcript")
+    parser.add_argument("--no-claim-check", action="store_true", help="Skip the claim-check run (no Redis needed)")
+    args = parser.parse_args()
+
+    if not serialization.register_serializer():
+        parser.error("msgpack is required")
+
+    print(f"{'serializer':<34} {'broker':>12} {'result backend':>14} {'claims':>12} {'total':>12}")
+    print("-" * 88)
+    measure("json", "json", args.raw_output_kb)
+    settings.CELERY_CLAIM_CHECK_ENABLED = False
+    measure("validateio (msgpack + zstd)", serialization.SERIALIZER_NAME, args.raw_output_kb)
+    if not args.no_claim_check:
+        settings.CELERY_CLAIM_CHECK_ENABLED = True
+        measure("validateio + claim check", serialization.SERIALIZER_NAME, args.raw_output_kb)
+
+
+if __name__ == "__main__":
+    main()
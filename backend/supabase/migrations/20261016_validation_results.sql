@@ -0,0 +1,71 @@
+-- Move validation results out of the validations table
+-- Each stage's result gets its own row in validation_results, so status and
+-- list queries on validations never read the payloads. The API compresses
+-- large payloads (encoding 'zstd'); rows moved here stay plain JSONB.
+
+CREATE TABLE IF NOT EXISTS public.validation_results (
+    validation_id UUID NOT NULL REFERENCES public.validations(id) ON DELETE CASCADE,
+    stage VARCHAR(255) NOT NULL,
+    encoding VARCHAR(16) NOT NULL DEFAULT 'json',
+    payload JSONB,
+    compressed BYTEA,
+    size_bytes INTEGER NOT NULL,
+    created_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT NOW(),
+    updated_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT NOW(),
+    PRIMARY KEY (validation_id, stage)
+);
+
+CREATE TRIGGER update_validation_results_updated_at BEFORE UPDATE ON public.validation_results
+    FOR EACH ROW EXECUTE FUNCTION update_updated_at_column();
+
+-- Move existing results in chunks of 1000 validations. Supabase applies a
+-- migration file as one transaction, so the chunks only bound the size of
+-- each statement; they are committed together with the rest of the file.
+DO $$
+DECLARE
+    last_id UUID := '00000000-0000-0000-0000-000000000000';
+    chunk_last UUID;
+BEGIN
+    LOOP
+        WITH chunk AS (
+            SELECT id, market_research, experiments, marketing_campaigns, updated_at
+            FROM public.validations
+            WHERE id > last_id
+            ORDER BY id
+            LIMIT 1000
+        ), moved AS (
+            INSERT INTO public.validation_results (validation_id, stage, encoding, payload, size_bytes, created_at, updated_at)
+            SELECT chunk.id, results.stage, 'json', results.payload, octet_length(results.payload::text),
+                   chunk.updated_at, chunk.updated_at
+            FROM chunk
+            CROSS JOIN LATERAL (VALUES
+                ('market_research', chunk.market_research),
+                ('experiments', chunk.experiments),
+                ('marketing_campaigns', chunk.marketing_campaigns)
+            ) AS results(stage, payload)
+            WHERE results.payload IS NOT NULL
+            ON CONFLICT (validation_id, stage) DO NOTHING
+        )
+        SELECT id INTO chunk_last FROM chunk ORDER BY id DESC LIMIT 1;
+        EXIT WHEN chunk_last IS NULL;
+        last_id := chunk_last;
+    END LOOP;
+END $$;
+
+ALTER TABLE public.validations
+    DROP COLUMN market_research,
+    DROP COLUMN experiments,
+    DROP COLUMN marketing_campaigns;
+
+-- Results are visible to whoever can see their validation
+ALTER TABLE public.validation_results ENABLE ROW LEVEL SECURITY;
+
+CREATE POLICY "Users can view own validation results" ON public.validation_results
+    FOR SELECT USING (
+        EXISTS (
+            SELECT 1 FROM public.validations
+            WHERE id = validation_id AND user_id = auth.uid()
+        )
+    );
+
+GRANT ALL ON public.validation_results TO anon, authenticated;
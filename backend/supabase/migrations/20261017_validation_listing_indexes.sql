@@ -0,0 +1,9 @@
+-- Index the validation listing reads: a user's validations newest first,
+-- paged by keyset on (created_at, id)
+CREATE INDEX IF NOT EXISTS idx_validations_user_created_at
+    ON public.validations(user_id, created_at DESC, id DESC);
+
+-- No query orders every user's validations by created_at, and with this
+-- index around the planner may scan all of them to fill the first page of
+-- a user whose validations are all old
+DROP INDEX IF EXISTS public.idx_validations_created_at;
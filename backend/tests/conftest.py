@@ -0,0 +1,30 @@
+"""Shared fixtures for the ValidateIO backend tests."""
+
+import asyncio
+
+import fakeredis
+import pytest
+
+from app.core import redis as redis_clients
+
+
+@pytest.fixture
+def redis_server(monkeypatch):
+    """An in-memory Redis behind get_redis() and get_sync_redis(); set connected=False to take it down."""
+    server = fakeredis.FakeServer()
+    monkeypatch.setattr(redis_clients, "_sync_client", fakeredis.FakeRedis(server=server))
+    monkeypatch.setattr(redis_clients, "_async_clients", _FakeAsyncClients(server))
+    return server
+
+
+class _FakeAsyncClients(dict):
+    """Stands in for the per-loop client map, creating fake clients on demand."""
+
+    def __init__(self, server: fakeredis.FakeServer):
+        super().__init__()
+        self.server = server
+
+    def get(self, loop: asyncio.AbstractEventLoop, default=None):
+        if loop not in self:
+            self[loop] = fakeredis.FakeAsyncRedis(server=self.server)
+        return self[loop]
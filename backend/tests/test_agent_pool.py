@@ -0,0 +1,64 @@
+"""Tests for reusing pooled agent instances."""
+
+import uuid
+
+import pytest
+from langchain_core.messages import HumanMessage
+
+from app.agents import metering as metering_module
+from app.agents.pool import AGENT_FACTORIES, AgentPool
+from app.agents.providers import MultiProviderChatModel
+from app.core.config import settings
+from app.services.cost_meter import BudgetExceeded, meter_validation
+from app.services.validation_status import validation_status
+
+VALIDATION_ID = str(uuid.uuid4())
+
+
+@pytest.fixture(autouse=True)
+def agent_settings(monkeypatch):
+    monkeypatch.setattr(settings, "OPENAI_API_KEY", "sk-test")
+    monkeypatch.setattr(settings, "ANTHROPIC_API_KEY", None)
+    monkeypatch.setattr(settings, "LLM_ROUTING_ENABLED", False)
+    monkeypatch.setattr(settings, "MAX_COST_PER_VALIDATION", 1.00)
+    # tiktoken would download its encoding
+    monkeypatch.setattr(metering_module, "count_tokens", lambda model, text: len(text) // 4)
+
+
+def chat_models(agent):
+    return [value for value in vars(agent).values() if isinstance(value, MultiProviderChatModel)]
+
+
+def in_flight_runs(agent):
+    return [run for llm in chat_models(agent) for handler in llm.callbacks for run in handler._runs]
+
+
+def test_concurrent_leases_get_separate_instances():
+    pool = AgentPool()
+
+    with pool.lease("experiment_generator") as first, pool.lease("experiment_generator") as second:
+        assert first is not second
+        assert first.llm is not second.llm
+        assert first.llm.callbacks[0] is not second.llm.callbacks[0]
+
+    assert pool.stats()["experiment_generator"] == {"created": 2, "reused": 0, "idle": 2}
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("name", list(AGENT_FACTORIES))
+async def test_released_instance_does_not_carry_an_aborted_run(name, redis_server):
+    pool = AgentPool()
+    await validation_status.create(VALIDATION_ID, "workflow", {}, pipeline_mode="chain")
+    await validation_status.add_cost(VALIDATION_ID, 1.00)
+    meter_validation(VALIDATION_ID, "stage")
+
+    with pool.lease(name) as agent:
+        # Refused over budget before reaching a provider, so never finished
+        for llm in chat_models(agent):
+            with pytest.raises(BudgetExceeded):
+                await llm.agenerate([[HumanMessage(content="Validate an AI-powered personal finance app")]])
+        assert in_flight_runs(agent)
+
+    with pool.lease(name) as reused:
+        assert reused is agent
+        assert in_flight_runs(reused) == []
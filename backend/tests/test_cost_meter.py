@@ -0,0 +1,279 @@
+"""Tests for per-validation cost metering and budget enforcement."""
+
+import contextlib
+import uuid
+
+import fakeredis
+import pytest
+from celery import states
+from celery.app.task import Context
+from langchain_core.caches import InMemoryCache
+from langchain_core.messages import AIMessage, HumanMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+
+from app.agents import metering as metering_module
+from app.agents import providers as providers_module
+from app.agents.metering import CostMeterHandler
+from app.agents.pool import agent_pool
+from app.agents.providers import MultiProviderChatModel, provider_health
+from app.agents.routing import ModelTier
+from app.async_worker import AsyncValidationWorker
+from app.core.config import settings
+from app.services.cost_meter import (
+    BudgetExceeded,
+    cost_meter,
+    llm_cost,
+    meter_validation,
+)
+from app.services.validation_status import status_key, validation_status
+from app.tasks import validation as validation_tasks
+from app.tasks.validation import market_research_stage, run_market_research
+from app.worker import celery_app
+
+VALIDATION_ID = str(uuid.uuid4())
+MESSAGES = [HumanMessage(content="Size the market for a personal finance app")]
+WEB_SEARCH = {
+    "name": "web_search",
+    "description": "Search the web",
+    "parameters": {"type": "object", "properties": {"query": {"type": "string"}}},
+}
+
+
+@pytest.fixture(autouse=True)
+def budget_settings(monkeypatch):
+    monkeypatch.setattr(settings, "MAX_COST_PER_VALIDATION", 1.00)
+    monkeypatch.setattr(settings, "BUDGET_DOWNGRADE_RATIO", 0.8)
+    monkeypatch.setattr(settings, "LLM_PROVIDERS", "openai,anthropic")
+    monkeypatch.setattr(settings, "LLM_HEDGING_ENABLED", False)
+    monkeypatch.setattr(settings, "LLM_ROUTING_ENABLED", False)
+    monkeypatch.setattr(settings, "VALIDATION_STREAMING_ENABLED", False)
+
+
+async def start_stage() -> str:
+    """Queue a validation and charge the current task's calls to it, as a stage does."""
+    await validation_status.create(VALIDATION_ID, "workflow", {}, pipeline_mode="chain")
+    meter_validation(VALIDATION_ID, "market_research")
+    return VALIDATION_ID
+
+
+def status_field(redis_server, name):
+    return fakeredis.FakeRedis(server=redis_server).hget(status_key(VALIDATION_ID), name)
+
+
+@pytest.mark.asyncio
+async def test_record_llm_charges_the_metered_validation(redis_server):
+    validation = await start_stage()
+
+    await cost_meter.record_llm("market_research", "gpt-4o", 10_000, 2_000)
+
+    assert await cost_meter.spent(validation) == pytest.approx(llm_cost("gpt-4o", 10_000, 2_000))
+    assert status_field(redis_server, "prompt_tokens") == b"10000"
+    assert status_field(redis_server, "completion_tokens") == b"2000"
+
+
+@pytest.mark.asyncio
+async def test_calls_outside_a_stage_are_not_charged(redis_server):
+    await validation_status.create(VALIDATION_ID, "workflow", {}, pipeline_mode="chain")
+
+    await cost_meter.record_llm("market_research", "gpt-4o", 10_000, 2_000)
+
+    assert await cost_meter.spent(VALIDATION_ID) == 0.0
+
+
+@pytest.mark.asyncio
+async def test_call_is_refused_before_it_starts_over_budget(redis_server):
+    validation = await start_stage()
+    await validation_status.add_cost(validation, 0.99)
+
+    with pytest.raises(BudgetExceeded):
+        # 100k prompt tokens cost $0.25 on gpt-4o
+        await cost_meter.check_llm_call("gpt-4o", 100_000)
+    await cost_meter.check_llm_call("gpt-4o-mini", 100)
+
+
+@pytest.mark.asyncio
+async def test_finished_call_over_budget_raises_after_it_is_charged(redis_server):
+    validation = await start_stage()
+    await validation_status.add_cost(validation, 0.90)
+
+    with pytest.raises(BudgetExceeded) as excinfo:
+        await cost_meter.record_llm("market_research", "gpt-4o", 100_000, 0)
+
+    assert excinfo.value.spent_usd == pytest.approx(1.15)
+    assert await cost_meter.spent(validation) == pytest.approx(1.15)
+
+
+@pytest.mark.asyncio
+async def test_budget_is_not_enforced_without_redis(redis_server):
+    validation = await start_stage()
+    redis_server.connected = False
+
+    await cost_meter.record_llm("market_research", "gpt-4o", 10_000_000, 0)
+    await cost_meter.check(validation)
+
+
+@pytest.mark.asyncio
+async def test_should_downgrade_at_the_ratio(redis_server):
+    validation = await start_stage()
+    await validation_status.add_cost(validation, 0.79)
+    assert not await cost_meter.should_downgrade(validation)
+
+    await validation_status.add_cost(validation, 0.01)
+    assert await cost_meter.should_downgrade(validation)
+
+
+class FakeResearchAgent:
+    """Market research agent stand-in recording whether speculation was offered."""
+
+    def __init__(self):
+        self.on_partial = "not called"
+
+    async def research(self, on_partial=None, **kwargs):
+        self.on_partial = on_partial
+        return {"summary": "A growing market"}
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("spent, speculates", [(0.5, True), (0.8, False)])
+async def test_speculative_experiments_are_skipped_past_the_downgrade_ratio(
+    monkeypatch, redis_server, spent, speculates
+):
+    validation = await start_stage()
+    monkeypatch.setattr(settings, "SPECULATIVE_EXPERIMENTS", True)
+    monkeypatch.setattr(settings, "RESEARCH_CACHE_ENABLED", False)
+    monkeypatch.setattr(validation_tasks.validation_writer, "submit", lambda *args, **kwargs: None)
+    agent = FakeResearchAgent()
+    monkeypatch.setattr(agent_pool, "lease", lambda name: contextlib.nullcontext(agent))
+    await validation_status.add_cost(validation, spent)
+
+    await market_research_stage(validation, "An AI-powered personal finance app")
+
+    assert (agent.on_partial is not None) == speculates
+
+
+def test_celery_stage_over_budget_is_not_retried(monkeypatch):
+    retries = []
+
+    def run_stage(coro):
+        coro.close()
+        raise BudgetExceeded(VALIDATION_ID, 1.0)
+
+    monkeypatch.setattr(run_market_research, "run_stage", run_stage)
+    monkeypatch.setattr(run_market_research, "retry", lambda **kwargs: retries.append(kwargs))
+
+    with pytest.raises(BudgetExceeded):
+        run_market_research(VALIDATION_ID, "An AI-powered personal finance app")
+    assert retries == []
+
+
+def test_async_worker_stage_over_budget_is_not_retried(monkeypatch):
+    sent, failed = [], []
+
+    class Backend:
+        def mark_as_failure(self, task_id, exc, request=None):
+            failed.append((task_id, exc))
+
+        def store_result(self, task_id, result, state, request=None):
+            assert state != states.RETRY
+
+    monkeypatch.setattr(celery_app._local, "backend", Backend(), raising=False)
+    monkeypatch.setattr(celery_app, "send_task", lambda *args, **kwargs: sent.append(args))
+    monkeypatch.setattr(run_market_research, "on_failure", lambda *args: None)
+    request = Context(id="task-1", args=[VALIDATION_ID, "idea"], kwargs={}, retries=0)
+
+    AsyncValidationWorker(["research"], 1)._retry_or_fail(
+        run_market_research.name, request, BudgetExceeded(VALIDATION_ID, 1.0)
+    )
+
+    assert sent == []
+    assert failed[0][0] == "task-1"
+
+
+class ToolCallingProvider:
+    """Chat model stand-in answering like ChatAnthropic with tools: no streamed tokens."""
+
+    def __init__(self, name, error=None, output_tokens=96):
+        self.name = name
+        self.error = error
+        self.output_tokens = output_tokens
+        self.calls = []
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs):
+        self.calls.append(kwargs)
+        if self.error is not None:
+            raise self.error
+        message = AIMessage(
+            content=[{"type": "tool_use", "id": "toolu_1", "name": "web_search", "input": {"query": "fintech"}}],
+            tool_calls=[{"name": "web_search", "args": {"query": "fintech"}, "id": "toolu_1"}],
+            usage_metadata={
+                "input_tokens": 171,
+                "output_tokens": self.output_tokens,
+                "total_tokens": 171 + self.output_tokens,
+            },
+        )
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+
+@pytest.fixture
+def failover_model(monkeypatch):
+    """OpenAI failing over to a tool-calling Anthropic; metered for real, no limiter or tokenizer download."""
+    provider_health.clear()
+
+    async def acquire(provider, model, tokens=0):
+        return 0.0
+
+    monkeypatch.setattr(providers_module.provider_limiter, "acquire", acquire)
+    monkeypatch.setattr(providers_module, "count_tokens", lambda model, text: len(text) // 4)
+    monkeypatch.setattr(metering_module, "count_tokens", lambda model, text: len(text) // 4)
+    anthropic = ToolCallingProvider("anthropic")
+    model = MultiProviderChatModel(
+        agent="market_research",
+        tier=ModelTier.TOOLS,
+        providers={"openai": ToolCallingProvider("openai", error=ConnectionError("503")), "anthropic": anthropic},
+        cache=InMemoryCache(),
+        callbacks=[CostMeterHandler("market_research")],
+    )
+    yield model, anthropic
+    provider_health.clear()
+
+
+@pytest.mark.asyncio
+async def test_unstreamed_tool_call_after_failover_is_charged(redis_server, failover_model):
+    validation = await start_stage()
+    model, anthropic = failover_model
+
+    result = await model.agenerate([MESSAGES], functions=[WEB_SEARCH])
+
+    assert result.generations[0][0].message.additional_kwargs["function_call"]["name"] == "web_search"
+    assert anthropic.calls[0]["tools"][0]["name"] == "web_search"
+    # Charged the usage Anthropic reported, at the Anthropic model's price
+    assert await cost_meter.spent(validation) == pytest.approx(
+        llm_cost(settings.LLM_ANTHROPIC_MODEL_TOOLS, 171, 96)
+    )
+    assert status_field(redis_server, "prompt_tokens") == b"171"
+
+
+@pytest.mark.asyncio
+async def test_cache_hits_are_not_charged(redis_server, failover_model):
+    validation = await start_stage()
+    model, anthropic = failover_model
+    await model.agenerate([MESSAGES], functions=[WEB_SEARCH])
+    spent = await cost_meter.spent(validation)
+
+    await model.agenerate([MESSAGES], functions=[WEB_SEARCH])
+
+    assert len(anthropic.calls) == 1
+    assert await cost_meter.spent(validation) == spent
+
+
+@pytest.mark.asyncio
+async def test_unstreamed_call_taking_the_total_over_budget_raises(redis_server, failover_model):
+    validation = await start_stage()
+    model, anthropic = failover_model
+    # Affordable when it starts; 50k output tokens cost $0.75
+    anthropic.output_tokens = 50_000
+    await validation_status.add_cost(validation, 0.5)
+
+    with pytest.raises(BudgetExceeded):
+        await model.agenerate([MESSAGES], functions=[WEB_SEARCH])
+    assert await cost_meter.spent(validation) > settings.MAX_COST_PER_VALIDATION
@@ -0,0 +1,233 @@
+"""Tests for provider failover and hedging in MultiProviderChatModel."""
+
+import asyncio
+import time
+
+import pytest
+from langchain_core.messages import AIMessage, HumanMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+
+from app.agents import providers as providers_module
+from app.agents.providers import MultiProviderChatModel, ProviderHealth, provider_health
+from app.agents.routing import ModelTier
+from app.core.config import settings
+
+MESSAGES = [HumanMessage(content="Size the market for a personal finance app")]
+
+
+class ProviderError(Exception):
+    pass
+
+
+class FakeProvider:
+    """Chat model stand-in answering after a delay, or failing."""
+
+    def __init__(self, name, delay=0.0, error=None):
+        self.name = name
+        self.delay = delay
+        self.error = error
+        self.calls = []
+        self.cancelled = False
+
+    def _answer(self):
+        if self.error is not None:
+            raise self.error
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=f"{self.name} answer"))])
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+        self.calls.append(kwargs)
+        time.sleep(self.delay)
+        return self._answer()
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs):
+        self.calls.append(kwargs)
+        try:
+            await asyncio.sleep(self.delay)
+        except asyncio.CancelledError:
+            self.cancelled = True
+            raise
+        return self._answer()
+
+
+@pytest.fixture(autouse=True)
+def provider_settings(monkeypatch):
+    monkeypatch.setattr(settings, "LLM_PROVIDERS", "openai,anthropic")
+    monkeypatch.setattr(settings, "LLM_HEDGING_ENABLED", False)
+    monkeypatch.setattr(settings, "LLM_HEDGE_DEFAULT_DELAY_SECONDS", 0.05)
+    monkeypatch.setattr(settings, "LLM_LATENCY_MIN_SAMPLES", 5)
+    monkeypatch.setattr(settings, "LLM_PROVIDER_MIN_HEALTH", 0.5)
+    monkeypatch.setattr(settings, "LLM_PROVIDER_COOLDOWN_SECONDS", 30.0)
+    monkeypatch.setattr(settings, "LLM_ROUTING_ENABLED", False)
+
+
+@pytest.fixture(autouse=True)
+def isolated(monkeypatch):
+    """Fresh provider health; no fleet rate limiter, cost meter or tokenizer download."""
+    provider_health.clear()
+    charged = []
+
+    async def acquire(provider, model, tokens=0):
+        return 0.0
+
+    async def record_llm(agent, model, prompt_tokens, completion_tokens, tier="unknown"):
+        charged.append((agent, model, prompt_tokens, completion_tokens))
+
+    monkeypatch.setattr(providers_module.provider_limiter, "acquire", acquire)
+    monkeypatch.setattr(providers_module.provider_limiter, "acquire_sync", lambda *args, **kwargs: 0.0)
+    monkeypatch.setattr(providers_module.cost_meter, "record_llm", record_llm)
+    monkeypatch.setattr(providers_module, "count_tokens", lambda model, text: len(text) // 4)
+    yield charged
+    provider_health.clear()
+
+
+def chat_model(**providers):
+    return MultiProviderChatModel(agent="market_research", tier=ModelTier.TOOLS, providers=providers)
+
+
+def answer(result):
+    return result.generations[0][0].message.content
+
+
+@pytest.mark.asyncio
+async def test_first_provider_answers():
+    openai, anthropic = FakeProvider("openai"), FakeProvider("anthropic")
+
+    result = await chat_model(openai=openai, anthropic=anthropic).agenerate([MESSAGES])
+
+    assert answer(result) == "openai answer"
+    assert openai.calls[0]["model"] == settings.LLM_MODEL_TOOLS
+    assert anthropic.calls == []
+
+
+@pytest.mark.asyncio
+async def test_result_names_the_provider_and_model_that_answered():
+    openai = FakeProvider("openai", error=ProviderError("503"))
+    anthropic = FakeProvider("anthropic")
+
+    result = await chat_model(openai=openai, anthropic=anthropic)._agenerate(MESSAGES)
+
+    assert result.llm_output == {"model_name": settings.LLM_ANTHROPIC_MODEL_TOOLS, "provider": "anthropic"}
+
+
+@pytest.mark.asyncio
+async def test_fails_over_to_next_provider():
+    openai = FakeProvider("openai", error=ProviderError("503"))
+    anthropic = FakeProvider("anthropic")
+
+    result = await chat_model(openai=openai, anthropic=anthropic).agenerate([MESSAGES])
+
+    assert answer(result) == "anthropic answer"
+    assert anthropic.calls[0]["model"] == settings.LLM_ANTHROPIC_MODEL_TOOLS
+    assert provider_health["openai"].score < 1.0
+    assert provider_health["anthropic"].score == 1.0
+
+
+@pytest.mark.asyncio
+async def test_raises_when_every_provider_fails():
+    openai = FakeProvider("openai", error=ProviderError("openai down"))
+    anthropic = FakeProvider("anthropic", error=ProviderError("anthropic down"))
+
+    with pytest.raises(ProviderError, match="anthropic down"):
+        await chat_model(openai=openai, anthropic=anthropic).agenerate([MESSAGES])
+
+
+def test_sync_calls_fail_over():
+    openai = FakeProvider("openai", error=ProviderError("503"))
+    anthropic = FakeProvider("anthropic")
+
+    result = chat_model(openai=openai, anthropic=anthropic).generate([MESSAGES])
+
+    assert answer(result) == "anthropic answer"
+
+
+@pytest.mark.asyncio
+async def test_unhealthy_provider_is_tried_last_until_cooldown(monkeypatch):
+    clock = [1000.0]
+    monkeypatch.setattr("app.agents.providers.time.monotonic", lambda: clock[0])
+    openai = FakeProvider("openai", error=ProviderError("503"))
+    anthropic = FakeProvider("anthropic")
+    model = chat_model(openai=openai, anthropic=anthropic)
+    for _ in range(4):
+        await model.agenerate([MESSAGES])
+    assert provider_health["openai"].score < settings.LLM_PROVIDER_MIN_HEALTH
+
+    calls = len(openai.calls)
+    await model.agenerate([MESSAGES])
+    assert model.provider_order() == ["anthropic", "openai"]
+    assert len(openai.calls) == calls
+
+    clock[0] += settings.LLM_PROVIDER_COOLDOWN_SECONDS
+    assert model.provider_order() == ["openai", "anthropic"]
+
+
+def test_provider_order_follows_settings(monkeypatch):
+    monkeypatch.setattr(settings, "LLM_PROVIDERS", "anthropic,openai")
+    model = chat_model(openai=FakeProvider("openai"), anthropic=FakeProvider("anthropic"))
+
+    assert model.provider_order() == ["anthropic", "openai"]
+
+
+@pytest.mark.asyncio
+async def test_hedges_slow_provider_and_cancels_loser(monkeypatch, isolated):
+    monkeypatch.setattr(settings, "LLM_HEDGING_ENABLED", True)
+    openai = FakeProvider("openai", delay=5.0)
+    anthropic = FakeProvider("anthropic", delay=0.01)
+
+    started = time.monotonic()
+    result = await chat_model(openai=openai, anthropic=anthropic).agenerate([MESSAGES])
+
+    assert time.monotonic() - started < 1.0
+    assert answer(result) == "anthropic answer"
+    assert openai.cancelled
+    # The cancelled call's prompt is still charged
+    assert [(model, completion) for _, model, _, completion in isolated] == [(settings.LLM_MODEL_TOOLS, 0)]
+    # Cancellation is not a provider failure
+    assert "openai" not in provider_health or provider_health["openai"].score == 1.0
+
+
+@pytest.mark.asyncio
+async def test_no_hedge_when_primary_answers_in_time(monkeypatch, isolated):
+    monkeypatch.setattr(settings, "LLM_HEDGING_ENABLED", True)
+    monkeypatch.setattr(settings, "LLM_HEDGE_DEFAULT_DELAY_SECONDS", 1.0)
+    openai = FakeProvider("openai", delay=0.01)
+    anthropic = FakeProvider("anthropic")
+
+    result = await chat_model(openai=openai, anthropic=anthropic).agenerate([MESSAGES])
+
+    assert answer(result) == "openai answer"
+    assert anthropic.calls == []
+    assert isolated == []
+
+
+@pytest.mark.asyncio
+async def test_hedging_disabled_waits_for_primary():
+    openai = FakeProvider("openai", delay=0.2)
+    anthropic = FakeProvider("anthropic")
+
+    result = await chat_model(openai=openai, anthropic=anthropic).agenerate([MESSAGES])
+
+    assert answer(result) == "openai answer"
+    assert anthropic.calls == []
+
+
+@pytest.mark.asyncio
+async def test_hedged_primary_can_still_win(monkeypatch):
+    monkeypatch.setattr(settings, "LLM_HEDGING_ENABLED", True)
+    openai = FakeProvider("openai", delay=0.1)
+    anthropic = FakeProvider("anthropic", delay=5.0)
+
+    result = await chat_model(openai=openai, anthropic=anthropic).agenerate([MESSAGES])
+
+    assert answer(result) == "openai answer"
+    assert len(anthropic.calls) == 1
+    assert anthropic.cancelled
+
+
+def test_hedge_delay_is_p90_of_response_times():
+    health = ProviderHealth()
+    assert health.hedge_delay() == settings.LLM_HEDGE_DEFAULT_DELAY_SECONDS
+
+    health.response_times.extend([1.0] * 9 + [10.0])
+    assert health.hedge_delay() == 1.0
+    health.response_times.extend([10.0])
+    assert health.hedge_delay() == 10.0
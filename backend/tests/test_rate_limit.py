@@ -0,0 +1,195 @@
+"""Tests for the API rate limiting middleware."""
+
+import httpx
+import pytest
+from starlette.responses import PlainTextResponse
+
+from app.core import rate_limit
+from app.core.auth import AuthHandler
+from app.core.config import settings
+from app.core.rate_limit import (
+    RateLimitMiddleware,
+    request_weight,
+    retry_after,
+    sliding_count,
+)
+
+USER_ID = "00000000-0000-4000-8000-000000000001"
+
+
+@pytest.fixture(autouse=True)
+def limit_settings(monkeypatch):
+    monkeypatch.setattr(settings, "RATE_LIMIT_ENABLED", True)
+    monkeypatch.setattr(settings, "RATE_LIMIT_REQUESTS_PER_MINUTE", 5)
+    monkeypatch.setattr(settings, "RATE_LIMIT_REQUESTS_PER_HOUR", 1000)
+    monkeypatch.setattr(settings, "RATE_LIMIT_IP_MULTIPLIER", 2)
+    monkeypatch.setattr(settings, "RATE_LIMIT_CREATE_WEIGHT", 3)
+    monkeypatch.setattr(settings, "RATE_LIMIT_TRUST_FORWARDED_FOR", False)
+    monkeypatch.setattr(settings, "RATE_LIMIT_REDIS_RETRY_SECONDS", 5.0)
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Wall clock fixed 10s into a minute; monotonic clock for the Redis retry."""
+    now = {"time": 1_800_000_010.0, "monotonic": 100.0}
+    monkeypatch.setattr(rate_limit.time, "time", lambda: now["time"])
+    monkeypatch.setattr(rate_limit.time, "monotonic", lambda: now["monotonic"])
+    return now
+
+
+async def ok(scope, receive, send):
+    await PlainTextResponse("ok")(scope, receive, send)
+
+
+def client(middleware, ip="203.0.113.7"):
+    transport = httpx.ASGITransport(app=middleware, client=(ip, 1234))
+    return httpx.AsyncClient(transport=transport, base_url="http://test")
+
+
+def bearer(user_id=USER_ID):
+    token = AuthHandler().create_access_token({"sub": user_id, "email": "founder@example.com"})
+    return {"Authorization": f"Bearer {token}"}
+
+
+async def rate_limit_keys(pattern):
+    return await rate_limit.get_redis().keys(pattern)
+
+
+def test_sliding_count_weights_previous_period_by_overlap():
+    # A quarter into the window, three quarters of the previous period still count
+    assert sliding_count(previous=8, current=2, now=15, window=60) == 8 * 0.75 + 2
+    assert sliding_count(previous=8, current=2, now=60, window=60) == 10
+    assert sliding_count(previous=0, current=4, now=59, window=60) == 4
+
+
+def test_retry_after_waits_for_previous_period_to_slide_out():
+    # 8 * (1 - elapsed) + 2 <= 5 once elapsed >= 5/8, i.e. 37.5s in; now is 15s in
+    assert retry_after(previous=8, current=2, now=15, window=60, limit=5) == 23
+
+
+def test_retry_after_waits_for_next_period_when_current_is_over():
+    assert retry_after(previous=0, current=7, now=15, window=60, limit=5) == 45
+    assert retry_after(previous=3, current=6, now=15, window=60, limit=5) == 45
+
+
+def test_retry_after_is_at_least_a_second():
+    assert retry_after(previous=8, current=2, now=37.4, window=60, limit=5) == 1
+
+
+def test_request_weight():
+    assert request_weight("POST", f"{settings.API_V1_STR}/validations") == 3
+    assert request_weight("POST", f"{settings.API_V1_STR}/validations/") == 3
+    assert request_weight("GET", f"{settings.API_V1_STR}/validations") == 1
+    assert request_weight("POST", f"{settings.API_V1_STR}/validations/abc/cancel") == 1
+
+
+@pytest.mark.asyncio
+async def test_limits_user_and_sets_retry_after(redis_server, clock):
+    async with client(RateLimitMiddleware(ok)) as http:
+        statuses = [(await http.get("/api/v1/validations", headers=bearer())).status_code for _ in range(5)]
+        limited = await http.get("/api/v1/validations", headers=bearer())
+
+    assert statuses == [200] * 5
+    assert limited.status_code == 429
+    assert limited.json() == {"detail": "Rate limit exceeded"}
+    # 10s into the minute; only the next one brings relief
+    assert limited.headers["Retry-After"] == "50"
+
+
+@pytest.mark.asyncio
+async def test_previous_period_counts_until_it_slides_out(redis_server, clock):
+    async with client(RateLimitMiddleware(ok)) as http:
+        for _ in range(5):
+            await http.get("/api/v1/validations", headers=bearer())
+        clock["time"] += 60
+        # 10s into the next minute, 5 * 50/60 of the last minute still counts
+        limited = await http.get("/api/v1/validations", headers=bearer())
+        assert limited.status_code == 429
+        # 5 * (1 - elapsed) + 1 <= 5 once 12s in
+        assert limited.headers["Retry-After"] == "2"
+        clock["time"] += 30
+        assert (await http.get("/api/v1/validations", headers=bearer())).status_code == 200
+
+
+@pytest.mark.asyncio
+async def test_users_are_limited_separately(redis_server, clock):
+    other_user = "00000000-0000-4000-8000-000000000002"
+    async with client(RateLimitMiddleware(ok)) as http:
+        for _ in range(5):
+            await http.get("/api/v1/validations", headers=bearer())
+        assert (await http.get("/api/v1/validations", headers=bearer())).status_code == 429
+        assert (await http.get("/api/v1/validations", headers=bearer(other_user))).status_code == 200
+
+
+@pytest.mark.asyncio
+async def test_ip_limit_covers_users_behind_one_address(redis_server, clock):
+    users = [f"00000000-0000-4000-8000-00000000000{i}" for i in range(1, 5)]
+    async with client(RateLimitMiddleware(ok)) as http:
+        statuses = [
+            (await http.get("/api/v1/validations", headers=bearer(user_id))).status_code
+            for user_id in users
+            for _ in range(3)
+        ]
+
+    # Twice the user limit per IP
+    assert statuses.count(200) == 10
+
+
+@pytest.mark.asyncio
+async def test_invalid_token_is_limited_by_ip(redis_server, clock):
+    async with client(RateLimitMiddleware(ok)) as http:
+        statuses = [
+            (await http.get("/api/v1/validations", headers={"Authorization": "Bearer forged"})).status_code
+            for _ in range(11)
+        ]
+
+    assert statuses == [200] * 10 + [429]
+    assert await rate_limit_keys("rate_limit:api:user:*") == []
+
+
+@pytest.mark.asyncio
+async def test_creating_validations_costs_more(redis_server, clock):
+    async with client(RateLimitMiddleware(ok)) as http:
+        first = await http.post("/api/v1/validations", headers=bearer())
+        second = await http.post("/api/v1/validations", headers=bearer())
+
+    assert first.status_code == 200
+    assert second.status_code == 429
+
+
+@pytest.mark.asyncio
+async def test_exempt_paths_and_disabled_limits(redis_server, clock, monkeypatch):
+    async with client(RateLimitMiddleware(ok)) as http:
+        health = [(await http.get("/health")).status_code for _ in range(20)]
+        monkeypatch.setattr(settings, "RATE_LIMIT_ENABLED", False)
+        unlimited = [(await http.get("/api/v1/validations")).status_code for _ in range(20)]
+
+    assert health == unlimited == [200] * 20
+
+
+@pytest.mark.asyncio
+async def test_falls_back_to_process_memory_without_redis(redis_server, clock):
+    redis_server.connected = False
+    middleware = RateLimitMiddleware(ok)
+    async with client(middleware) as http:
+        statuses = [(await http.get("/api/v1/validations", headers=bearer())).status_code for _ in range(6)]
+
+    # Same limits, counted locally
+    assert statuses == [200] * 5 + [429]
+    assert middleware._redis_down_until == clock["monotonic"] + settings.RATE_LIMIT_REDIS_RETRY_SECONDS
+
+
+@pytest.mark.asyncio
+async def test_retries_redis_after_fallback_period(redis_server, clock):
+    redis_server.connected = False
+    middleware = RateLimitMiddleware(ok)
+    async with client(middleware) as http:
+        await http.get("/api/v1/validations", headers=bearer())
+        redis_server.connected = True
+        # Still within the retry period: counted locally
+        await http.get("/api/v1/validations", headers=bearer())
+        assert await rate_limit_keys("rate_limit:api:*") == []
+
+        clock["monotonic"] += settings.RATE_LIMIT_REDIS_RETRY_SECONDS
+        await http.get("/api/v1/validations", headers=bearer())
+        assert await rate_limit_keys("rate_limit:api:*") != []
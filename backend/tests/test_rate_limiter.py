@@ -0,0 +1,154 @@
+"""Tests for the fleet-wide provider rate limiter."""
+
+import fakeredis
+import pytest
+
+from app.core.config import settings
+from app.services import rate_limiter as rate_limiter_module
+from app.services.rate_limiter import KEY_PREFIX, ProviderRateLimiter
+
+REQUESTS = f"{KEY_PREFIX}openai:gpt-4o:requests"
+TOKENS = f"{KEY_PREFIX}openai:gpt-4o:tokens"
+
+
+@pytest.fixture(autouse=True)
+def limit_settings(monkeypatch):
+    monkeypatch.setattr(settings, "PROVIDER_RATE_LIMITS", {"openai": {"rpm": 60, "tpm": 60_000}})
+    monkeypatch.setattr(settings, "PROVIDER_RATE_LIMIT_MAX_WAIT_SECONDS", 120.0)
+
+
+@pytest.fixture
+def limiter():
+    return ProviderRateLimiter()
+
+
+@pytest.fixture
+def buckets(redis_server):
+    """Direct access to the bucket hashes."""
+    return fakeredis.FakeRedis(server=redis_server)
+
+
+@pytest.fixture
+def sleeps(monkeypatch, buckets):
+    """Records sleeps instead of sleeping; a sleep refills both buckets."""
+    delays = []
+
+    async def sleep(delay):
+        delays.append(delay)
+        buckets.hset(REQUESTS, "level", 60)
+        buckets.hset(TOKENS, "level", 60_000)
+
+    monkeypatch.setattr(rate_limiter_module.asyncio, "sleep", sleep)
+    return delays
+
+
+def level(buckets, key):
+    return float(buckets.hget(key, "level"))
+
+
+def server_ms(buckets):
+    """Redis server clock in milliseconds, as the script reads it."""
+    seconds, microseconds = buckets.time()
+    return seconds * 1000 + microseconds // 1000
+
+
+@pytest.mark.asyncio
+async def test_takes_from_both_buckets(limiter, buckets, sleeps):
+    await limiter.acquire("openai", "gpt-4o", tokens=1_500)
+
+    assert level(buckets, REQUESTS) == pytest.approx(59, abs=0.1)
+    assert level(buckets, TOKENS) == pytest.approx(58_500, abs=100)
+    assert sleeps == []
+
+
+@pytest.mark.asyncio
+async def test_buckets_refill_with_time(limiter, buckets, sleeps):
+    await limiter.acquire("openai", "gpt-4o")
+    # Empty, and last drawn from 30s ago by the server clock
+    buckets.hset(REQUESTS, mapping={"level": 0, "ts": server_ms(buckets) - 30_000})
+
+    await limiter.acquire("openai", "gpt-4o")
+
+    # A request per second came back; this call took one
+    assert level(buckets, REQUESTS) == pytest.approx(29, abs=0.1)
+    assert sleeps == []
+
+
+@pytest.mark.asyncio
+async def test_short_bucket_waits_for_capacity(limiter, buckets, sleeps):
+    for _ in range(60):
+        await limiter.acquire("openai", "gpt-4o")
+    assert sleeps == []
+
+    await limiter.acquire("openai", "gpt-4o")
+
+    # One request per second refills; waits are jittered up by at most 20%
+    assert len(sleeps) == 1
+    assert 0.9 <= sleeps[0] <= 1.2
+
+
+@pytest.mark.asyncio
+async def test_calls_larger_than_a_minute_of_tokens_wait_for_a_full_bucket(limiter, buckets, sleeps):
+    buckets.hset(TOKENS, mapping={"level": 30_000, "ts": server_ms(buckets)})
+
+    await limiter.acquire("openai", "gpt-4o", tokens=100_000)
+
+    # 30k tokens short at 1k per second
+    assert len(sleeps) == 1
+    assert 29.5 <= sleeps[0] <= 36
+
+
+@pytest.mark.asyncio
+async def test_gives_up_waiting_after_max_wait(limiter, buckets, sleeps, monkeypatch):
+    monkeypatch.setattr(settings, "PROVIDER_RATE_LIMIT_MAX_WAIT_SECONDS", 0.0)
+    for _ in range(60):
+        await limiter.acquire("openai", "gpt-4o")
+
+    await limiter.acquire("openai", "gpt-4o")
+
+    # Called anyway, without drawing from the empty bucket
+    assert sleeps == []
+    assert level(buckets, REQUESTS) < 1
+
+
+@pytest.mark.asyncio
+async def test_redis_down_passes_calls_through(limiter, redis_server, sleeps):
+    redis_server.connected = False
+
+    assert await limiter.acquire("openai", "gpt-4o", tokens=1_000) < 1.0
+    assert limiter.acquire_sync("openai", "gpt-4o", tokens=1_000) < 1.0
+    assert sleeps == []
+
+
+@pytest.mark.asyncio
+async def test_providers_without_limits_are_not_metered(limiter, buckets):
+    assert await limiter.acquire("anthropic", "claude-3-5-sonnet") == 0.0
+    assert buckets.keys() == []
+
+
+def test_sync_acquire_shares_the_buckets(limiter, buckets, monkeypatch):
+    delays = []
+    monkeypatch.setattr(rate_limiter_module.time, "sleep", delays.append)
+    buckets.hset(REQUESTS, mapping={"level": 0, "ts": server_ms(buckets) + 1000})
+    monkeypatch.setattr(settings, "PROVIDER_RATE_LIMIT_MAX_WAIT_SECONDS", 0.0)
+
+    limiter.acquire_sync("openai", "gpt-4o")
+    assert delays == []
+
+    buckets.hset(REQUESTS, "level", 60)
+    limiter.acquire_sync("openai", "gpt-4o")
+    assert level(buckets, REQUESTS) == pytest.approx(59, abs=0.1)
+
+
+@pytest.mark.asyncio
+async def test_script_is_registered_once_per_client(limiter, redis_server):
+    await limiter.acquire("openai", "gpt-4o")
+    script = limiter._script()
+    limiter.acquire_sync("openai", "gpt-4o")
+    sync_script = limiter._script_sync()
+
+    await limiter.acquire("openai", "gpt-4o")
+    limiter.acquire_sync("openai", "gpt-4o")
+
+    assert limiter._script() is script
+    assert limiter._script_sync() is sync_script
@@ -0,0 +1,167 @@
+"""Tests for model tier routing."""
+
+import uuid
+
+import pytest
+from langchain_core.messages import AIMessage
+from langchain_core.outputs import ChatGeneration, LLMResult
+
+from app.agents import routing as routing_module
+from app.agents.routing import ModelRouter, ModelTier, TierLatencyHandler, tier_model
+from app.core.config import settings
+from app.services.cost_meter import BudgetExceeded
+
+
+@pytest.fixture(autouse=True)
+def tier_settings(monkeypatch):
+    monkeypatch.setattr(settings, "LLM_ROUTING_ENABLED", True)
+    monkeypatch.setattr(settings, "BUDGET_DOWNGRADE_RATIO", 0.8)
+    monkeypatch.setattr(settings, "LLM_LATENCY_MIN_SAMPLES", 5)
+    monkeypatch.setattr(settings, "LLM_LATENCY_WINDOW_SECONDS", 300)
+    monkeypatch.setattr(settings, "LLM_MODEL_REASONING", "reasoning-model")
+    monkeypatch.setattr(settings, "LLM_MODEL_TOOLS", "tools-model")
+    monkeypatch.setattr(settings, "LLM_MODEL_FORMATTING", "formatting-model")
+    monkeypatch.setattr(settings, "LLM_ANTHROPIC_MODEL_REASONING", "anthropic-reasoning-model")
+    monkeypatch.setattr(settings, "LLM_LATENCY_SLO_REASONING_SECONDS", 60.0)
+    monkeypatch.setattr(settings, "LLM_LATENCY_SLO_TOOLS_SECONDS", 30.0)
+    monkeypatch.setattr(settings, "LLM_LATENCY_SLO_FORMATTING_SECONDS", 20.0)
+
+
+@pytest.fixture
+def router():
+    return ModelRouter()
+
+
+def observe(router, tier, seconds, count=10, provider="openai"):
+    for _ in range(count):
+        router.observe(tier_model(tier, provider), seconds)
+
+
+def test_routes_declared_tier_by_default(router):
+    for tier in ModelTier:
+        assert router.route_sync(tier) == tier
+
+
+def test_budget_pressure_downgrades_one_tier(router):
+    assert router.route_sync(ModelTier.REASONING, budget_pressure=0.79) == ModelTier.REASONING
+    assert router.route_sync(ModelTier.REASONING, budget_pressure=0.8) == ModelTier.TOOLS
+    assert router.route_sync(ModelTier.TOOLS, budget_pressure=0.95) == ModelTier.FORMATTING
+
+
+def test_budget_pressure_never_goes_below_the_last_tier(router):
+    assert router.route_sync(ModelTier.FORMATTING, budget_pressure=1.0) == ModelTier.FORMATTING
+
+
+def test_latency_breach_downgrades(router):
+    observe(router, ModelTier.REASONING, 90.0)
+
+    assert router.route_sync(ModelTier.REASONING) == ModelTier.TOOLS
+    # Only calls declared at the slow tier are affected
+    assert router.route_sync(ModelTier.TOOLS) == ModelTier.TOOLS
+
+
+def test_latency_within_slo_keeps_tier(router):
+    observe(router, ModelTier.REASONING, 59.0)
+
+    assert router.route_sync(ModelTier.REASONING) == ModelTier.REASONING
+
+
+def test_latency_downgrade_uses_p90(router):
+    # One slow call in ten leaves the p90 within the SLO
+    observe(router, ModelTier.REASONING, 10.0, count=9)
+    observe(router, ModelTier.REASONING, 120.0, count=1)
+    assert router.route_sync(ModelTier.REASONING) == ModelTier.REASONING
+
+    observe(router, ModelTier.REASONING, 120.0, count=2)
+    assert router.route_sync(ModelTier.REASONING) == ModelTier.TOOLS
+
+
+def test_latency_needs_min_samples(router):
+    observe(router, ModelTier.REASONING, 90.0, count=4)
+
+    assert router.p90(tier_model(ModelTier.REASONING)) is None
+    assert router.route_sync(ModelTier.REASONING) == ModelTier.REASONING
+
+
+def test_latency_downgrades_past_every_breaching_tier(router):
+    observe(router, ModelTier.REASONING, 90.0)
+    observe(router, ModelTier.TOOLS, 45.0)
+
+    assert router.route_sync(ModelTier.REASONING) == ModelTier.FORMATTING
+
+
+def test_formatting_is_never_downgraded_for_latency(router):
+    observe(router, ModelTier.FORMATTING, 90.0)
+
+    assert router.route_sync(ModelTier.FORMATTING) == ModelTier.FORMATTING
+
+
+def test_budget_then_latency(router):
+    observe(router, ModelTier.TOOLS, 45.0)
+
+    assert router.route_sync(ModelTier.REASONING, budget_pressure=0.9) == ModelTier.FORMATTING
+
+
+def test_latency_is_per_provider_model(router):
+    observe(router, ModelTier.REASONING, 90.0, provider="anthropic")
+
+    assert router.route_sync(ModelTier.REASONING, "anthropic") == ModelTier.TOOLS
+    assert router.route_sync(ModelTier.REASONING, "openai") == ModelTier.REASONING
+
+
+def test_slow_samples_age_out(router, monkeypatch):
+    clock = [1000.0]
+    monkeypatch.setattr("app.agents.routing.time.monotonic", lambda: clock[0])
+    observe(router, ModelTier.REASONING, 90.0)
+    assert router.route_sync(ModelTier.REASONING) == ModelTier.TOOLS
+
+    clock[0] += 301
+    assert router.route_sync(ModelTier.REASONING) == ModelTier.REASONING
+
+
+def test_disabled_routing_keeps_tier(router, monkeypatch):
+    monkeypatch.setattr(settings, "LLM_ROUTING_ENABLED", False)
+    observe(router, ModelTier.REASONING, 90.0)
+
+    assert router.route_sync(ModelTier.REASONING, budget_pressure=1.0) == ModelTier.REASONING
+
+
+@pytest.mark.asyncio
+async def test_route_outside_a_stage_has_no_budget_pressure(router):
+    assert await router.route(ModelTier.REASONING) == ModelTier.REASONING
+
+
+def finished_call(handler, llm_output=None, error=None):
+    """Run one call through the handler's callbacks, without streaming tokens."""
+    run_id = uuid.uuid4()
+    handler.on_chat_model_start({}, [[]], run_id=run_id, invocation_params={"model": "reasoning-model"})
+    if error is not None:
+        handler.on_llm_error(error, run_id=run_id)
+    else:
+        generation = ChatGeneration(message=AIMessage(content="", tool_calls=[{"name": "web_search", "args": {}, "id": "1"}]))
+        handler.on_llm_end(LLMResult(generations=[[generation]], llm_output=llm_output), run_id=run_id)
+
+
+def test_latency_handler_observes_live_results_by_the_model_that_answered(router, monkeypatch):
+    monkeypatch.setattr(routing_module, "model_router", router)
+    handler = TierLatencyHandler(ModelTier.REASONING)
+
+    for _ in range(settings.LLM_LATENCY_MIN_SAMPLES):
+        finished_call(handler, {"model_name": "anthropic-reasoning-model", "provider": "anthropic"})
+
+    assert router.p90("anthropic-reasoning-model") is not None
+    assert router.p90("reasoning-model") is None
+
+
+def test_latency_handler_skips_cache_hits_and_budget_refusals(router, monkeypatch):
+    monkeypatch.setattr(routing_module, "model_router", router)
+    handler = TierLatencyHandler(ModelTier.REASONING)
+
+    for _ in range(settings.LLM_LATENCY_MIN_SAMPLES):
+        finished_call(handler)
+        finished_call(handler, error=BudgetExceeded("validation", 2.0))
+    assert router.p90("reasoning-model") is None
+
+    for _ in range(settings.LLM_LATENCY_MIN_SAMPLES):
+        finished_call(handler, error=TimeoutError())
+    assert router.p90("reasoning-model") is not None
@@ -0,0 +1,159 @@
+"""Tests for the validateio Celery serializer."""
+
+import datetime
+import uuid
+
+import msgpack
+import pytest
+from kombu.serialization import dumps as kombu_dumps
+from kombu.serialization import loads as kombu_loads
+
+from app.core import serialization
+from app.core.config import settings
+
+
+@pytest.fixture
+def claim_check(monkeypatch, redis_server):
+    monkeypatch.setattr(settings, "CELERY_CLAIM_CHECK_ENABLED", True)
+    monkeypatch.setattr(settings, "CELERY_CLAIM_CHECK_MIN_BYTES", 1024)
+    return redis_server
+
+
+@pytest.fixture
+def no_claim_check(monkeypatch):
+    monkeypatch.setattr(settings, "CELERY_CLAIM_CHECK_ENABLED", False)
+
+
+def research_result(kb: int = 8):
+    return {
+        "market_size": {"tam": "$12B", "growth_rate": "18% CAGR"},
+        "competitors": [{"name": f"Competitor {i}", "market_share": 0.05} for i in range(5)],
+        "raw_output": "".join(f"word{i} " for i in range(kb * 160))[: kb * 1024],
+        "execution_time_seconds": 41.2,
+        "cache": None,
+    }
+
+
+def claim_keys():
+    client = serialization.get_sync_redis()
+    return [key.decode() for key in client.keys(f"{serialization.CLAIM_PREFIX}*")]
+
+
+def test_small_body_round_trips_uncompressed(no_claim_check):
+    body = ([], {"validation_id": "abc", "bypass_cache": False, "retries": 3}, {"chain": None})
+
+    data = serialization.dumps(body)
+
+    assert data[:1] == serialization._PLAIN
+    # msgpack has no tuples
+    assert serialization.loads(data) == [[], body[1], body[2]]
+
+
+def test_large_body_is_compressed(no_claim_check):
+    body = research_result()
+
+    data = serialization.dumps(body)
+
+    assert data[:1] == serialization._ZSTD
+    assert len(data) < len(serialization._pack(body))
+    assert serialization.loads(data) == body
+
+
+def test_converts_types_like_celery_json(no_claim_check):
+    task_id = uuid.uuid4()
+    finished = datetime.datetime(2026, 10, 1, 12, 30)
+
+    assert serialization.loads(serialization.dumps({"id": task_id, "at": finished})) == {
+        "id": str(task_id),
+        "at": finished.isoformat(),
+    }
+
+
+def test_large_dict_is_claim_checked(claim_check):
+    research = research_result()
+    body = ([research], {"validation_id": "abc"}, {"chain": None})
+
+    data = serialization.dumps(body)
+
+    # The message carries a reference; the research is in Redis once
+    assert len(data) < 1024
+    keys = claim_keys()
+    assert len(keys) == 1
+    assert serialization.loads(data) == [[research], body[1], body[2]]
+
+
+def test_repeated_dict_is_stored_once(claim_check):
+    research = research_result()
+    pipeline_results = {"market_research": research, "experiments": {"experiments": []}}
+
+    first = serialization.dumps(([research], {}, {}))
+    second = serialization.dumps(([pipeline_results], {}, {}))
+
+    assert len(claim_keys()) == 1
+    assert len(second) < 1024
+    assert serialization.loads(first)[0][0] == research
+    assert serialization.loads(second)[0][0] == pipeline_results
+
+
+def test_innermost_large_dict_is_claimed(claim_check):
+    # Medium dicts that only reach the threshold together, inside a small envelope
+    parts = {f"stage_{i}": {"text": "x" * 400} for i in range(4)}
+
+    data = serialization.dumps({"results": parts})
+
+    keys = claim_keys()
+    assert len(keys) == 1
+    stored = serialization._unpack(serialization._unframe(serialization.get_sync_redis().get(keys[0])))
+    assert stored == parts
+    assert serialization.loads(data) == {"results": parts}
+
+
+def test_claim_sizes_match_packed_sizes(no_claim_check, monkeypatch):
+    monkeypatch.setattr(settings, "CELERY_CLAIM_CHECK_MIN_BYTES", 10 ** 9)
+    values = [
+        research_result(1),
+        {"list": [1, "two", 3.0, None, True, {"nested": ["a" * 20] * 20}], "n": 2 ** 40},
+        [{"k": i} for i in range(40)],
+        {f"key{i}": i for i in range(70_000)},
+    ]
+    for value in values:
+        replaced, size = serialization._claim_large(value)
+        assert replaced == value
+        assert size == len(serialization._pack(value))
+
+
+def test_expired_claim_raises(claim_check):
+    data = serialization.dumps({"research": research_result()})
+    serialization.get_sync_redis().flushall()
+
+    with pytest.raises(KeyError, match="expired"):
+        serialization.loads(data)
+
+
+def test_storing_a_claim_again_refreshes_its_ttl(claim_check):
+    research = research_result()
+    serialization.dumps(research)
+    key = claim_keys()[0]
+    client = serialization.get_sync_redis()
+    client.expire(key, 10)
+
+    serialization.dumps(research)
+
+    assert client.ttl(key) > 10
+
+
+def test_unknown_extension_types_pass_through(no_claim_check):
+    packed = msgpack.packb(msgpack.ExtType(42, b"data"))
+
+    assert serialization.loads(serialization._frame(packed)) == msgpack.ExtType(42, b"data")
+
+
+def test_registered_with_kombu(claim_check):
+    assert serialization.register_serializer()
+    body = {"research": research_result()}
+
+    content_type, content_encoding, data = kombu_dumps(body, serializer=serialization.SERIALIZER_NAME)
+
+    assert content_type == serialization.CONTENT_TYPE
+    assert content_encoding == "binary"
+    assert kombu_loads(data, content_type, content_encoding) == body
@@ -0,0 +1,123 @@
+"""Tests for the keyset-paged validation listing."""
+
+import uuid
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from app.services.validation_repository import (
+    ValidationRepository,
+    decode_cursor,
+    encode_cursor,
+)
+
+USER_ID = str(uuid.uuid4())
+
+
+class FakeSession:
+    """Records listing queries and returns preset rows."""
+
+    def __init__(self, rows):
+        self.rows = rows
+        self.queries = []
+
+    async def execute(self, query):
+        self.queries.append(query)
+        return SimpleNamespace(all=lambda: self.rows)
+
+
+def summary_rows(count):
+    newest = datetime(2026, 10, 1, 12, 0, 0, 123456)
+    return [
+        SimpleNamespace(id=uuid.uuid4(), created_at=newest - timedelta(minutes=i))
+        for i in range(count)
+    ]
+
+
+def compiled_params(query):
+    return query.compile(dialect=postgresql.dialect()).params
+
+
+def test_cursor_round_trip():
+    created_at = datetime(2026, 10, 1, 12, 0, 0, 123456)
+    validation_id = uuid.uuid4()
+
+    cursor = encode_cursor(created_at, validation_id)
+
+    assert decode_cursor(cursor) == (created_at, validation_id)
+    # URL-safe and unpadded, so it can go in a query string as is
+    assert "=" not in cursor
+    assert all(c.isalnum() or c in "-_" for c in cursor)
+
+
+@pytest.mark.parametrize(
+    "cursor",
+    [
+        "",
+        "not a cursor",
+        "!!!",
+        encode_cursor(datetime(2026, 10, 1), uuid.uuid4())[:-4],
+        # Valid base64 and JSON, wrong shape or values
+        "WyIyMDI2LTEwLTAxIl0",  # ["2026-10-01"]
+        "WyJ5ZXN0ZXJkYXkiLCAibm90LWEtdXVpZCJd",  # ["yesterday", "not-a-uuid"]
+        "eyJhIjogMX0",  # {"a": 1}
+    ],
+)
+def test_decode_cursor_rejects_malformed(cursor):
+    with pytest.raises(ValueError):
+        decode_cursor(cursor)
+
+
+@pytest.mark.asyncio
+async def test_first_page_returns_next_cursor_of_last_row():
+    rows = summary_rows(4)
+    db = FakeSession(rows)
+
+    page, next_cursor = await ValidationRepository.list_summaries_for_user(db, USER_ID, limit=3)
+
+    assert page == rows[:3]
+    assert decode_cursor(next_cursor) == (rows[2].created_at, rows[2].id)
+    # One extra row is fetched to tell whether there is a next page
+    assert 4 in compiled_params(db.queries[0]).values()
+
+
+@pytest.mark.asyncio
+async def test_last_page_has_no_next_cursor():
+    rows = summary_rows(3)
+    db = FakeSession(rows)
+
+    page, next_cursor = await ValidationRepository.list_summaries_for_user(db, USER_ID, limit=3)
+
+    assert page == rows
+    assert next_cursor is None
+
+
+@pytest.mark.asyncio
+async def test_cursor_continues_after_its_row():
+    created_at = datetime(2026, 10, 1, 12, 0, 0, 123456)
+    validation_id = uuid.uuid4()
+    db = FakeSession([])
+
+    await ValidationRepository.list_summaries_for_user(
+        db, USER_ID, limit=3, cursor=encode_cursor(created_at, validation_id)
+    )
+
+    query = db.queries[0]
+    compiled = str(query.compile(dialect=postgresql.dialect()))
+    assert "(validations.created_at, validations.id) < (" in compiled
+    assert "ORDER BY validations.created_at DESC, validations.id DESC" in compiled
+    params = compiled_params(query)
+    assert created_at in params.values()
+    assert validation_id in params.values()
+
+
+@pytest.mark.asyncio
+async def test_invalid_cursor_raises_before_querying():
+    db = FakeSession([])
+
+    with pytest.raises(ValueError):
+        await ValidationRepository.list_summaries_for_user(db, USER_ID, cursor="not a cursor")
+
+    assert db.queries == []
@@ -0,0 +1,57 @@
+"""Tests for queueing and cancelling validations."""
+
+import uuid
+
+import pytest
+
+from app.services import validation_service as validation_service_module
+from app.services.validation_service import ValidationService
+from app.services.validation_status import validation_status
+from app.tasks.validation import pipeline_task_ids
+
+VALIDATION_ID = str(uuid.uuid4())
+USER_ID = str(uuid.uuid4())
+
+
+@pytest.fixture
+def published(monkeypatch, redis_server):
+    """Replaces broker publishing with a first stage that fails before publishing returns."""
+    calls = []
+
+    def start_validation_pipeline(**kwargs):
+        calls.append(kwargs)
+        # The stage fails before the API gets past publishing
+        validation_status.set_status_sync(kwargs["validation_id"], "failed", error="stage failed fast")
+        return kwargs["workflow_id"]
+
+    monkeypatch.setattr(validation_service_module, "start_validation_pipeline", start_validation_pipeline)
+    return calls
+
+
+@pytest.mark.asyncio
+async def test_status_record_exists_before_publishing(published):
+    workflow_id = await ValidationService.process_validation(
+        VALIDATION_ID, USER_ID, "An AI-powered personal finance app", pipeline_mode="chain"
+    )
+
+    assert published[0]["workflow_id"] == workflow_id
+    status = await validation_status.get(VALIDATION_ID)
+    # The stage's write was not overwritten by the pending record
+    assert status["status"] == "failed"
+    assert status["task_id"] == workflow_id
+    assert status["task_ids"]["market_research"] == pipeline_task_ids(workflow_id)["research"]
+
+
+@pytest.mark.asyncio
+async def test_failed_publish_marks_validation_failed(monkeypatch, redis_server):
+    def start_validation_pipeline(**kwargs):
+        raise ConnectionError("broker down")
+
+    monkeypatch.setattr(validation_service_module, "start_validation_pipeline", start_validation_pipeline)
+
+    with pytest.raises(ConnectionError):
+        await ValidationService.process_validation(VALIDATION_ID, USER_ID, "An AI-powered personal finance app")
+
+    status = await validation_status.get(VALIDATION_ID)
+    assert status["status"] == "failed"
+    assert "broker down" in status["current_step"]